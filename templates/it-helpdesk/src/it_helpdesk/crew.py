@@ -11,33 +11,93 @@ It includes a classifier agent that routes requests to specialized agents:
 from __future__ import annotations
 
 import os
+import re
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from types import MappingProxyType
+from typing import Any, Literal
 
 import yaml
 from crewai import Agent, Crew, Process, Task
 from pydantic import BaseModel
 
+try:
+    from orjson import dumps as _json_dumps
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    import json
+
+    _json_loads = json.loads
+
+    def _json_dumps(obj: object) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
 # ─── Configuration ───────────────────────────────────────────────────────────
 
+_CONFIG_DIR = Path(__file__).parent / "config"
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@lru_cache(maxsize=None)
+def _load_yaml(filename: str) -> MappingProxyType[str, Any]:
+    """Load a YAML configuration file.
 
-def _load_yaml(filename: str) -> dict:
-    """Load a YAML configuration file."""
-    filepath = Path(__file__).parent / "config" / filename
-    with open(filepath, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    Results are memoized per process and returned as a read-only mapping,
+    since every caller shares the same parsed config. Across processes the
+    parsed config is cached in a ``<filename>.json`` sidecar next to the
+    YAML file, which is reused while it is at least as new as the YAML.
+    """
+    return MappingProxyType(_read_config(filename))
+
+
+def _read_config(filename: str) -> dict:
+    """Read a config from its JSON sidecar, or parse the YAML and write one."""
+    filepath = _CONFIG_DIR / filename
+    cache_path = filepath.with_name(filepath.name + ".json")
+    try:
+        if cache_path.stat().st_mtime_ns >= filepath.stat().st_mtime_ns:
+            return _json_loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        pass
+
+    data = yaml.load(filepath.read_bytes(), Loader=_YAML_LOADER)
+    _write_json_cache(cache_path, data)
+    return data
+
+
+def _write_json_cache(cache_path: Path, data: object) -> None:
+    """Atomically write a JSON sidecar, skipping data JSON can't round-trip."""
+    try:
+        payload = _json_dumps(data)
+    except TypeError:
+        return
+    if _json_loads(payload) != data:
+        return
+
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Read-only installs simply keep parsing the YAML.
+        tmp_path.unlink(missing_ok=True)
 
 
 # ─── State ───────────────────────────────────────────────────────────────────
 
 
+Category = Literal[
+    "password_reset", "software_issue", "network_issue", "hardware_issue"
+]
+
+
 class HelpdeskResult(BaseModel):
     """Result of processing an IT support request."""
 
     query: str
-    category: Literal[
-        "password_reset", "software_issue", "network_issue", "hardware_issue"
-    ]
+    category: Category
     response: str
 
 
@@ -45,7 +105,27 @@ class HelpdeskResult(BaseModel):
 
 
 def _create_agents() -> dict[str, Agent]:
-    """Create agents from YAML configuration."""
+    """Create agents from YAML configuration.
+
+    Agents are built once per distinct (MODEL, CLASSIFIER_MODEL, VERBOSE)
+    setting and shared by later calls; ``_build_agents.cache_clear()``
+    forces a rebuild.
+    """
+    env = os.environ
+    return _build_agents(
+        env.get("MODEL", "gpt-4o"),
+        env.get("CLASSIFIER_MODEL", "gpt-4o-mini"),
+        env.get("VERBOSE", "true").lower() == "true",
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_agents(
+    model: str,
+    classifier_model: str,
+    verbose: bool,
+) -> dict[str, Agent]:
+    """Build all agents for the given LLM settings."""
     from it_helpdesk.tools.custom_tool import (
         check_system_status,
         lookup_ticket,
@@ -53,17 +133,15 @@ def _create_agents() -> dict[str, Agent]:
     )
 
     agents_config = _load_yaml("agents.yaml")
-    model = os.getenv("MODEL", "gpt-4o")
-    classifier_model = os.getenv("CLASSIFIER_MODEL", "gpt-4o-mini")
-    verbose = os.getenv("VERBOSE", "true").lower() == "true"
 
     return {
+        # The classifier only emits a single label, so never trace it.
         "classifier": Agent(
             role=agents_config["classifier"]["role"],
             goal=agents_config["classifier"]["goal"],
             backstory=agents_config["classifier"]["backstory"],
             llm=classifier_model,
-            verbose=verbose,
+            verbose=False,
         ),
         "password_reset": Agent(
             role=agents_config["password_reset"]["role"],
@@ -119,64 +197,119 @@ def _create_task(
     )
 
 
+# Crews are reused across requests: each holds one task whose description
+# keeps the ``{query}`` placeholder, filled in by ``kickoff(inputs=...)``.
+# Entries remember the agent they were built for, so a fresh agents dict
+# rebuilds them.
+_CREWS: dict[str, tuple[Agent, Crew]] = {}
+
+
+def _get_crew(task_key: str, agent: Agent, **crew_kwargs) -> Crew:
+    """Return the cached single-task crew for ``task_key`` and ``agent``."""
+    cached = _CREWS.get(task_key)
+    if cached is not None and cached[0] is agent:
+        return cached[1]
+
+    task = _create_task(task_key, agent, "{query}")
+    crew = Crew(
+        agents=[agent],
+        tasks=[task],
+        process=Process.sequential,
+        **crew_kwargs,
+    )
+    _CREWS[task_key] = (agent, crew)
+    return crew
+
+
 # ─── Main Processing Functions ───────────────────────────────────────────────
 
 
-def classify_request(query: str) -> str:
+def classify_request(query: str) -> Category:
     """Classify an IT support request.
 
     Returns one of: password_reset, software_issue, network_issue, hardware_issue.
     """
     agents = _create_agents()
-    task = _create_task("classify_request", agents["classifier"], query)
-
-    crew = Crew(
-        agents=[agents["classifier"]],
-        tasks=[task],
-        process=Process.sequential,
-        verbose=False,
-    )
-    result = crew.kickoff()
+    crew = _get_crew("classify_request", agents["classifier"], verbose=False)
+    result = crew.kickoff(inputs={"query": query})
     raw = result.raw.strip().lower()
 
     return _normalize_category(raw)
 
 
-def _normalize_category(raw: str) -> str:
+# Fallback keywords per category, in priority order. The category names
+# themselves are checked first (Stage 1) in the same order.
+_CATEGORY_KEYWORDS: tuple[tuple[str, frozenset[str]], ...] = (
+    ("password_reset", frozenset({"password", "lockout", "locked", "mfa", "login"})),
+    ("software_issue", frozenset({"software", "install", "crash", "update", "app"})),
+    ("network_issue", frozenset({
+        "network", "vpn", "wifi", "wi-fi", "internet", "dns", "connectivity",
+    })),
+    ("hardware_issue", frozenset({
+        "hardware", "laptop", "printer", "monitor", "keyboard", "mouse",
+    })),
+)
+_CATEGORIES = frozenset(category for category, _ in _CATEGORY_KEYWORDS)
+
+
+# Stage 1 category names and Stage 2 keywords compiled into one pattern.
+# Each alternative is a named group ``r<rank>`` (lower rank wins). The
+# lookahead reports a match at every offset, so overlapping keywords can't
+# hide a higher-ranked category.
+_RANKED_CATEGORIES: tuple[Category, ...] = tuple(c for c, _ in _CATEGORY_KEYWORDS) * 2
+_CATEGORY_RE = re.compile(
+    "(?="
+    + "|".join(
+        f"(?P<r{rank}>{'|'.join(map(re.escape, terms))})"
+        for rank, terms in enumerate(
+            [(c,) for c, _ in _CATEGORY_KEYWORDS]
+            + [sorted(keywords) for _, keywords in _CATEGORY_KEYWORDS]
+        )
+    )
+    + ")"
+)
+
+
+def _normalize_category(raw: str) -> Category:
     """Normalize raw classifier output to a valid category.
 
-    Uses a two-stage matching strategy:
+    Uses a two-stage matching strategy in a single regex scan:
     1. Direct category keyword match
     2. Fallback keyword match for natural language variations
     """
-    # Stage 1: direct category match
-    if "password_reset" in raw:
-        return "password_reset"
-    if "software_issue" in raw:
-        return "software_issue"
-    if "network_issue" in raw:
-        return "network_issue"
-    if "hardware_issue" in raw:
-        return "hardware_issue"
-
-    # Stage 2: fallback keyword match
-    if any(kw in raw for kw in ("password", "lockout", "locked", "mfa", "login")):
-        return "password_reset"
-    if any(kw in raw for kw in ("software", "install", "crash", "update", "app")):
-        return "software_issue"
-    if any(kw in raw for kw in (
-        "network", "vpn", "wifi", "wi-fi", "internet", "dns", "connectivity",
-    )):
-        return "network_issue"
-    if any(kw in raw for kw in (
-        "hardware", "laptop", "printer", "monitor", "keyboard", "mouse",
-    )):
-        return "hardware_issue"
+    # Fast path: the classifier usually answers with the bare label
+    if raw in _CATEGORIES:
+        return raw
+
+    rank = min(
+        (int(m.lastgroup[1:]) for m in _CATEGORY_RE.finditer(raw)),
+        default=None,
+    )
+    if rank is not None:
+        return _RANKED_CATEGORIES[rank]
 
     # Default fallback
     return "software_issue"
 
 
+# Category -> (task key, agent key) used to route a request to its specialist.
+_ROUTES: dict[Category, tuple[str, str]] = {
+    "password_reset": ("reset_password", "password_reset"),
+    "software_issue": ("troubleshoot_software", "software_troubleshooter"),
+    "network_issue": ("diagnose_network", "network_support"),
+    "hardware_issue": ("handle_hardware", "hardware_support"),
+}
+
+
+def _run_specialist(
+    category: Category, query: str, agents: dict[str, Agent]
+) -> str:
+    """Run the specialist agent for a category on a single query."""
+    task_key, agent_key = _ROUTES[category]
+    crew = _get_crew(task_key, agents[agent_key])
+    return crew.kickoff(inputs={"query": query}).raw
+
+
 def handle_request(query: str) -> HelpdeskResult:
     """Process an IT support request through the full helpdesk pipeline."""
     # Step 1: Classify
@@ -184,29 +317,130 @@ def handle_request(query: str) -> HelpdeskResult:
 
     # Step 2: Route to specialist
     agents = _create_agents()
+    response = _run_specialist(category, query, agents)
 
-    task_map = {
-        "password_reset": ("reset_password", agents["password_reset"]),
-        "software_issue": (
-            "troubleshoot_software",
-            agents["software_troubleshooter"],
+    return HelpdeskResult(
+        query=query,
+        category=category,
+        response=response,
+    )
+
+
+# ─── Batch Processing ────────────────────────────────────────────────────────
+
+_BATCH_MARKER_RE = re.compile(r"\n\s*\[(\d+)\]\s*")
+
+_BATCH_INSTRUCTIONS = (
+    "\n\nThe employee requests above are numbered. Handle each one "
+    "independently and start each answer on a new line with its number "
+    "in square brackets, e.g. [1]."
+)
+
+
+def _create_batch_task(
+    task_key: str,
+    agent: Agent,
+    queries: list[str],
+) -> Task:
+    """Create a task that handles several numbered queries in one LLM call."""
+    tasks_config = _load_yaml("tasks.yaml")
+    task_cfg = tasks_config[task_key]
+    numbered = "\n".join(f"[{i}] {q}" for i, q in enumerate(queries, 1))
+
+    return Task(
+        description=(
+            task_cfg["description"].replace("{query}", f"\n{numbered}\n")
+            + _BATCH_INSTRUCTIONS
         ),
-        "network_issue": ("diagnose_network", agents["network_support"]),
-        "hardware_issue": ("handle_hardware", agents["hardware_support"]),
-    }
+        expected_output=(
+            f"For each numbered request, prefixed with its [n] marker:\n"
+            f"{task_cfg['expected_output']}"
+        ),
+        agent=agent,
+    )
+
+
+def _split_batch_output(raw: str, count: int) -> dict[int, str]:
+    """Split numbered batch output into ``{n: answer}`` for n in 1..count."""
+    parts = _BATCH_MARKER_RE.split("\n" + raw)
+    answers: dict[int, str] = {}
+    for number, text in zip(parts[1::2], parts[2::2]):
+        n = int(number)
+        if 1 <= n <= count and n not in answers:
+            answers[n] = text.strip()
+    return answers
 
-    task_key, agent = task_map[category]
-    task = _create_task(task_key, agent, query)
+
+def batch_classify_requests(queries: list[str]) -> list[Category]:
+    """Classify several IT support requests with a single classifier call.
+
+    Requests whose label is missing from the batched output are
+    classified individually with ``classify_request``.
+    """
+    if len(queries) <= 1:
+        return [classify_request(q) for q in queries]
+
+    agents = _create_agents()
+    task = _create_batch_task("classify_request", agents["classifier"], queries)
 
     crew = Crew(
-        agents=[agent],
+        agents=[agents["classifier"]],
         tasks=[task],
         process=Process.sequential,
+        verbose=False,
     )
-    result = crew.kickoff()
+    answers = _split_batch_output(crew.kickoff().raw, len(queries))
 
-    return HelpdeskResult(
-        query=query,
-        category=category,
-        response=result.raw,
-    )
+    return [
+        _normalize_category(answers[n].lower()) if n in answers
+        else classify_request(query)
+        for n, query in enumerate(queries, 1)
+    ]
+
+
+def batch_handle_requests(queries: list[str]) -> list[HelpdeskResult]:
+    """Process several IT support requests with one specialist call per category.
+
+    Requests are classified in one batched call, grouped by category, and
+    each group is answered by its specialist in a single call. Results are
+    returned in the same order as ``queries``.
+    """
+    if not queries:
+        return []
+
+    categories = batch_classify_requests(queries)
+
+    groups: dict[Category, list[int]] = defaultdict(list)
+    for i, category in enumerate(categories):
+        groups[category].append(i)
+
+    agents = _create_agents()
+    responses = [""] * len(queries)
+
+    for category, indices in groups.items():
+        if len(indices) == 1:
+            i = indices[0]
+            responses[i] = _run_specialist(category, queries[i], agents)
+            continue
+
+        task_key, agent_key = _ROUTES[category]
+        agent = agents[agent_key]
+        task = _create_batch_task(task_key, agent, [queries[i] for i in indices])
+
+        crew = Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+        )
+        answers = _split_batch_output(crew.kickoff().raw, len(indices))
+
+        for n, i in enumerate(indices, 1):
+            if n in answers:
+                responses[i] = answers[n]
+            else:
+                responses[i] = _run_specialist(category, queries[i], agents)
+
+    return [
+        HelpdeskResult(query=query, category=category, response=response)
+        for query, category, response in zip(queries, categories, responses)
+    ]
@@ -14,6 +14,7 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 from pathlib import Path
 
@@ -46,6 +47,11 @@ def main() -> None:
     )
     args = parser.parse_args()
 
+    # Agent traces are only useful interactively; keep one-shot and batch
+    # runs quiet unless VERBOSE is set explicitly.
+    if args.query or args.file:
+        os.environ.setdefault("VERBOSE", "false")
+
     if args.query:
         # Single query mode
         _process_request(args.query, args.classify_only)
@@ -57,14 +63,12 @@ def main() -> None:
             print(f"Error: File not found: {filepath}")
             sys.exit(1)
 
-        queries = filepath.read_text(encoding="utf-8").strip().splitlines()
-        for i, query in enumerate(queries, 1):
-            query = query.strip()
-            if query and not query.startswith("#"):
-                print(f"\n{'='*60}")
-                print(f"Request {i}/{len(queries)}")
-                print(f"{'='*60}")
-                _process_request(query, args.classify_only)
+        lines = filepath.read_text(encoding="utf-8").strip().splitlines()
+        queries = [
+            line.strip() for line in lines
+            if line.strip() and not line.strip().startswith("#")
+        ]
+        _process_batch(queries, args.classify_only)
 
     else:
         # Interactive mode
@@ -100,5 +104,30 @@ def _process_request(query: str, classify_only: bool = False) -> None:
         print(f"\nResponse:\n{result.response}")
 
 
+def _process_batch(queries: list[str], classify_only: bool = False) -> None:
+    """Process a batch of IT support requests with batched LLM calls."""
+    from it_helpdesk.crew import batch_classify_requests, batch_handle_requests
+
+    if classify_only:
+        categories = batch_classify_requests(queries)
+        responses: list[str | None] = [None] * len(queries)
+    else:
+        results = batch_handle_requests(queries)
+        categories = [r.category for r in results]
+        responses = [r.response for r in results]
+
+    for i, (query, category, response) in enumerate(
+        zip(queries, categories, responses), 1
+    ):
+        print(f"\n{'='*60}")
+        print(f"Request {i}/{len(queries)}")
+        print(f"{'='*60}")
+        print(f"\nProcessing: {query}")
+        print("-" * 40)
+        print(f"Category: {category}")
+        if response is not None:
+            print(f"\nResponse:\n{response}")
+
+
 if __name__ == "__main__":
     main()
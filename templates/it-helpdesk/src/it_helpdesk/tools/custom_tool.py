@@ -1,7 +1,287 @@
 """Custom tools for the IT helpdesk agent."""
 
+import heapq
+import math
+import os
+import re
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
 from crewai.tools import tool
 
+# ─── Sample Data ─────────────────────────────────────────────────────────────
+
+_SAMPLE_TICKETS: dict[str, dict[str, str]] = {
+    "TKT-001": {
+        "status": "In Progress",
+        "category": "password_reset",
+        "summary": "Account lockout after failed MFA attempts",
+        "assignee": "IAM Team",
+        "priority": "High",
+        "created": "2026-02-14 09:30",
+        "updated": "2026-02-14 10:15",
+        "notes": "User verified via manager callback. Temporary password issued.",
+    },
+    "TKT-002": {
+        "status": "Open",
+        "category": "software_issue",
+        "summary": "Microsoft Teams crashes on startup after update",
+        "assignee": "Software Support",
+        "priority": "Medium",
+        "created": "2026-02-14 11:00",
+        "updated": "2026-02-14 11:00",
+        "notes": "Awaiting remote session to collect crash logs.",
+    },
+    "TKT-003": {
+        "status": "Resolved",
+        "category": "network_issue",
+        "summary": "VPN disconnects every 30 minutes",
+        "assignee": "Network Engineering",
+        "priority": "Medium",
+        "created": "2026-02-13 14:00",
+        "updated": "2026-02-14 16:30",
+        "notes": "Root cause: split-tunnel config conflict. Updated VPN profile.",
+    },
+    "TKT-004": {
+        "status": "Waiting for Parts",
+        "category": "hardware_issue",
+        "summary": "Laptop keyboard keys sticking — replacement needed",
+        "assignee": "Hardware Support",
+        "priority": "Low",
+        "created": "2026-02-12 10:00",
+        "updated": "2026-02-14 09:00",
+        "notes": "Replacement keyboard ordered. ETA 3 business days.",
+    },
+    "TKT-005": {
+        "status": "Escalated",
+        "category": "network_issue",
+        "summary": "Entire floor losing Wi-Fi intermittently",
+        "assignee": "Network Engineering",
+        "priority": "Critical",
+        "created": "2026-02-14 08:00",
+        "updated": "2026-02-14 12:00",
+        "notes": "AP firmware issue identified. Maintenance window scheduled tonight.",
+    },
+}
+
+_SERVICE_STATUSES: dict[str, dict[str, str]] = {
+    "vpn": {
+        "service": "Corporate VPN (GlobalProtect)",
+        "status": "Operational",
+        "uptime": "99.8%",
+        "last_incident": "2026-02-10 — Brief outage during maintenance",
+        "notes": "All VPN gateways healthy.",
+    },
+    "email": {
+        "service": "Email (Microsoft 365 Exchange Online)",
+        "status": "Operational",
+        "uptime": "99.95%",
+        "last_incident": "2026-01-28 — Delayed delivery for 15 minutes",
+        "notes": "All mailflow normal.",
+    },
+    "teams": {
+        "service": "Microsoft Teams",
+        "status": "Degraded",
+        "uptime": "98.5%",
+        "last_incident": "2026-02-15 — Screen sharing issues reported",
+        "notes": "Microsoft investigating. Workaround: use browser version.",
+    },
+    "wifi": {
+        "service": "Corporate Wi-Fi (CorpNet / GuestNet)",
+        "status": "Partial Outage",
+        "uptime": "97.2%",
+        "last_incident": "2026-02-14 — Floor 3 AP firmware issue",
+        "notes": "Floor 3 intermittent. Fix scheduled tonight.",
+    },
+    "erp": {
+        "service": "SAP ERP System",
+        "status": "Operational",
+        "uptime": "99.9%",
+        "last_incident": "2026-02-01 — Planned maintenance window",
+        "notes": "All modules operational.",
+    },
+    "printing": {
+        "service": "Network Printing (PaperCut)",
+        "status": "Operational",
+        "uptime": "99.5%",
+        "last_incident": "2026-02-08 — Print queue stuck on Floor 2",
+        "notes": "All printers online.",
+    },
+    "active_directory": {
+        "service": "Active Directory / Azure AD",
+        "status": "Operational",
+        "uptime": "99.99%",
+        "last_incident": "2026-01-15 — Sync delay resolved",
+        "notes": "All domain controllers healthy. Azure AD Connect syncing.",
+    },
+}
+
+
+def _render(record: dict[str, str]) -> str:
+    """Render a record as ``**Field Name**: value`` lines."""
+    return "\n".join(
+        f"**{k.replace('_', ' ').title()}**: {v}" for k, v in record.items()
+    )
+
+
+def _build_service_index() -> dict[str, str]:
+    """Map every accepted spelling of a service to its rendered status.
+
+    Accepts the key (``active_directory``), the key with spaces
+    (``active directory``) and the full service name
+    (``active directory / azure ad``), all lowercased.
+    """
+    index: dict[str, str] = {}
+    for key, status in _SERVICE_STATUSES.items():
+        rendered = _render(status)
+        for alias in (key, key.replace("_", " "), status["service"]):
+            index[alias.lower()] = rendered
+    return index
+
+
+# Tool output is static, so render it once at import.
+_TICKET_RENDERED = {k.upper(): _render(v) for k, v in _SAMPLE_TICKETS.items()}
+_SERVICE_RENDERED = _build_service_index()
+_AVAILABLE_SERVICES = ", ".join(sorted(_SERVICE_STATUSES))
+
+# ─── Knowledge Base Index ────────────────────────────────────────────────────
+
+_KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+
+# BM25 ranking parameters
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+_SECTION_SEPARATOR = "\x00"
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for",
+    "from", "how", "i", "if", "in", "is", "it", "my", "of", "on", "or",
+    "the", "to", "with", "you", "your",
+})
+
+
+class _KnowledgeIndex(NamedTuple):
+    """Knowledge base sections with a BM25 inverted index."""
+
+    sections: tuple[str, ...]  # display text, truncated to 800 characters
+    postings: dict[str, dict[int, int]]  # term -> {section index: frequency}
+    lengths: tuple[int, ...]  # number of terms in each section
+    avg_length: float
+    corpus: str  # all sections lowercased, joined by _SECTION_SEPARATOR
+    offsets: tuple[int, ...]  # start of each section within corpus
+
+
+def _tokenize(text: str) -> list[str]:
+    """Split text into lowercase terms, dropping stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+@cache
+def _load_kb_index() -> _KnowledgeIndex:
+    """Read, split and index the knowledge base once.
+
+    Files are read concurrently (the GIL is released during I/O) and split
+    into ``### `` sections, which are tokenized into a term -> postings map
+    so queries only touch the sections that contain their terms.
+    """
+    paths = sorted(_KNOWLEDGE_DIR.glob("*.md"))
+    workers = min(8, os.cpu_count() or 1, len(paths) or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        contents = list(
+            executor.map(lambda path: path.read_text(encoding="utf-8"), paths)
+        )
+    sections = [
+        section for content in contents for section in content.split("\n### ")
+    ]
+
+    postings: dict[str, dict[int, int]] = defaultdict(dict)
+    lengths: list[int] = []
+    for i, section in enumerate(sections):
+        terms = _tokenize(section)
+        lengths.append(len(terms))
+        for term, count in Counter(terms).items():
+            postings[term][i] = count
+
+    # Offsets must come from the lowercased text: lowercasing can lengthen a
+    # string ("İ".lower() is two characters)
+    sections_lower = [section.lower() for section in sections]
+    offsets: list[int] = []
+    start = 0
+    for section_lower in sections_lower:
+        offsets.append(start)
+        start += len(section_lower) + len(_SECTION_SEPARATOR)
+
+    return _KnowledgeIndex(
+        sections=tuple(section.strip()[:800] for section in sections),
+        postings=dict(postings),
+        lengths=tuple(lengths),
+        avg_length=sum(lengths) / len(lengths) if lengths else 0.0,
+        corpus=_SECTION_SEPARATOR.join(sections_lower),
+        offsets=tuple(offsets),
+    )
+
+
+def _bm25_search(query: str, limit: int) -> tuple[str, ...]:
+    """Return up to ``limit`` sections ranked by BM25 score for ``query``."""
+    return _rank_sections(frozenset(_tokenize(query)), limit)
+
+
+@lru_cache(maxsize=256)
+def _rank_sections(terms: frozenset[str], limit: int) -> tuple[str, ...]:
+    """Rank sections for a set of query terms.
+
+    Memoized on the normalized terms, so queries differing only in case,
+    punctuation, word order or stopwords share one cache entry.
+    """
+    index = _load_kb_index()
+    n = len(index.sections)
+    scores: dict[int, float] = defaultdict(float)
+
+    for term in terms:
+        postings = index.postings.get(term)
+        if not postings:
+            continue
+        idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+        for i, tf in postings.items():
+            norm = tf + _BM25_K1 * (
+                1 - _BM25_B + _BM25_B * index.lengths[i] / index.avg_length
+            )
+            scores[i] += idf * tf * (_BM25_K1 + 1) / norm
+
+    ranked = heapq.nlargest(limit, scores, key=lambda i: (scores[i], -i))
+    return tuple(index.sections[i] for i in ranked)
+
+
+def _substring_search(query: str, limit: int) -> tuple[str, ...]:
+    """Return up to ``limit`` sections containing ``query``, in file order.
+
+    Scans the concatenated corpus with ``str.find`` and maps each hit back
+    to its section by bisecting the offset table, then resumes the scan at
+    the next section.
+    """
+    needle = query.lower()
+    if not needle.strip() or _SECTION_SEPARATOR in needle:
+        return ()
+
+    index = _load_kb_index()
+    results: list[str] = []
+    pos = index.corpus.find(needle)
+    while pos != -1 and len(results) < limit:
+        i = bisect_right(index.offsets, pos) - 1
+        results.append(index.sections[i])
+        if i + 1 == len(index.offsets):
+            break
+        pos = index.corpus.find(needle, index.offsets[i + 1])
+    return tuple(results)
+
+
+# ─── Tools ───────────────────────────────────────────────────────────────────
+
 
 @tool("search_knowledge_base")
 def search_knowledge_base(query: str) -> str:
@@ -16,20 +296,11 @@ def search_knowledge_base(query: str) -> str:
     Returns:
         Matching knowledge base articles and procedures.
     """
-    from pathlib import Path
-
-    knowledge_dir = Path(__file__).parent.parent / "knowledge"
-    results: list[str] = []
-
-    for file in knowledge_dir.glob("*.md"):
-        content = file.read_text(encoding="utf-8")
-        sections = content.split("\n### ")
-        for section in sections:
-            if query.lower() in section.lower():
-                results.append(section.strip()[:800])
+    # Fall back to substring matching for partial words BM25 can't see
+    results = _bm25_search(query, limit=10) or _substring_search(query, limit=10)
 
     if results:
-        return "\n\n---\n\n".join(results[:10])
+        return "\n\n---\n\n".join(results)
     return f"No knowledge base articles found for: {query}"
 
 
@@ -46,66 +317,9 @@ def lookup_ticket(ticket_id: str) -> str:
     Returns:
         Ticket status and details.
     """
-    sample_tickets = {
-        "TKT-001": {
-            "status": "In Progress",
-            "category": "password_reset",
-            "summary": "Account lockout after failed MFA attempts",
-            "assignee": "IAM Team",
-            "priority": "High",
-            "created": "2026-02-14 09:30",
-            "updated": "2026-02-14 10:15",
-            "notes": "User verified via manager callback. Temporary password issued.",
-        },
-        "TKT-002": {
-            "status": "Open",
-            "category": "software_issue",
-            "summary": "Microsoft Teams crashes on startup after update",
-            "assignee": "Software Support",
-            "priority": "Medium",
-            "created": "2026-02-14 11:00",
-            "updated": "2026-02-14 11:00",
-            "notes": "Awaiting remote session to collect crash logs.",
-        },
-        "TKT-003": {
-            "status": "Resolved",
-            "category": "network_issue",
-            "summary": "VPN disconnects every 30 minutes",
-            "assignee": "Network Engineering",
-            "priority": "Medium",
-            "created": "2026-02-13 14:00",
-            "updated": "2026-02-14 16:30",
-            "notes": "Root cause: split-tunnel config conflict. Updated VPN profile.",
-        },
-        "TKT-004": {
-            "status": "Waiting for Parts",
-            "category": "hardware_issue",
-            "summary": "Laptop keyboard keys sticking — replacement needed",
-            "assignee": "Hardware Support",
-            "priority": "Low",
-            "created": "2026-02-12 10:00",
-            "updated": "2026-02-14 09:00",
-            "notes": "Replacement keyboard ordered. ETA 3 business days.",
-        },
-        "TKT-005": {
-            "status": "Escalated",
-            "category": "network_issue",
-            "summary": "Entire floor losing Wi-Fi intermittently",
-            "assignee": "Network Engineering",
-            "priority": "Critical",
-            "created": "2026-02-14 08:00",
-            "updated": "2026-02-14 12:00",
-            "notes": "AP firmware issue identified. Maintenance window scheduled tonight.",
-        },
-    }
-
-    ticket = sample_tickets.get(ticket_id.upper())
-    if ticket:
-        lines = [
-            f"**{k.replace('_', ' ').title()}**: {v}"
-            for k, v in ticket.items()
-        ]
-        return "\n".join(lines)
+    rendered = _TICKET_RENDERED.get(ticket_id.strip().upper())
+    if rendered:
+        return rendered
     return (
         f"Ticket not found: {ticket_id}. "
         "Please check the ticket ID and try again."
@@ -126,69 +340,11 @@ def check_system_status(service_name: str) -> str:
     Returns:
         Current service status information.
     """
-    service_statuses = {
-        "vpn": {
-            "service": "Corporate VPN (GlobalProtect)",
-            "status": "Operational",
-            "uptime": "99.8%",
-            "last_incident": "2026-02-10 — Brief outage during maintenance",
-            "notes": "All VPN gateways healthy.",
-        },
-        "email": {
-            "service": "Email (Microsoft 365 Exchange Online)",
-            "status": "Operational",
-            "uptime": "99.95%",
-            "last_incident": "2026-01-28 — Delayed delivery for 15 minutes",
-            "notes": "All mailflow normal.",
-        },
-        "teams": {
-            "service": "Microsoft Teams",
-            "status": "Degraded",
-            "uptime": "98.5%",
-            "last_incident": "2026-02-15 — Screen sharing issues reported",
-            "notes": "Microsoft investigating. Workaround: use browser version.",
-        },
-        "wifi": {
-            "service": "Corporate Wi-Fi (CorpNet / GuestNet)",
-            "status": "Partial Outage",
-            "uptime": "97.2%",
-            "last_incident": "2026-02-14 — Floor 3 AP firmware issue",
-            "notes": "Floor 3 intermittent. Fix scheduled tonight.",
-        },
-        "erp": {
-            "service": "SAP ERP System",
-            "status": "Operational",
-            "uptime": "99.9%",
-            "last_incident": "2026-02-01 — Planned maintenance window",
-            "notes": "All modules operational.",
-        },
-        "printing": {
-            "service": "Network Printing (PaperCut)",
-            "status": "Operational",
-            "uptime": "99.5%",
-            "last_incident": "2026-02-08 — Print queue stuck on Floor 2",
-            "notes": "All printers online.",
-        },
-        "active_directory": {
-            "service": "Active Directory / Azure AD",
-            "status": "Operational",
-            "uptime": "99.99%",
-            "last_incident": "2026-01-15 — Sync delay resolved",
-            "notes": "All domain controllers healthy. Azure AD Connect syncing.",
-        },
-    }
-
-    key = service_name.strip().lower().replace(" ", "_")
-    status = service_statuses.get(key)
-    if status:
-        lines = [
-            f"**{k.replace('_', ' ').title()}**: {v}"
-            for k, v in status.items()
-        ]
-        return "\n".join(lines)
-
-    available = ", ".join(sorted(service_statuses.keys()))
+    rendered = _SERVICE_RENDERED.get(service_name.strip().lower())
+    if rendered:
+        return rendered
+
     return (
         f"Service '{service_name}' not found. "
-        f"Available services: {available}"
+        f"Available services: {_AVAILABLE_SERVICES}"
     )
@@ -10,7 +10,12 @@ It includes a classifier agent that routes requests to specialized agents:
 
 from __future__ import annotations
 
+import asyncio
 import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
 from pathlib import Path
 from typing import Literal
 
@@ -20,12 +25,35 @@ from pydantic import BaseModel
 
 # ─── Configuration ───────────────────────────────────────────────────────────
 
+# libyaml's C parser when PyYAML was built with it (all binary wheels are)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# filename -> (mtime, size, parsed config)
+_YAML_CACHE: dict[str, tuple[float, int, dict]] = {}
+
 
 def _load_yaml(filename: str) -> dict:
-    """Load a YAML configuration file."""
+    """Load a YAML configuration file.
+
+    Parsed configs are cached per process and re-parsed only when the file's
+    mtime or size changes. The cached dict is shared between callers, so it
+    must be treated as read-only.
+    """
     filepath = Path(__file__).parent / "config" / filename
-    with open(filepath, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    stat = filepath.stat()
+    cached = _YAML_CACHE.get(filename)
+    if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+
+    with open(filepath, "rb") as f:
+        config = yaml.load(f, Loader=_YAML_LOADER)
+    _YAML_CACHE[filename] = (stat.st_mtime, stat.st_size, config)
+    return config
+
+
+# Parse both configs at import so the first query finds them cached
+_load_yaml("agents.yaml")
+_load_yaml("tasks.yaml")
 
 
 # ─── State ───────────────────────────────────────────────────────────────────
@@ -40,8 +68,28 @@ class AnalysisResult(BaseModel):
 
 # ─── Agent Factory ───────────────────────────────────────────────────────────
 
+# lru_cache doesn't stop two threads building at once (e.g. the interactive
+# warm-up thread and the first query), so builds are serialized
+_AGENTS_LOCK = threading.Lock()
+
+
 def _create_agents() -> dict[str, Agent]:
-    """Create agents from YAML configuration."""
+    """Create agents from YAML configuration.
+
+    Agents are built once per distinct (MODEL, CLASSIFIER_MODEL, VERBOSE)
+    combination and reused for the rest of the process.
+    """
+    with _AGENTS_LOCK:
+        return _build_agents(
+            os.getenv("MODEL", "gpt-4o"),
+            os.getenv("CLASSIFIER_MODEL", "gpt-4o-mini"),
+            os.getenv("VERBOSE", "true").lower() == "true",
+        )
+
+
+@lru_cache(maxsize=1)
+def _build_agents(model: str, classifier_model: str, verbose: bool) -> dict[str, Agent]:
+    """Build all agents for the given model settings."""
     from legal_document_analyzer.tools.custom_tool import (
         compare_document_sections,
         get_document_sections,
@@ -49,9 +97,6 @@ def _create_agents() -> dict[str, Agent]:
     )
 
     agents_config = _load_yaml("agents.yaml")
-    model = os.getenv("MODEL", "gpt-4o")
-    classifier_model = os.getenv("CLASSIFIER_MODEL", "gpt-4o-mini")
-    verbose = os.getenv("VERBOSE", "true").lower() == "true"
 
     return {
         "classifier": Agent(
@@ -96,82 +141,393 @@ def _create_agents() -> dict[str, Agent]:
     }
 
 
+def _reset_agents() -> None:
+    """Drop the memoized agents, the crews built on them and cached results."""
+    _build_agents.cache_clear()
+    _CREWS.clear()
+    _CLASSIFY_CACHE.clear()
+    _RESULT_CACHE.clear()
+
+
 # ─── Task Factory ────────────────────────────────────────────────────────────
 
-def _create_task(
-    task_key: str,
-    agent: Agent,
-    query: str,
-) -> Task:
-    """Create a task from YAML configuration with query interpolation."""
+def _create_task(task_key: str, agent: Agent) -> Task:
+    """Create a task from YAML configuration.
+
+    The description keeps its ``{query}`` placeholder; CrewAI fills it from
+    ``inputs`` when the crew is kicked off.
+    """
     tasks_config = _load_yaml("tasks.yaml")
     task_cfg = tasks_config[task_key]
 
     return Task(
-        description=task_cfg["description"].replace("{query}", query),
+        description=task_cfg["description"],
         expected_output=task_cfg["expected_output"],
         agent=agent,
     )
 
 
+# ─── Crew Cache ──────────────────────────────────────────────────────────────
+
+# task key -> (agent the crew was built for, crew)
+_CREWS: dict[str, tuple[Agent, Crew]] = {}
+
+
+def _get_crew(task_key: str, agent: Agent, **crew_kwargs) -> Crew:
+    """Return the reusable single-task crew for ``task_key``.
+
+    The task keeps its ``{query}`` placeholder and each kickoff passes
+    ``inputs={"query": ...}``; CrewAI re-interpolates from the original
+    description every time. The crew is rebuilt if the memoized agents
+    change. Kickoff mutates the task, so concurrent runs kick off a copy
+    instead (see :func:`_kickoff_async`).
+    """
+    cached = _CREWS.get(task_key)
+    if cached is None or cached[0] is not agent:
+        cached = (agent, _template_crew(task_key, agent, **crew_kwargs))
+        _CREWS[task_key] = cached
+    return cached[1]
+
+
+def _template_crew(task_key: str, agent: Agent, **crew_kwargs) -> Crew:
+    """Build a single-task crew that can serve any query passed via ``inputs``."""
+    return Crew(
+        agents=[agent],
+        tasks=[_create_task(task_key, agent)],
+        process=Process.sequential,
+        **crew_kwargs,
+    )
+
+
+# ─── Routing ─────────────────────────────────────────────────────────────────
+
+# category -> (task key, agent key)
+_ROUTES: dict[str, tuple[str, str]] = {
+    "clause_extraction": ("extract_clauses", "clause_extractor"),
+    "risk_analysis": ("analyze_risks", "risk_analyzer"),
+    "summarization": ("summarize_document", "summarizer"),
+    "comparison": ("compare_documents", "comparator"),
+}
+
+
+_CATEGORIES = frozenset(_ROUTES)
+
+# One alternation of lookaheads anchored at the start: alternatives are
+# tried in priority order, so a single match picks the highest-priority
+# category mentioned anywhere in the output (clause > risk > summar > compar).
+_CATEGORY_RE = re.compile(
+    r"(?=.*?(?P<clause_extraction>clause))"
+    r"|(?=.*?(?P<risk_analysis>risk_analysis|risk.*?analy|analy.*?risk))"
+    r"|(?=.*?(?P<summarization>summar))"
+    r"|(?=.*?(?P<comparison>compar))",
+    re.DOTALL,
+)
+
+
+def _normalize_category(raw: str) -> str:
+    """Map raw classifier output to a known category."""
+    raw = raw.strip().casefold()
+    if raw in _CATEGORIES:
+        return raw
+    match = _CATEGORY_RE.match(raw)
+    return match.lastgroup if match else "summarization"  # default fallback
+
+
+# Keywords that unambiguously signal a category in the user's own request
+_QUERY_KEYWORDS: dict[str, re.Pattern[str]] = {
+    "clause_extraction": re.compile(r"\bclauses?\b|\bextract|\bprovisions?\b"),
+    "risk_analysis": re.compile(r"\brisk|\bunfavou?rable\b|\bred flags?\b"),
+    "summarization": re.compile(r"\bsummar|\boverview\b|\btl;?dr\b"),
+    "comparison": re.compile(r"\bcompar|\bdiffer|\bversus\b|\bvs\.?\b"),
+}
+
+
+def _heuristic_classify(query: str) -> str | None:
+    """Classify a request locally when exactly one category's keywords match.
+
+    Returns None for ambiguous or keyword-free requests, which still go to
+    the LLM classifier.
+    """
+    query = query.casefold()
+    matches = [cat for cat, pattern in _QUERY_KEYWORDS.items() if pattern.search(query)]
+    return matches[0] if len(matches) == 1 else None
+
+
+# ─── Result Caches ───────────────────────────────────────────────────────────
+
+_CLASSIFY_CACHE_SIZE = 512
+_RESULT_CACHE_SIZE = 256
+
+# (normalized query, classifier model) -> category
+_CLASSIFY_CACHE: OrderedDict[tuple[str, ...], str] = OrderedDict()
+# (normalized query, category, models, knowledge base version) -> result
+_RESULT_CACHE: OrderedDict[tuple, AnalysisResult] = OrderedDict()
+
+
+def _normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as a cache key."""
+    return " ".join(query.casefold().split())
+
+
+def _classify_key(query: str) -> tuple[str, ...]:
+    return (_normalize_query(query), os.getenv("CLASSIFIER_MODEL", "gpt-4o-mini"))
+
+
+def _result_key(query: str, category: str | None) -> tuple:
+    from legal_document_analyzer.tools.custom_tool import knowledge_base_version
+
+    return (
+        *_classify_key(query),
+        category,
+        os.getenv("MODEL", "gpt-4o"),
+        knowledge_base_version(),
+    )
+
+
+def _cache_get(cache: OrderedDict, key: tuple):
+    """Return the cached value for ``key`` (marking it recently used), or None."""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict, key: tuple, value: object, maxsize: int) -> None:
+    """Store ``value`` and evict the least recently used entries beyond ``maxsize``."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def _cached_result(query: str, key: tuple) -> AnalysisResult | None:
+    """Cached result for ``key``, re-labelled with this exact query text."""
+    hit = _cache_get(_RESULT_CACHE, key)
+    return hit.model_copy(update={"query": query}) if hit is not None else None
+
+
 # ─── Main Processing Functions ───────────────────────────────────────────────
 
-def classify_request(query: str) -> str:
+def classify_request(query: str, agents: dict[str, Agent] | None = None) -> str:
     """Classify a legal document analysis request.
 
     Returns one of: clause_extraction, risk_analysis, summarization, comparison.
     """
+    key = _classify_key(query)
+    cached = _cache_get(_CLASSIFY_CACHE, key)
+    if cached is not None:
+        return cached
+
+    agents = agents or _create_agents()
+    crew = _get_crew("classify_request", agents["classifier"], verbose=False)
+    result = crew.kickoff(inputs={"query": query})
+    category = _normalize_category(result.raw)
+    _cache_put(_CLASSIFY_CACHE, key, category, _CLASSIFY_CACHE_SIZE)
+    return category
+
+
+def analyze_document(query: str, category: str | None = None) -> AnalysisResult:
+    """Process a legal document analysis request through the full pipeline.
+
+    The LLM classifier only runs when ``category`` is not given and the
+    request's keywords don't settle it (see :func:`_heuristic_classify`).
+    Results are cached per normalized query until the models or the
+    knowledge base change.
+    """
+    key = _result_key(query, category)
+    cached = _cached_result(query, key)
+    if cached is not None:
+        return cached
+
     agents = _create_agents()
-    task = _create_task("classify_request", agents["classifier"], query)
 
-    crew = Crew(
-        agents=[agents["classifier"]],
-        tasks=[task],
-        process=Process.sequential,
-        verbose=False,
-    )
-    result = crew.kickoff()
-    raw = result.raw.strip().lower()
-
-    # Normalize the output
-    if "clause_extraction" in raw or ("clause" in raw and "extract" in raw) or "clause" in raw:
-        return "clause_extraction"
-    elif "risk_analysis" in raw or ("risk" in raw and "analy" in raw):
-        return "risk_analysis"
-    elif "summarization" in raw or "summar" in raw:
-        return "summarization"
-    elif "comparison" in raw or "compar" in raw:
-        return "comparison"
-    return "summarization"  # default fallback
-
-
-def analyze_document(query: str) -> AnalysisResult:
-    """Process a legal document analysis request through the full pipeline."""
     # Step 1: Classify
-    category = classify_request(query)
+    category = category or _heuristic_classify(query) or classify_request(query, agents)
 
     # Step 2: Route to specialist
-    agents = _create_agents()
+    task_key, agent_key = _ROUTES[category]
+    result = _get_crew(task_key, agents[agent_key]).kickoff(inputs={"query": query})
 
-    task_map = {
-        "clause_extraction": ("extract_clauses", agents["clause_extractor"]),
-        "risk_analysis": ("analyze_risks", agents["risk_analyzer"]),
-        "summarization": ("summarize_document", agents["summarizer"]),
-        "comparison": ("compare_documents", agents["comparator"]),
-    }
+    analysis = AnalysisResult(
+        query=query,
+        category=category,
+        response=result.raw,
+    )
+    _cache_put(_RESULT_CACHE, key, analysis, _RESULT_CACHE_SIZE)
+    return analysis
 
-    task_key, agent = task_map[category]
-    task = _create_task(task_key, agent, query)
 
-    crew = Crew(
-        agents=[agent],
-        tasks=[task],
-        process=Process.sequential,
-    )
-    result = crew.kickoff()
+# ─── Async Processing ────────────────────────────────────────────────────────
+
+async def _kickoff_async(task_key: str, agent: Agent, query: str, **crew_kwargs) -> str:
+    """Run a single-task crew without blocking the event loop.
+
+    Kickoff mutates the task, so each run kicks off its own copy of the
+    :func:`_get_crew` crew; the copy gets fresh tasks and agents but shares
+    their LLM client.
+    """
+    crew = _get_crew(task_key, agent, **crew_kwargs)
+    result = await crew.copy().kickoff_async(inputs={"query": query})
+    return result.raw
+
+
+async def aclassify_request(query: str, agents: dict[str, Agent] | None = None) -> str:
+    """Async variant of :func:`classify_request`."""
+    agents = agents or _create_agents()
+    raw = await _kickoff_async("classify_request", agents["classifier"], query, verbose=False)
+    return _normalize_category(raw)
+
+
+async def aanalyze_document(
+    query: str,
+    speculative: bool = False,
+    category: str | None = None,
+) -> AnalysisResult:
+    """Async variant of :func:`analyze_document`.
+
+    Awaiting several of these with ``asyncio.gather`` overlaps their LLM
+    round-trips. With ``speculative=True`` every specialist starts alongside
+    the classifier and only the chosen one is kept, trading roughly four
+    times the tokens for one fewer round-trip on the critical path. Neither
+    applies when ``category`` is given or the keywords settle it.
+    """
+    key = _result_key(query, category)
+    cached = _cached_result(query, key)
+    if cached is not None:
+        return cached
+
+    agents = _create_agents()
+    category = category or _heuristic_classify(query)
+    if category is None and speculative:
+        analysis = await _analyze_speculative(query, agents)
+    else:
+        if category is None:
+            category = await aclassify_request(query, agents)
+        task_key, agent_key = _ROUTES[category]
+        analysis = AnalysisResult(
+            query=query,
+            category=category,
+            response=await _kickoff_async(task_key, agents[agent_key], query),
+        )
+
+    _cache_put(_RESULT_CACHE, key, analysis, _RESULT_CACHE_SIZE)
+    return analysis
+
+
+async def _analyze_speculative(query: str, agents: dict[str, Agent]) -> AnalysisResult:
+    """Run the classifier and all specialists at once, keeping the classifier's pick.
+
+    Cancelling the unused specialists stops us waiting on them, but their
+    in-flight LLM calls still complete in CrewAI's worker threads.
+    """
+    specialists = {
+        category: asyncio.create_task(_kickoff_async(task_key, agents[agent_key], query))
+        for category, (task_key, agent_key) in _ROUTES.items()
+    }
+    try:
+        category = await aclassify_request(query, agents)
+        response = await specialists[category]
+    finally:
+        for task in specialists.values():
+            task.cancel()
 
     return AnalysisResult(
         query=query,
         category=category,
-        response=result.raw,
+        response=response,
     )
+
+
+# ─── Batch Processing ────────────────────────────────────────────────────────
+
+async def _kickoff_for_each(crew: Crew, queries: list[str], concurrency: int) -> list[str]:
+    """Run ``crew`` once per query, at most ``concurrency`` runs at a time."""
+    step = max(1, concurrency)
+    raws: list[str] = []
+    for start in range(0, len(queries), step):
+        outputs = await crew.kickoff_for_each_async(
+            inputs=[{"query": query} for query in queries[start:start + step]],
+        )
+        raws.extend(output.raw for output in outputs)
+    return raws
+
+
+async def abatch_classify_requests(
+    queries: list[str],
+    concurrency: int = 4,
+    agents: dict[str, Agent] | None = None,
+) -> list[str]:
+    """Classify many requests through one classifier crew."""
+    if not queries:
+        return []
+    agents = agents or _create_agents()
+    crew = _template_crew("classify_request", agents["classifier"], verbose=False)
+    return [_normalize_category(raw) for raw in await _kickoff_for_each(crew, queries, concurrency)]
+
+
+async def abatch_analyze_documents(
+    queries: list[str],
+    concurrency: int = 4,
+    category: str | None = None,
+) -> list[AnalysisResult]:
+    """Analyze many requests, dispatching each category's queries together.
+
+    Cached results are reused and duplicate queries run only once. The rest
+    are categorized (``category`` if given, else keywords, else one batched
+    LLM classification); queries that share a category then run through a
+    single specialist crew. Results come back in input order.
+    """
+    if not queries:
+        return []
+
+    keys = [_result_key(query, category) for query in queries]
+    results = [_cached_result(query, key) for query, key in zip(queries, keys)]
+
+    pending: dict[tuple, int] = {}  # cache key -> first query position needing a run
+    for position, (key, result) in enumerate(zip(keys, results)):
+        if result is None:
+            pending.setdefault(key, position)
+
+    if pending:
+        fresh = await _abatch_run([queries[i] for i in pending.values()], concurrency, category)
+        fresh_by_key = dict(zip(pending, fresh))
+        for key, analysis in fresh_by_key.items():
+            _cache_put(_RESULT_CACHE, key, analysis, _RESULT_CACHE_SIZE)
+        results = [
+            result or fresh_by_key[key].model_copy(update={"query": query})
+            for query, key, result in zip(queries, keys, results)
+        ]
+    return results
+
+
+async def _abatch_run(
+    queries: list[str],
+    concurrency: int,
+    category: str | None,
+) -> list[AnalysisResult]:
+    """Categorize ``queries`` and run each category's group through one crew."""
+    agents = _create_agents()
+    categories = [category or _heuristic_classify(query) for query in queries]
+    unresolved = [i for i, cat in enumerate(categories) if cat is None]
+    if unresolved:
+        classified = await abatch_classify_requests(
+            [queries[i] for i in unresolved], concurrency, agents,
+        )
+        for i, cat in zip(unresolved, classified):
+            categories[i] = cat
+
+    groups: dict[str, list[int]] = defaultdict(list)
+    for index, cat in enumerate(categories):
+        groups[cat].append(index)
+
+    responses: dict[int, str] = {}
+    for cat, indices in groups.items():
+        task_key, agent_key = _ROUTES[cat]
+        crew = _template_crew(task_key, agents[agent_key])
+        raws = await _kickoff_for_each(crew, [queries[i] for i in indices], concurrency)
+        responses.update(zip(indices, raws))
+
+    return [
+        AnalysisResult(query=query, category=cat, response=responses[index])
+        for index, (query, cat) in enumerate(zip(queries, categories))
+    ]
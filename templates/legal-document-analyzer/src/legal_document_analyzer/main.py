@@ -7,15 +7,25 @@ Usage:
     # Single query mode
     python -m legal_document_analyzer --query "Summarize the NDA"
 
-    # Batch mode from file
-    python -m legal_document_analyzer --file queries.txt
+    # Skip classification entirely
+    python -m legal_document_analyzer --query "Summarize the NDA" --category summarization
+
+    # Speculative mode (all specialists start alongside the classifier)
+    python -m legal_document_analyzer --query "Summarize the NDA" --speculative
+
+    # Batch mode from file (queries run concurrently)
+    python -m legal_document_analyzer --file queries.txt --concurrency 4
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import sys
+import threading
+from collections.abc import Callable, Coroutine
 from pathlib import Path
+from typing import Any
 
 from dotenv import load_dotenv
 
@@ -44,11 +54,28 @@ def main() -> None:
         action="store_true",
         help="Only classify the request without generating a full analysis",
     )
+    parser.add_argument(
+        "--category",
+        choices=["clause_extraction", "risk_analysis", "summarization", "comparison"],
+        help="Skip classification and route straight to this specialist",
+    )
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Run every specialist alongside the classifier to cut latency "
+        "(uses roughly 4x the tokens)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of batch queries processed at once (default: 4)",
+    )
     args = parser.parse_args()
 
     if args.query:
         # Single query mode
-        _process_query(args.query, args.classify_only)
+        _process_query(args.query, args.classify_only, args.speculative, args.category)
 
     elif args.file:
         # Batch mode
@@ -57,36 +84,68 @@ def main() -> None:
             print(f"Error: File not found: {filepath}")
             sys.exit(1)
 
-        queries = filepath.read_text(encoding="utf-8").strip().splitlines()
-        for i, query in enumerate(queries, 1):
-            query = query.strip()
-            if query and not query.startswith("#"):
-                print(f"\n{'='*60}")
-                print(f"Query {i}/{len(queries)}")
-                print(f"{'='*60}")
-                _process_query(query, args.classify_only)
+        queries = [
+            line.strip()
+            for line in filepath.read_text(encoding="utf-8").splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+        asyncio.run(
+            _process_batch(queries, args.classify_only, args.concurrency, args.category)
+        )
 
     else:
         # Interactive mode
+        # Import CrewAI and build the agents while the user types the first query
+        threading.Thread(target=_warm_up, daemon=True).start()
+
         print("=" * 60)
         print("  AI Legal Document Analyzer")
         print("  Type 'quit' or 'exit' to stop")
         print("=" * 60)
 
-        while True:
-            print()
-            query = input("Query > ").strip()
-            if query.lower() in ("quit", "exit", "q"):
-                print("Goodbye!")
-                break
-            if not query:
-                continue
-            _process_query(query, args.classify_only)
-
-
-def _process_query(query: str, classify_only: bool = False) -> None:
-    """Process a single document analysis query."""
-    from legal_document_analyzer.crew import analyze_document, classify_request
+        # One event loop for the whole session instead of one per speculative query
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                print()
+                query = input("Query > ").strip()
+                if query.lower() in ("quit", "exit", "q"):
+                    print("Goodbye!")
+                    break
+                if not query:
+                    continue
+                _process_query(
+                    query, args.classify_only, args.speculative, args.category,
+                    run=loop.run_until_complete,
+                )
+        finally:
+            loop.close()
+
+
+def _warm_up() -> None:
+    """Import the crew module and build the agents ahead of the first query."""
+    from legal_document_analyzer.crew import _create_agents
+
+    _create_agents()
+
+
+def _process_query(
+    query: str,
+    classify_only: bool = False,
+    speculative: bool = False,
+    category: str | None = None,
+    run: Callable[[Coroutine[Any, Any, Any]], Any] = asyncio.run,
+) -> None:
+    """Process a single document analysis query.
+
+    ``run`` executes the async speculative pipeline; interactive mode passes
+    its long-lived loop's ``run_until_complete``.
+    """
+    from legal_document_analyzer.crew import (
+        aanalyze_document,
+        analyze_document,
+        classify_request,
+    )
 
     print(f"\nProcessing: {query}")
     print("-" * 40)
@@ -95,10 +154,44 @@ def _process_query(query: str, classify_only: bool = False) -> None:
         category = classify_request(query)
         print(f"Category: {category}")
     else:
-        result = analyze_document(query)
+        if speculative:
+            result = run(aanalyze_document(query, speculative=True, category=category))
+        else:
+            result = analyze_document(query, category)
         print(f"Category: {result.category}")
         print(f"\nAnalysis:\n{result.response}")
 
 
+async def _process_batch(
+    queries: list[str],
+    classify_only: bool = False,
+    concurrency: int = 4,
+    category: str | None = None,
+) -> None:
+    """Process batch queries together, printing results in input order.
+
+    Queries are classified in one batched call and then dispatched to each
+    specialist per category, with at most ``concurrency`` runs in flight.
+    """
+    from legal_document_analyzer.crew import abatch_analyze_documents, abatch_classify_requests
+
+    if classify_only:
+        results = await abatch_classify_requests(queries, concurrency)
+    else:
+        results = await abatch_analyze_documents(queries, concurrency, category)
+
+    for i, (query, result) in enumerate(zip(queries, results), 1):
+        print(f"\n{'='*60}")
+        print(f"Query {i}/{len(queries)}")
+        print(f"{'='*60}")
+        print(f"\nProcessing: {query}")
+        print("-" * 40)
+        if classify_only:
+            print(f"Category: {result}")
+        else:
+            print(f"Category: {result.category}")
+            print(f"\nAnalysis:\n{result.response}")
+
+
 if __name__ == "__main__":
     main()
@@ -1,7 +1,247 @@
 """Custom tools for the legal document analyzer agent."""
 
+from __future__ import annotations
+
+import math
+import os
+import pickle
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+
 from crewai.tools import tool
 
+# ─── Knowledge Index ─────────────────────────────────────────────────────────
+
+_KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+    "is", "it", "of", "on", "or", "the", "this", "to", "with",
+})
+
+
+class _Section(NamedTuple):
+    """A ``## `` section of a knowledge document, held as stripped UTF-8 bytes.
+
+    The lowercased copy used for phrase matching lives in the index's
+    ``sections_lower``.
+    """
+
+    stem: str
+    heading_lower: str
+    raw_bytes: bytes
+
+    @property
+    def text(self) -> str:
+        return self.raw_bytes.decode("utf-8")
+
+    def excerpt(self, limit: int) -> str:
+        """The first ``limit`` bytes, decoded straight from a memoryview slice.
+
+        A multi-byte character cut at the boundary is dropped.
+        """
+        return str(memoryview(self.raw_bytes)[:limit], "utf-8", "ignore")
+
+
+class _KnowledgeIndex(NamedTuple):
+    """An immutable snapshot of the knowledge base.
+
+    Tools read one snapshot per call and rebuilds swap in a whole new one,
+    so CrewAI's parallel tool execution never sees a half-built index.
+    """
+
+    sections: list[_Section]
+    # lowercased UTF-8 bytes of each section, by position, for phrase matching
+    sections_lower: list[bytes]
+    # term -> [(section position, L2-normalized TF-IDF weight)]
+    postings: dict[str, list[tuple[int, float]]]
+    idf: dict[str, float]
+    # document stem -> heading lines ("# ...", "## ...", ...) in document order
+    headings: dict[str, list[str]]
+    # lowercased document stem -> stem, in document order
+    stems: dict[str, str]
+    files: list[Path]
+    signature: tuple[int, ...]
+
+
+_INDEX: _KnowledgeIndex | None = None
+_INDEX_LOCK = threading.Lock()
+
+# Kept beside (not inside) the knowledge directory, whose mtime is part of
+# the index signature. Bump the version whenever _KnowledgeIndex changes.
+_INDEX_CACHE = _KNOWLEDGE_DIR.parent / ".knowledge_index.pkl"
+_INDEX_CACHE_VERSION = 5
+
+
+def _index_signature(files: list[Path]) -> tuple[int, ...]:
+    """mtimes of the knowledge directory and each indexed file.
+
+    Adding or removing a file changes the directory mtime; editing one in
+    place changes its own mtime.
+    """
+    return (_KNOWLEDGE_DIR.stat().st_mtime_ns, *(f.stat().st_mtime_ns for f in files))
+
+
+def _tokenize(text_lower: str) -> list[str]:
+    """Split lowercased text into content words."""
+    return [t for t in _TOKEN_RE.findall(text_lower) if t not in _STOPWORDS]
+
+
+def _build_postings(
+    index: list[_Section],
+) -> tuple[dict[str, list[tuple[int, float]]], dict[str, float]]:
+    """Build TF-IDF postings (smoothed IDF, L2-normalized rows) over the sections."""
+    counts = [Counter(_tokenize(section.text.lower())) for section in index]
+    doc_freq = Counter(term for tf in counts for term in tf)
+    n = len(index)
+    idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in doc_freq.items()}
+
+    postings: dict[str, list[tuple[int, float]]] = {}
+    for position, tf in enumerate(counts):
+        weights = {term: count * idf[term] for term, count in tf.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        for term, weight in weights.items():
+            postings.setdefault(term, []).append((position, weight / norm))
+    return postings, idf
+
+
+def _is_current(index: _KnowledgeIndex | None) -> bool:
+    """Whether ``index`` still matches the files on disk."""
+    try:
+        return index is not None and _index_signature(index.files) == index.signature
+    except OSError:
+        return False
+
+
+def _build_index() -> _KnowledgeIndex:
+    """Read and index every knowledge document."""
+    files = sorted(_KNOWLEDGE_DIR.glob("*.md"))
+    sections: list[_Section] = []
+    headings: dict[str, list[str]] = {}
+    for file in files:
+        content = file.read_text(encoding="utf-8")
+        headings[file.stem] = [
+            line.strip() for line in content.splitlines() if line.startswith("#")
+        ]
+        for section in content.split("\n## "):
+            heading = section.split("\n")[0].strip().lower()
+            sections.append(_Section(file.stem, heading, section.strip().encode("utf-8")))
+
+    # Lowercased through str so non-ASCII phrases match the same way
+    sections_lower = [section.text.lower().encode("utf-8") for section in sections]
+    postings, idf = _build_postings(sections)
+    stems = {file.stem.lower(): file.stem for file in files}
+    return _KnowledgeIndex(
+        sections, sections_lower, postings, idf, headings, stems, files,
+        _index_signature(files),
+    )
+
+
+def _read_index_cache() -> _KnowledgeIndex | None:
+    """Load the pickled index, or None if it is missing, stale or unreadable."""
+    try:
+        with open(_INDEX_CACHE, "rb") as f:
+            version, index = pickle.load(f)
+    except Exception:  # missing, truncated or written by an incompatible version
+        return None
+    if version != _INDEX_CACHE_VERSION or not _is_current(index):
+        return None
+    return index
+
+
+def _write_index_cache(index: _KnowledgeIndex) -> None:
+    """Atomically pickle ``index``; a read-only install just skips the cache."""
+    tmp_path = _INDEX_CACHE.with_name(f"{_INDEX_CACHE.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((_INDEX_CACHE_VERSION, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _INDEX_CACHE)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _load_index() -> _KnowledgeIndex:
+    """Return the knowledge index, rebuilding it when the knowledge base changes.
+
+    A fresh process first tries the pickled index written by an earlier run
+    (or by ``build_index_cache``) and only parses the markdown when the
+    pickle is missing or out of date.
+    """
+    global _INDEX
+
+    index = _INDEX
+    if _is_current(index):
+        return index
+
+    with _INDEX_LOCK:
+        # Another tool call may have rebuilt it while we waited for the lock
+        if _is_current(_INDEX):
+            return _INDEX
+
+        index = _read_index_cache()
+        if index is None:
+            index = _build_index()
+            _write_index_cache(index)
+        _INDEX = index
+        return index
+
+
+def knowledge_base_version() -> tuple[int, ...]:
+    """Signature of the current knowledge base; changes whenever a document does."""
+    return _load_index().signature
+
+
+def build_index_cache() -> None:
+    """Build the knowledge index and write its pickle cache (e.g. at image build)."""
+    index = _build_index()
+    _write_index_cache(index)
+    print(f"Indexed {len(index.sections)} sections from {len(index.files)} documents")
+
+
+# ─── Search ──────────────────────────────────────────────────────────────────
+
+
+def _rank_sections(query: str, limit: int) -> list[_Section]:
+    """Rank sections by exact-phrase match, then TF-IDF cosine similarity.
+
+    Term scores are accumulated from the postings of the query's terms only;
+    the phrase check is a single ``bytes`` search per section against the
+    lowercased copy made when the index was built, so a search lowercases
+    only the query. Ties keep corpus order.
+    """
+    index = _load_index()
+    sections = index.sections
+    query_lower = query.lower()
+
+    scores: dict[int, float] = {}
+    for term, count in Counter(_tokenize(query_lower)).items():
+        query_weight = count * index.idf.get(term, 0.0)
+        for position, weight in index.postings.get(term, ()):
+            scores[position] = scores.get(position, 0.0) + query_weight * weight
+
+    phrase = query_lower.encode("utf-8")
+    phrase_hits = {
+        position
+        for position, section_lower in enumerate(index.sections_lower)
+        if phrase in section_lower
+    }
+    for position in phrase_hits:
+        scores.setdefault(position, 0.0)
+
+    ranked = sorted(
+        scores,
+        key=lambda pos: (pos in phrase_hits, scores[pos], -pos),
+        reverse=True,
+    )
+    return [sections[position] for position in ranked[:limit]]
+
+
+# ─── Tools ───────────────────────────────────────────────────────────────────
+
 
 @tool("search_document_clauses")
 def search_document_clauses(query: str) -> str:
@@ -9,6 +249,7 @@ def search_document_clauses(query: str) -> str:
 
     Use this tool to find contract clauses, provisions, or legal terms
     based on keywords such as clause types, section names, or legal concepts.
+    Sections matching more of the query's keywords are returned first.
 
     Args:
         query: The search query for finding relevant clauses or sections.
@@ -16,22 +257,13 @@ def search_document_clauses(query: str) -> str:
     Returns:
         Matching sections from the legal documents in the knowledge base.
     """
-    from pathlib import Path
-
-    knowledge_dir = Path(__file__).parent.parent / "knowledge"
-    results: list[str] = []
-
-    for file in sorted(knowledge_dir.glob("*.md")):
-        content = file.read_text(encoding="utf-8")
-        sections = content.split("\n## ")
-        for section in sections:
-            if query.lower() in section.lower():
-                # Include the heading marker back and truncate
-                entry = section.strip()[:800]
-                results.append(f"[{file.stem}] {entry}")
+    results = [
+        f"[{section.stem}] {section.excerpt(800)}"
+        for section in _rank_sections(query, limit=10)
+    ]
 
     if results:
-        return "\n\n---\n\n".join(results[:10])
+        return "\n\n---\n\n".join(results)
     return f"No clauses or sections found matching: {query}"
 
 
@@ -48,33 +280,23 @@ def get_document_sections(document_name: str) -> str:
     Returns:
         A list of section headings found in the document.
     """
-    from pathlib import Path
-
-    knowledge_dir = Path(__file__).parent.parent / "knowledge"
-
-    # Try exact match first, then partial match
-    target_file = None
-    for file in knowledge_dir.glob("*.md"):
-        if document_name.lower() in file.stem.lower():
-            target_file = file
-            break
+    index = _load_index()
+    name = document_name.lower()
+    stem = index.stems.get(name) or next(
+        (stem for stem_lower, stem in index.stems.items() if name in stem_lower), None
+    )
 
-    if not target_file:
-        available = [f.stem for f in knowledge_dir.glob("*.md")]
+    if stem is None:
+        available = list(index.stems.values())
         return (
             f"Document not found: {document_name}. "
             f"Available documents: {', '.join(available) if available else 'none'}"
         )
 
-    content = target_file.read_text(encoding="utf-8")
-    headings: list[str] = []
-    for line in content.splitlines():
-        if line.startswith("#"):
-            headings.append(line.strip())
-
+    headings = index.headings[stem]
     if headings:
-        return f"Document: {target_file.stem}\n\n" + "\n".join(headings)
-    return f"No section headings found in {target_file.stem}"
+        return f"Document: {stem}\n\n" + "\n".join(headings)
+    return f"No section headings found in {stem}"
 
 
 @tool("compare_document_sections")
@@ -90,19 +312,12 @@ def compare_document_sections(section_title: str) -> str:
     Returns:
         The matching sections from each document, side by side.
     """
-    from pathlib import Path
-
-    knowledge_dir = Path(__file__).parent.parent / "knowledge"
-    results: list[str] = []
-
-    for file in sorted(knowledge_dir.glob("*.md")):
-        content = file.read_text(encoding="utf-8")
-        sections = content.split("\n## ")
-        for section in sections:
-            first_line = section.split("\n")[0].strip().lower()
-            if section_title.lower() in first_line:
-                entry = section.strip()[:1000]
-                results.append(f"### [{file.stem}]\n{entry}")
+    title_lower = section_title.lower()
+    results = [
+        f"### [{section.stem}]\n{section.excerpt(1000)}"
+        for section in _load_index().sections
+        if title_lower in section.heading_lower
+    ]
 
     if results:
         return "\n\n---\n\n".join(results)
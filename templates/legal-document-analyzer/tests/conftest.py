@@ -0,0 +1,9 @@
+"""Shared pytest setup for the legal document analyzer tests.
+
+Importing the crew module pulls in CrewAI, Pydantic and the provider SDKs.
+Doing it here, before any test module is collected, pays that cost once per
+session (and once per pytest-xdist worker) rather than inside the first test.
+"""
+
+import legal_document_analyzer.crew  # noqa: F401
+import legal_document_analyzer.tools.custom_tool  # noqa: F401
@@ -10,22 +10,65 @@ Covers:
 - Agent factory (mocked LLM)
 - classify_request / analyze_document integration (mocked CrewAI)
 - CLI argument parsing
+- Async pipeline and concurrent batch mode
 - Environment variable handling
 """
 
 from __future__ import annotations
 
+import argparse
+import asyncio
 import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import permutations
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+import yaml
+
+from legal_document_analyzer import crew, main
+from legal_document_analyzer.crew import (
+    _YAML_LOADER,
+    AnalysisResult,
+    _create_agents,
+    _create_task,
+    _heuristic_classify,
+    _load_yaml,
+    _normalize_category,
+    aanalyze_document,
+    abatch_analyze_documents,
+    abatch_classify_requests,
+    aclassify_request,
+    analyze_document,
+    classify_request,
+)
+from legal_document_analyzer.main import _process_batch
+from legal_document_analyzer.tools import custom_tool
+from legal_document_analyzer.tools.custom_tool import (
+    _rank_sections,
+    _Section,
+    compare_document_sections,
+    get_document_sections,
+    search_document_clauses,
+)
+
+_TEMPLATE_DIR = Path(__file__).parent.parent
+_ENV_EXAMPLE = _TEMPLATE_DIR / ".env.example"
+_GITIGNORE = _TEMPLATE_DIR / ".gitignore"
+# Read once; an empty string lets the existence test report a missing file
+_ENV_EXAMPLE_TEXT = _ENV_EXAMPLE.read_text(encoding="utf-8") if _ENV_EXAMPLE.exists() else ""
+_GITIGNORE_TEXT = _GITIGNORE.read_text(encoding="utf-8") if _GITIGNORE.exists() else ""
 
 # Helper: all agent keys for mock setup
-_AGENT_KEYS = [
+_AGENT_KEYS = (
     "classifier", "clause_extractor",
     "risk_analyzer", "summarizer", "comparator",
-]
+)
+_AGENT_KEYS_SET = frozenset(_AGENT_KEYS)
 
 
 def _mock_agents_dict():
@@ -33,6 +76,57 @@ def _mock_agents_dict():
     return {k: MagicMock() for k in _AGENT_KEYS}
 
 
+@pytest.fixture(autouse=True)
+def _reset_agents():
+    """Drop memoized agents so each test sees its own Agent mocks."""
+    crew._reset_agents()
+    yield
+    crew._reset_agents()
+
+
+@pytest.fixture(scope="module")
+def mock_agents():
+    """One set of mock agents shared by the mocked classify/analyze tests."""
+    return _mock_agents_dict()
+
+
+@pytest.fixture
+def patch_crew(monkeypatch, mock_agents):
+    """Patch ``Crew``, ``_create_agents`` and ``_create_task`` on the crew module.
+
+    Returns the module so tests can configure the mocks, e.g.
+    ``patch_crew.Crew.return_value.kickoff.return_value = crew_result``.
+    """
+    monkeypatch.setattr(crew, "Crew", MagicMock())
+    monkeypatch.setattr(crew, "_create_agents", MagicMock(return_value=mock_agents))
+    monkeypatch.setattr(crew, "_create_task", MagicMock(return_value=MagicMock()))
+    return crew
+
+
+@pytest.fixture
+def crew_result():
+    """A mock CrewOutput; tests set ``.raw`` to the text the crew returns."""
+    return MagicMock()
+
+
+@pytest.fixture(scope="session")
+def search_cache():
+    """search_document_clauses.run memoized per query for the whole run."""
+    return lru_cache(maxsize=None)(search_document_clauses.run)
+
+
+@pytest.fixture(scope="session")
+def agents_yaml():
+    """agents.yaml, parsed once for the whole run."""
+    return _load_yaml("agents.yaml")
+
+
+@pytest.fixture(scope="session")
+def tasks_yaml():
+    """tasks.yaml, parsed once for the whole run."""
+    return _load_yaml("tasks.yaml")
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 1. Document Clause Search Tool
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -41,65 +135,139 @@ def _mock_agents_dict():
 class TestDocumentClauseSearch:
     """Test the document clause search tool."""
 
-    def test_search_finds_confidentiality(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
-
-        result = search_document_clauses.run("confidentiality")
+    def test_search_finds_confidentiality(self, search_cache):
+        result = search_cache("confidentiality")
         assert "confidential" in result.lower()
 
-    def test_search_finds_indemnification(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
-
-        result = search_document_clauses.run("indemnification")
+    def test_search_finds_indemnification(self, search_cache):
+        result = search_cache("indemnification")
         assert "indemnif" in result.lower()
 
-    def test_search_finds_termination(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
-
-        result = search_document_clauses.run("termination")
+    def test_search_finds_termination(self, search_cache):
+        result = search_cache("termination")
         assert "terminat" in result.lower()
 
-    def test_search_finds_liability(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
-
-        result = search_document_clauses.run("liability")
+    def test_search_finds_liability(self, search_cache):
+        result = search_cache("liability")
         assert "liabilit" in result.lower()
 
-    def test_search_no_results(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
-
-        result = search_document_clauses.run("xyznonexistent12345")
+    def test_search_no_results(self, search_cache):
+        result = search_cache("xyznonexistent12345")
         assert "No clauses or sections found" in result
 
-    def test_search_case_insensitive(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
-
-        lower = search_document_clauses.run("warranty")
-        upper = search_document_clauses.run("WARRANTY")
+    def test_search_case_insensitive(self, search_cache):
+        lower = search_cache("warranty")
+        upper = search_cache("WARRANTY")
         assert "No clauses" not in lower or "No clauses" not in upper
 
-    def test_search_finds_governing_law(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
-
-        result = search_document_clauses.run("governing law")
+    def test_search_finds_governing_law(self, search_cache):
+        result = search_cache("governing law")
         assert "No clauses" not in result
 
-    def test_search_empty_query_returns_string(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
-
-        result = search_document_clauses.run("")
+    def test_search_empty_query_returns_string(self, search_cache):
+        result = search_cache("")
         assert isinstance(result, str)
         assert len(result) > 0
 
-    def test_search_returns_truncated_results(self):
-        from legal_document_analyzer.tools.custom_tool import search_document_clauses
+    def test_search_returns_truncated_results(self, search_cache):
+        result = search_cache("agreement")
+        # Each section should be within the 800-char limit + file prefix
+        assert max(map(len, map(str.strip, result.split("---"))), default=0) <= 900
+
+    def test_search_multi_term_query(self, search_cache):
+        """Multi-keyword queries should match sections containing any of the terms."""
+        result = search_cache("indemnification liability termination")
+        assert "No clauses" not in result
+        assert "Indemnification" in result
+        assert "Limitation of Liability" in result
+
+    def test_search_ranks_most_relevant_first(self):
+        """Sections sharing more weighted terms with the query should rank higher."""
+        ranked = _rank_sections("governing law arbitration", limit=10)
+        assert "governing law" in ranked[0].heading_lower
+
+    def test_postings_weights_are_normalized(self):
+        """Each section's TF-IDF vector should have unit length."""
+        index = custom_tool._load_index()
+        norms = [0.0] * len(index.sections)
+        for postings in index.postings.values():
+            for position, weight in postings:
+                norms[position] += weight * weight
+        assert all(abs(norm - 1.0) < 1e-9 for norm in norms if norm)
+
+    def test_section_excerpt_truncates_bytes(self):
+        """Excerpts should cut on bytes and drop a split multi-byte character."""
+        section = _Section("doc", "heading", "Café clause".encode("utf-8"))
+        assert section.excerpt(4) == "Caf"
+        assert section.excerpt(5) == "Café"
+        assert section.excerpt(1000) == "Café clause"
+
+    def test_lowercased_sections_built_with_index(self):
+        """Phrase matching should use the index's lowercased copies, not re-lowercase sections."""
+        index = custom_tool._load_index()
+        assert index.sections_lower == [
+            section.text.lower().encode("utf-8") for section in index.sections
+        ]
+        with patch.object(custom_tool._Section, "text", property(lambda self: 1 / 0)):
+            assert custom_tool._rank_sections("governing law", limit=10)
+
+    def test_index_reused_across_searches(self):
+        """Repeated searches should not re-read the knowledge files."""
+        search_document_clauses.run("liability")
+        with patch("pathlib.Path.read_text") as mock_read:
+            result = search_document_clauses.run("indemnification")
+
+        mock_read.assert_not_called()
+        assert "indemnif" in result.lower()
+
+    @pytest.mark.slow
+    def test_index_rebuilt_when_signature_changes(self):
+        """A stale signature should force the index to be rebuilt."""
+        first = custom_tool._load_index()
+        custom_tool._INDEX = first._replace(signature=(0,))
+
+        rebuilt = custom_tool._load_index()
+        assert rebuilt is not first
+        assert rebuilt.sections == first.sections
+
+    @pytest.mark.slow
+    def test_parallel_tool_calls_build_index_once(self):
+        """Concurrent tool calls (as CrewAI issues them) should share one rebuild."""
+        expected = custom_tool.search_document_clauses.run("termination")
+        custom_tool._INDEX = None
+
+        with patch.object(custom_tool, "_read_index_cache", return_value=None), patch.object(
+            custom_tool, "_build_index", wraps=custom_tool._build_index,
+        ) as mock_build, ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                custom_tool.search_document_clauses.run, ["termination"] * 8,
+            ))
+
+        assert results == [expected] * 8
+        mock_build.assert_called_once()
+
+    @pytest.mark.slow
+    def test_index_cache_round_trip(self, tmp_path, monkeypatch):
+        """A fresh process should load the pickled index instead of re-parsing."""
+        monkeypatch.setattr(custom_tool, "_INDEX_CACHE", tmp_path / "index.pkl")
+        custom_tool.build_index_cache()
+        monkeypatch.setattr(custom_tool, "_INDEX", None)
+
+        with patch.object(custom_tool, "_build_index") as mock_build:
+            index = custom_tool._load_index()
+
+        mock_build.assert_not_called()
+        assert index.sections == custom_tool._build_index().sections
 
-        result = search_document_clauses.run("agreement")
-        for section in result.split("---"):
-            # Each section should be within the 800-char limit + file prefix
-            stripped = section.strip()
-            if stripped:
-                assert len(stripped) <= 900
+    @pytest.mark.slow
+    def test_stale_index_cache_ignored(self, tmp_path, monkeypatch):
+        """A pickle whose signature no longer matches the files should be rebuilt."""
+        cache = tmp_path / "index.pkl"
+        stale = custom_tool._build_index()._replace(signature=(0,))
+        cache.write_bytes(pickle.dumps((custom_tool._INDEX_CACHE_VERSION, stale)))
+        monkeypatch.setattr(custom_tool, "_INDEX_CACHE", cache)
+
+        assert custom_tool._read_index_cache() is None
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -111,41 +279,51 @@ class TestDocumentSections:
     """Test the document sections inspection tool."""
 
     def test_get_nda_sections(self):
-        from legal_document_analyzer.tools.custom_tool import get_document_sections
-
         result = get_document_sections.run("nda")
         assert "Document:" in result
         assert "#" in result
 
     def test_get_license_sections(self):
-        from legal_document_analyzer.tools.custom_tool import get_document_sections
-
         result = get_document_sections.run("software_license")
         assert "Document:" in result
         assert "#" in result
 
     def test_document_not_found(self):
-        from legal_document_analyzer.tools.custom_tool import get_document_sections
-
         result = get_document_sections.run("nonexistent_document")
         assert "Document not found" in result
 
     def test_lists_available_documents(self):
-        from legal_document_analyzer.tools.custom_tool import get_document_sections
-
         result = get_document_sections.run("nonexistent")
         assert "Available documents:" in result
         assert "nda_template" in result
 
     def test_nda_has_expected_sections(self):
-        from legal_document_analyzer.tools.custom_tool import get_document_sections
-
         result = get_document_sections.run("nda")
         # Check for key NDA sections
         result_lower = result.lower()
         assert "definition" in result_lower
         assert "terminat" in result_lower
 
+    def test_sections_served_from_index(self):
+        """Heading lookups should not re-read the document once indexed."""
+        first = get_document_sections.run("nda")
+        with patch("pathlib.Path.read_text") as mock_read:
+            second = get_document_sections.run("nda")
+
+        mock_read.assert_not_called()
+        assert second == first
+
+    def test_document_resolved_without_globbing(self):
+        """Exact and partial names should resolve from the index's stem map."""
+        get_document_sections.run("nda")
+        with patch("pathlib.Path.glob") as mock_glob:
+            exact = get_document_sections.run("NDA_Template")
+            partial = get_document_sections.run("license")
+
+        mock_glob.assert_not_called()
+        assert exact.startswith("Document: nda_template")
+        assert partial.startswith("Document: software_license")
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 3. Document Comparison Tool
@@ -156,26 +334,18 @@ class TestDocumentComparison:
     """Test the document comparison tool."""
 
     def test_compare_indemnification(self):
-        from legal_document_analyzer.tools.custom_tool import compare_document_sections
-
         result = compare_document_sections.run("Indemnification")
         assert "nda_template" in result or "software_license" in result
 
     def test_compare_termination(self):
-        from legal_document_analyzer.tools.custom_tool import compare_document_sections
-
         result = compare_document_sections.run("Term and Termination")
         assert "---" in result or "nda_template" in result or "software_license" in result
 
     def test_compare_nonexistent_section(self):
-        from legal_document_analyzer.tools.custom_tool import compare_document_sections
-
         result = compare_document_sections.run("Nonexistent Section XYZ")
         assert "No sections titled" in result
 
     def test_compare_liability(self):
-        from legal_document_analyzer.tools.custom_tool import compare_document_sections
-
         result = compare_document_sections.run("Limitation of Liability")
         assert "liabilit" in result.lower() or "No sections" in result
 
@@ -185,52 +355,74 @@ class TestDocumentComparison:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
+_NORMALIZE_CASES = (
+    ("clause_extraction", "clause_extraction"),
+    ("CLAUSE_EXTRACTION", "clause_extraction"),
+    ("risk_analysis", "risk_analysis"),
+    ("RISK_ANALYSIS", "risk_analysis"),
+    ("summarization", "summarization"),
+    ("SUMMARIZATION", "summarization"),
+    ("comparison", "comparison"),
+    ("COMPARISON", "comparison"),
+    ("extract the indemnification clause", "clause_extraction"),
+    ("analyze risks in this contract", "risk_analysis"),
+    ("summarize this NDA", "summarization"),
+    ("compare these two agreements", "comparison"),
+    ("find clause about termination", "clause_extraction"),
+    ("unknown query type", "summarization"),  # default fallback
+    ("", "summarization"),  # empty → default
+    ("   ", "summarization"),  # whitespace → default
+    ("RIſK ANALYſIS", "risk_analysis"),  # casefold: long s → s
+)
+
+
 class TestClassificationNormalization:
     """Test request classification normalization logic.
 
-    This tests the raw-output-to-category mapping logic used in
-    classify_request() without calling any LLM.
+    This tests the raw-output-to-category mapping used by classify_request()
+    (``_normalize_category``) without calling any LLM.
     """
 
+    def test_normalize_all(self):
+        """Category normalization should match expected output for every case."""
+        for raw_output, expected in _NORMALIZE_CASES:
+            assert _normalize_category(raw_output) == expected, (
+                f"Failed for input: {raw_output!r}"
+            )
+
     @pytest.mark.parametrize(
         "raw_output, expected",
         [
-            ("clause_extraction", "clause_extraction"),
-            ("CLAUSE_EXTRACTION", "clause_extraction"),
-            ("risk_analysis", "risk_analysis"),
-            ("RISK_ANALYSIS", "risk_analysis"),
-            ("summarization", "summarization"),
-            ("SUMMARIZATION", "summarization"),
-            ("comparison", "comparison"),
-            ("COMPARISON", "comparison"),
-            ("extract the indemnification clause", "clause_extraction"),
-            ("analyze risks in this contract", "risk_analysis"),
-            ("summarize this NDA", "summarization"),
-            ("compare these two agreements", "comparison"),
-            ("find clause about termination", "clause_extraction"),
-            ("unknown query type", "summarization"),  # default fallback
-            ("", "summarization"),  # empty → default
-            ("   ", "summarization"),  # whitespace → default
+            ("compare and summarize", "summarization"),
+            ("analysis of risk", "risk_analysis"),
+            ("risk comparison", "comparison"),
+            ("summary of the\nclause", "clause_extraction"),
+            ("  Comparison\n", "comparison"),
         ],
     )
-    def test_normalize(self, raw_output: str, expected: str):
-        """Category normalization should match expected output."""
-        raw_lower = raw_output.strip().lower()
-        if (
-            "clause_extraction" in raw_lower
-            or ("clause" in raw_lower and "extract" in raw_lower)
-            or "clause" in raw_lower
-        ):
-            result = "clause_extraction"
-        elif "risk_analysis" in raw_lower or ("risk" in raw_lower and "analy" in raw_lower):
-            result = "risk_analysis"
-        elif "summarization" in raw_lower or "summar" in raw_lower:
-            result = "summarization"
-        elif "comparison" in raw_lower or "compar" in raw_lower:
-            result = "comparison"
-        else:
-            result = "summarization"
-        assert result == expected, f"Failed for input: {raw_output!r}"
+    def test_normalize_category_priority(self, raw_output: str, expected: str):
+        """_normalize_category should keep the clause > risk > summar > compar priority."""
+        assert _normalize_category(raw_output) == expected
+
+    def test_compiled_matcher_matches_keyword_rules(self):
+        """The precompiled matcher should agree with a plain ordered keyword scan."""
+        def reference(raw: str) -> str:
+            s = raw.strip().casefold()
+            if "clause" in s:
+                return "clause_extraction"
+            if "risk" in s and "analy" in s:
+                return "risk_analysis"
+            if "summar" in s:
+                return "summarization"
+            if "compar" in s:
+                return "comparison"
+            return "summarization"
+
+        words = ("clause", "risk", "analysis", "summary", "compare", "other")
+        for n in range(1, 4):
+            for combo in permutations(words, n):
+                raw = " ".join(combo)
+                assert _normalize_category(raw) == reference(raw), raw
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -241,51 +433,58 @@ class TestClassificationNormalization:
 class TestAnalysisResult:
     """Test the AnalysisResult model."""
 
-    def test_valid_clause_extraction_result(self):
-        from legal_document_analyzer.crew import AnalysisResult
-
-        result = AnalysisResult(
-            query="Find the indemnification clause in the NDA",
-            category="clause_extraction",
-            response="Section 9: Each party agrees to indemnify...",
-        )
-        assert result.query == "Find the indemnification clause in the NDA"
-        assert result.category == "clause_extraction"
-        assert "indemnify" in result.response
-
-    def test_valid_risk_analysis_result(self):
-        from legal_document_analyzer.crew import AnalysisResult
-
-        result = AnalysisResult(
-            query="What are the risks in this contract?",
-            category="risk_analysis",
-            response="High Risk: Broad indemnification clause in Section 9",
-        )
-        assert result.category == "risk_analysis"
-
-    def test_valid_summarization_result(self):
-        from legal_document_analyzer.crew import AnalysisResult
-
-        result = AnalysisResult(
-            query="Summarize this NDA",
-            category="summarization",
-            response="This is a mutual NDA between Acme Corp and Beta Solutions.",
-        )
-        assert result.category == "summarization"
-
-    def test_valid_comparison_result(self):
-        from legal_document_analyzer.crew import AnalysisResult
-
-        result = AnalysisResult(
-            query="Compare the two contracts",
-            category="comparison",
-            response="The NDA has a $500K liability cap; the license has no fixed cap.",
-        )
-        assert result.category == "comparison"
+    @pytest.mark.parametrize(
+        "query, category, response, check",
+        [
+            pytest.param(
+                "Find the indemnification clause in the NDA",
+                "clause_extraction",
+                "Section 9: Each party agrees to indemnify...",
+                lambda r: (
+                    r.query == "Find the indemnification clause in the NDA"
+                    and "indemnify" in r.response
+                ),
+                id="clause_extraction",
+            ),
+            pytest.param(
+                "What are the risks in this contract?",
+                "risk_analysis",
+                "High Risk: Broad indemnification clause in Section 9",
+                lambda r: True,
+                id="risk_analysis",
+            ),
+            pytest.param(
+                "Summarize this NDA",
+                "summarization",
+                "This is a mutual NDA between Acme Corp and Beta Solutions.",
+                lambda r: True,
+                id="summarization",
+            ),
+            pytest.param(
+                "Compare the two contracts",
+                "comparison",
+                "The NDA has a $500K liability cap; the license has no fixed cap.",
+                lambda r: True,
+                id="comparison",
+            ),
+            pytest.param(
+                "", "summarization", "No query provided.",
+                lambda r: r.query == "",
+                id="empty_query_allowed",
+            ),
+            pytest.param(
+                "test", "summarization", "A" * 10_000,
+                lambda r: len(r.response) == 10_000,
+                id="long_response_allowed",
+            ),
+        ],
+    )
+    def test_valid_results(self, query, category, response, check):
+        result = AnalysisResult(query=query, category=category, response=response)
+        assert result.category == category
+        assert check(result)
 
     def test_invalid_category_rejected(self):
-        from legal_document_analyzer.crew import AnalysisResult
-
         with pytest.raises(Exception):
             AnalysisResult(
                 query="test",
@@ -293,23 +492,6 @@ class TestAnalysisResult:
                 response="test",
             )
 
-    def test_empty_query_allowed(self):
-        from legal_document_analyzer.crew import AnalysisResult
-
-        result = AnalysisResult(
-            query="", category="summarization", response="No query provided."
-        )
-        assert result.query == ""
-
-    def test_long_response_allowed(self):
-        from legal_document_analyzer.crew import AnalysisResult
-
-        long_text = "A" * 10_000
-        result = AnalysisResult(
-            query="test", category="summarization", response=long_text
-        )
-        assert len(result.response) == 10_000
-
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 6. YAML Configuration Loading
@@ -319,10 +501,8 @@ class TestAnalysisResult:
 class TestYamlConfig:
     """Test YAML configuration files are valid and complete."""
 
-    def test_load_agents_yaml(self):
-        from legal_document_analyzer.crew import _load_yaml
-
-        config = _load_yaml("agents.yaml")
+    def test_load_agents_yaml(self, agents_yaml):
+        config = agents_yaml
         assert isinstance(config, dict)
         expected_agents = [
             "classifier", "clause_extractor", "risk_analyzer",
@@ -334,10 +514,8 @@ class TestYamlConfig:
             assert "goal" in config[agent_key], f"Missing 'goal' for {agent_key}"
             assert "backstory" in config[agent_key], f"Missing 'backstory' for {agent_key}"
 
-    def test_load_tasks_yaml(self):
-        from legal_document_analyzer.crew import _load_yaml
-
-        config = _load_yaml("tasks.yaml")
+    def test_load_tasks_yaml(self, tasks_yaml):
+        config = tasks_yaml
         assert isinstance(config, dict)
         expected_tasks = [
             "classify_request", "extract_clauses", "analyze_risks",
@@ -352,23 +530,43 @@ class TestYamlConfig:
                 f"Missing 'expected_output' for {task_key}"
             )
 
-    def test_tasks_contain_query_placeholder(self):
+    def test_tasks_contain_query_placeholder(self, tasks_yaml):
         """All task descriptions should contain {query} placeholder."""
-        from legal_document_analyzer.crew import _load_yaml
-
-        config = _load_yaml("tasks.yaml")
-        for task_key, task_cfg in config.items():
+        for task_key, task_cfg in tasks_yaml.items():
             assert "{query}" in task_cfg["description"], (
                 f"Task '{task_key}' description missing {{query}} placeholder"
             )
 
     def test_load_nonexistent_yaml_raises(self):
         """Loading a non-existent YAML file should raise FileNotFoundError."""
-        from legal_document_analyzer.crew import _load_yaml
-
         with pytest.raises(FileNotFoundError):
             _load_yaml("nonexistent.yaml")
 
+    def test_load_yaml_is_cached(self):
+        """Repeated loads should reuse the parsed config without re-parsing."""
+        first = _load_yaml("agents.yaml")
+        with patch("legal_document_analyzer.crew.yaml.load") as mock_load:
+            second = _load_yaml("agents.yaml")
+
+        assert second is first
+        mock_load.assert_not_called()
+
+    def test_load_yaml_reparses_on_size_change(self):
+        """A changed (mtime, size) signature should invalidate the cache entry."""
+        crew._load_yaml("tasks.yaml")
+        mtime, size, config = crew._YAML_CACHE["tasks.yaml"]
+        crew._YAML_CACHE["tasks.yaml"] = (mtime, size + 1, {"stale": True})
+
+        assert crew._load_yaml("tasks.yaml") == config
+
+    def test_configs_parsed_at_import(self):
+        """Both configs should already be cached once crew is imported."""
+        assert {"agents.yaml", "tasks.yaml"} <= crew._YAML_CACHE.keys()
+
+    def test_yaml_loader_is_safe(self):
+        """The config loader must be a safe loader (C-accelerated when available)."""
+        assert issubclass(_YAML_LOADER, (yaml.SafeLoader, getattr(yaml, "CSafeLoader", ())))
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 7. Agent Factory (mocked — no LLM calls)
@@ -381,17 +579,13 @@ class TestAgentFactory:
     @patch("legal_document_analyzer.crew.Agent")
     def test_creates_five_agents(self, mock_agent_cls):
         """_create_agents should create exactly 5 agents."""
-        from legal_document_analyzer.crew import _create_agents
-
         agents = _create_agents()
         assert len(agents) == 5
-        assert set(agents.keys()) == set(_AGENT_KEYS)
+        assert agents.keys() == _AGENT_KEYS_SET
 
     @patch("legal_document_analyzer.crew.Agent")
     def test_classifier_uses_mini_model(self, mock_agent_cls):
         """Classifier should use the cheaper CLASSIFIER_MODEL."""
-        from legal_document_analyzer.crew import _create_agents
-
         with patch.dict(os.environ, {"CLASSIFIER_MODEL": "gpt-4o-mini", "MODEL": "gpt-4o"}):
             _create_agents()
 
@@ -402,14 +596,46 @@ class TestAgentFactory:
     @patch("legal_document_analyzer.crew.Agent")
     def test_verbose_env_controls_agent_verbosity(self, mock_agent_cls):
         """VERBOSE=false should set verbose=False on all agents."""
-        from legal_document_analyzer.crew import _create_agents
-
         with patch.dict(os.environ, {"VERBOSE": "false"}):
             _create_agents()
 
         for call in mock_agent_cls.call_args_list:
             assert call.kwargs.get("verbose") is False
 
+    @patch("legal_document_analyzer.crew.Agent")
+    def test_agents_are_reused(self, mock_agent_cls):
+        """Repeated calls with the same settings should not rebuild agents."""
+        first = _create_agents()
+        second = _create_agents()
+
+        assert second is first
+        assert mock_agent_cls.call_count == 5
+
+    @patch("legal_document_analyzer.crew.Agent")
+    def test_concurrent_calls_build_agents_once(self, mock_agent_cls):
+        """A warm-up thread racing the first query must not build a second set."""
+        def slow_agent(**kwargs):
+            time.sleep(0.01)
+            return MagicMock()
+
+        mock_agent_cls.side_effect = slow_agent
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: _create_agents(), range(4)))
+
+        assert all(agents is results[0] for agents in results)
+        assert mock_agent_cls.call_count == 5
+
+    @patch("legal_document_analyzer.crew.Agent")
+    def test_agents_rebuilt_when_model_changes(self, mock_agent_cls):
+        """Changing MODEL should build a fresh set of agents."""
+        with patch.dict(os.environ, {"MODEL": "gpt-4o"}):
+            first = _create_agents()
+        with patch.dict(os.environ, {"MODEL": "gpt-4.1"}):
+            second = _create_agents()
+
+        assert second is not first
+        assert mock_agent_cls.call_count == 10
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 8. Task Factory
@@ -420,29 +646,42 @@ class TestTaskFactory:
     """Test task creation from YAML config."""
 
     @patch("legal_document_analyzer.crew.Task")
-    def test_query_interpolation(self, mock_task_cls):
-        """_create_task should replace {query} in the task description."""
-        from legal_document_analyzer.crew import _create_task
-
+    def test_query_placeholder_kept(self, mock_task_cls):
+        """_create_task should leave {query} for CrewAI to interpolate at kickoff."""
         mock_agent = MagicMock()
-        _create_task("classify_request", mock_agent, "Find the indemnification clause")
+        _create_task("classify_request", mock_agent)
 
         call_kwargs = mock_task_cls.call_args.kwargs
-        assert "Find the indemnification clause" in call_kwargs["description"]
-        assert "{query}" not in call_kwargs["description"]
+        assert "{query}" in call_kwargs["description"]
 
-    @patch("legal_document_analyzer.crew.Task")
-    def test_all_task_keys_valid(self, mock_task_cls):
-        """All expected task keys should produce a valid Task."""
-        from legal_document_analyzer.crew import _create_task
+    @pytest.mark.slow
+    def test_inputs_interpolate_query(self, tasks_yaml):
+        """CrewAI input interpolation should substitute the query on each run."""
+        from crewai import Task
 
-        mock_agent = MagicMock()
-        for key in [
+        task = Task(
+            description=tasks_yaml["classify_request"]["description"],
+            expected_output="category",
+        )
+        task.interpolate_inputs_and_add_conversation_history({"query": "Find clause A"})
+        task.interpolate_inputs_and_add_conversation_history({"query": "Find clause B"})
+
+        assert "Find clause B" in task.description
+        assert "Find clause A" not in task.description
+        assert "{query}" not in task.description
+
+    @pytest.mark.parametrize(
+        "key",
+        [
             "classify_request", "extract_clauses", "analyze_risks",
             "summarize_document", "compare_documents",
-        ]:
-            _create_task(key, mock_agent, "test query")
-            assert mock_task_cls.called
+        ],
+    )
+    @patch("legal_document_analyzer.crew.Task")
+    def test_task_key_valid(self, mock_task_cls, key):
+        """Each expected task key should produce a valid Task."""
+        _create_task(key, MagicMock())
+        mock_task_cls.assert_called_once()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -453,73 +692,49 @@ class TestTaskFactory:
 class TestClassifyRequest:
     """Test classify_request with mocked CrewAI Crew.kickoff()."""
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
-    def test_classify_clause_extraction(self, mock_crew_cls, mock_agents, mock_task):
-        from legal_document_analyzer.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "clause_extraction"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_classify_clause_extraction(self, patch_crew, crew_result):
+        crew_result.raw = "clause_extraction"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         assert classify_request("Find the indemnification clause") == "clause_extraction"
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
-    def test_classify_risk_analysis(self, mock_crew_cls, mock_agents, mock_task):
-        from legal_document_analyzer.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "risk_analysis"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_classify_risk_analysis(self, patch_crew, crew_result):
+        crew_result.raw = "risk_analysis"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         assert classify_request("What are the risks in this contract?") == "risk_analysis"
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
-    def test_classify_summarization(self, mock_crew_cls, mock_agents, mock_task):
-        from legal_document_analyzer.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "summarization"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_classify_summarization(self, patch_crew, crew_result):
+        crew_result.raw = "summarization"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         assert classify_request("Summarize this NDA") == "summarization"
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
-    def test_classify_comparison(self, mock_crew_cls, mock_agents, mock_task):
-        from legal_document_analyzer.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "comparison"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_classify_comparison(self, patch_crew, crew_result):
+        crew_result.raw = "comparison"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         assert classify_request("Compare these contracts") == "comparison"
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
-    def test_classify_unknown_defaults_to_summarization(
-        self, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from legal_document_analyzer.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "I'm not sure what category this is"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_classify_unknown_defaults_to_summarization(self, patch_crew, crew_result):
+        crew_result.raw = "I'm not sure what category this is"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         assert classify_request("Something unclear") == "summarization"
 
+    def test_classifier_crew_is_reused(self, patch_crew, crew_result):
+        """Repeated classifications should reuse one crew and pass the query as input."""
+        crew_result.raw = "summarization"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
+
+        classify_request("Summarize the NDA")
+        classify_request("Summarize the license")
+
+        patch_crew.Crew.assert_called_once()
+        patch_crew._create_task.assert_called_once()
+        kickoff = patch_crew.Crew.return_value.kickoff
+        assert kickoff.call_args_list[-1].kwargs == {"inputs": {"query": "Summarize the license"}}
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 10. analyze_document (mocked CrewAI)
@@ -529,19 +744,10 @@ class TestClassifyRequest:
 class TestAnalyzeDocument:
     """Test analyze_document end-to-end with mocked CrewAI."""
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
     @patch("legal_document_analyzer.crew.classify_request", return_value="clause_extraction")
-    def test_handle_clause_extraction_returns_result(
-        self, mock_classify, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from legal_document_analyzer.crew import AnalysisResult, analyze_document
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "Section 9: Indemnification clause found"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_handle_clause_extraction_returns_result(self, mock_classify, patch_crew, crew_result):
+        crew_result.raw = "Section 9: Indemnification clause found"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         result = analyze_document("Find the indemnification clause")
         assert isinstance(result, AnalysisResult)
@@ -549,102 +755,134 @@ class TestAnalyzeDocument:
         assert result.query == "Find the indemnification clause"
         assert "Indemnification" in result.response
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
     @patch("legal_document_analyzer.crew.classify_request", return_value="risk_analysis")
-    def test_handle_risk_analysis_routes_correctly(
-        self, mock_classify, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from legal_document_analyzer.crew import analyze_document
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "**Overall Risk Level**: High — broad indemnification"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_handle_risk_analysis_routes_correctly(self, mock_classify, patch_crew, crew_result):
+        crew_result.raw = "**Overall Risk Level**: High — broad indemnification"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         result = analyze_document("What are the risks?")
         assert result.category == "risk_analysis"
         assert "High" in result.response
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
     @patch("legal_document_analyzer.crew.classify_request", return_value="summarization")
-    def test_handle_summarization_routes_correctly(
-        self, mock_classify, mock_crew_cls, mock_agents, mock_task,
+    def test_agents_created_once_per_query(
+        self, mock_classify, patch_crew, crew_result, mock_agents,
     ):
-        from legal_document_analyzer.crew import analyze_document
+        """analyze_document should build agents once and share them with the classifier."""
+        crew_result.raw = "Summary"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
+
+        analyze_document("Review this NDA")
+        patch_crew._create_agents.assert_called_once()
+        mock_classify.assert_called_once_with("Review this NDA", mock_agents)
 
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "**Document Type**: Mutual NDA between Acme Corp and Beta Solutions"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    @patch("legal_document_analyzer.crew.classify_request", return_value="summarization")
+    def test_handle_summarization_routes_correctly(self, mock_classify, patch_crew, crew_result):
+        crew_result.raw = "**Document Type**: Mutual NDA between Acme Corp and Beta Solutions"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         result = analyze_document("Summarize this NDA")
         assert result.category == "summarization"
         assert "NDA" in result.response
 
-    @patch("legal_document_analyzer.crew._create_task", return_value=MagicMock())
-    @patch("legal_document_analyzer.crew._create_agents")
-    @patch("legal_document_analyzer.crew.Crew")
     @patch("legal_document_analyzer.crew.classify_request", return_value="comparison")
-    def test_handle_comparison_routes_correctly(
-        self, mock_classify, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from legal_document_analyzer.crew import analyze_document
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "NDA has $500K liability cap; License uses revenue-based cap"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_handle_comparison_routes_correctly(self, mock_classify, patch_crew, crew_result):
+        crew_result.raw = "NDA has $500K liability cap; License uses revenue-based cap"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
 
         result = analyze_document("Compare the NDA and license agreement")
         assert result.category == "comparison"
         assert "liability" in result.response.lower() or "cap" in result.response.lower()
 
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("Find the indemnification clause", "clause_extraction"),
+            ("What are the risks in this contract?", "risk_analysis"),
+            ("Give me an overview of the NDA", "summarization"),
+            ("NDA vs software license", "comparison"),
+            ("Summarize the termination clause", None),  # ambiguous
+            ("Review this NDA", None),  # no keywords
+        ],
+    )
+    def test_heuristic_classify(self, query, expected):
+        assert _heuristic_classify(query) == expected
+
+    @patch("legal_document_analyzer.crew.classify_request")
+    def test_unambiguous_query_skips_classifier(self, mock_classify, patch_crew, crew_result):
+        crew_result.raw = "Differences"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
+
+        result = analyze_document("Compare the NDA and license agreement")
+        assert result.category == "comparison"
+        mock_classify.assert_not_called()
+
+    @patch("legal_document_analyzer.crew.classify_request")
+    def test_explicit_category_skips_classifier(self, mock_classify, patch_crew, crew_result):
+        crew_result.raw = "Risk report"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
+
+        result = analyze_document("Summarize the NDA", category="risk_analysis")
+        assert result.category == "risk_analysis"
+        mock_classify.assert_not_called()
+        assert patch_crew._create_task.call_args.args[0] == "analyze_risks"
+
+    def test_repeated_query_served_from_cache(self, patch_crew, crew_result):
+        """Queries differing only in case/whitespace should reuse the cached result."""
+        crew_result.raw = "NDA summary"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
+
+        first = analyze_document("Summarize the NDA")
+        second = analyze_document("  summarize   the nda ")
+
+        assert patch_crew.Crew.return_value.kickoff.call_count == 1
+        assert second.response == first.response
+        assert second.query == "  summarize   the nda "
+
+    def test_cache_invalidated_by_knowledge_base_change(self, patch_crew, crew_result):
+        crew_result.raw = "NDA summary"
+        patch_crew.Crew.return_value.kickoff.return_value = crew_result
+
+        with patch(
+            "legal_document_analyzer.tools.custom_tool.knowledge_base_version",
+            side_effect=[(1,), (2,)],
+        ):
+            analyze_document("Summarize the NDA")
+            analyze_document("Summarize the NDA")
+
+        assert patch_crew.Crew.return_value.kickoff.call_count == 2
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 11. CLI Argument Parsing
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
-class TestCLI:
-    """Test CLI argument parsing (no LLM calls)."""
+@pytest.fixture(scope="module")
+def cli_parser():
+    """One parser for all CLI tests; parse_args leaves it unchanged."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--query", "-q", type=str)
+    parser.add_argument("--file", "-f", type=str)
+    parser.add_argument("--classify-only", "-c", action="store_true")
+    return parser
 
-    def test_parse_single_query(self):
-        import argparse
 
-        parser = argparse.ArgumentParser()
-        parser.add_argument("--query", "-q", type=str)
-        parser.add_argument("--file", "-f", type=str)
-        parser.add_argument("--classify-only", "-c", action="store_true")
+class TestCLI:
+    """Test CLI argument parsing (no LLM calls)."""
 
-        args = parser.parse_args(["--query", "Summarize this NDA"])
+    def test_parse_single_query(self, cli_parser):
+        args = cli_parser.parse_args(["--query", "Summarize this NDA"])
         assert args.query == "Summarize this NDA"
         assert args.file is None
         assert args.classify_only is False
 
-    def test_parse_classify_only(self):
-        import argparse
-
-        parser = argparse.ArgumentParser()
-        parser.add_argument("--query", "-q", type=str)
-        parser.add_argument("--file", "-f", type=str)
-        parser.add_argument("--classify-only", "-c", action="store_true")
-
-        args = parser.parse_args(["-q", "test", "-c"])
+    def test_parse_classify_only(self, cli_parser):
+        args = cli_parser.parse_args(["-q", "test", "-c"])
         assert args.classify_only is True
 
-    def test_parse_file_mode(self):
-        import argparse
-
-        parser = argparse.ArgumentParser()
-        parser.add_argument("--query", "-q", type=str)
-        parser.add_argument("--file", "-f", type=str)
-        parser.add_argument("--classify-only", "-c", action="store_true")
-
-        args = parser.parse_args(["--file", "queries.txt"])
+    def test_parse_file_mode(self, cli_parser):
+        args = cli_parser.parse_args(["--file", "queries.txt"])
         assert args.file == "queries.txt"
         assert args.query is None
 
@@ -662,17 +900,176 @@ class TestEnvConfig:
     """Test environment variable configuration."""
 
     def test_env_example_exists(self):
-        env_example = Path(__file__).parent.parent / ".env.example"
-        assert env_example.exists(), ".env.example is required for template users"
+        assert _ENV_EXAMPLE.exists(), ".env.example is required for template users"
 
     def test_env_example_contains_required_vars(self):
-        env_example = Path(__file__).parent.parent / ".env.example"
-        content = env_example.read_text(encoding="utf-8")
         required_vars = ["MODEL", "OPENAI_API_KEY", "CLASSIFIER_MODEL"]
-        for var in required_vars:
-            assert var in content, f".env.example missing {var}"
+        assert all(var in _ENV_EXAMPLE_TEXT for var in required_vars), (
+            f".env.example missing one of {required_vars}"
+        )
 
     def test_gitignore_excludes_env(self):
-        gitignore = Path(__file__).parent.parent / ".gitignore"
-        content = gitignore.read_text(encoding="utf-8")
-        assert ".env" in content
+        assert ".env" in _GITIGNORE_TEXT
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 13. Async Processing (mocked CrewAI)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def _async_kickoff(mock_crew_cls, *raws: str) -> AsyncMock:
+    """Make copied crews return the given raw outputs from kickoff_async."""
+    kickoff = AsyncMock(side_effect=[MagicMock(raw=raw) for raw in raws])
+    mock_crew_cls.return_value.copy.return_value.kickoff_async = kickoff
+    return kickoff
+
+
+class TestAsyncProcessing:
+    """Test the async pipeline and concurrent batch mode."""
+
+    @pytest.mark.asyncio
+    async def test_aclassify_request(self, patch_crew):
+        _async_kickoff(patch_crew.Crew, "RISK_ANALYSIS")
+
+        assert await aclassify_request("What are the risks?") == "risk_analysis"
+
+    @pytest.mark.asyncio
+    async def test_async_runs_copy_the_cached_crew(self, patch_crew):
+        kickoff = _async_kickoff(patch_crew.Crew, "RISK_ANALYSIS", "SUMMARIZATION")
+
+        await aclassify_request("What are the risks?")
+        await aclassify_request("Summarize this NDA")
+        assert patch_crew.Crew.call_count == 1
+        assert patch_crew.Crew.return_value.copy.call_count == 2
+        assert kickoff.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_aanalyze_document_routes_to_specialist(self, patch_crew, mock_agents):
+        kickoff = _async_kickoff(patch_crew.Crew, "comparison", "NDA vs license differences")
+
+        result = await aanalyze_document("Look over the NDA and the license")
+        assert result.category == "comparison"
+        assert result.response == "NDA vs license differences"
+        assert kickoff.await_count == 2
+        assert patch_crew._create_task.call_args.args[:2] == (
+            "compare_documents", mock_agents["comparator"],
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("patch_crew")
+    async def test_speculative_keeps_classifier_choice(self):
+        """Speculative mode should start every specialist and keep the classified one."""
+        async def fake_kickoff(task_key, agent, query, **crew_kwargs):
+            return "risk_analysis" if task_key == "classify_request" else f"{task_key} output"
+
+        with patch(
+            "legal_document_analyzer.crew._kickoff_async", side_effect=fake_kickoff,
+        ) as mock_kickoff:
+            result = await aanalyze_document("Tell me about the NDA", speculative=True)
+
+        assert result.category == "risk_analysis"
+        assert result.response == "analyze_risks output"
+        started = {call.args[0] for call in mock_kickoff.call_args_list}
+        assert started == {
+            "classify_request", "extract_clauses", "analyze_risks",
+            "summarize_document", "compare_documents",
+        }
+
+    @pytest.mark.asyncio
+    async def test_batch_groups_queries_by_category(self, patch_crew):
+        """Batch analysis should run one specialist crew per category."""
+        kickoff = AsyncMock(side_effect=[
+            [MagicMock(raw="summarization"), MagicMock(raw="risk_analysis"),
+             MagicMock(raw="summarization")],
+            [MagicMock(raw="summary A"), MagicMock(raw="summary C")],
+            [MagicMock(raw="risks B")],
+        ])
+        patch_crew.Crew.return_value.kickoff_for_each_async = kickoff
+
+        results = await abatch_analyze_documents(["A", "B", "C"])
+
+        assert [r.category for r in results] == [
+            "summarization", "risk_analysis", "summarization",
+        ]
+        assert [r.response for r in results] == ["summary A", "risks B", "summary C"]
+        assert kickoff.await_count == 3
+        assert kickoff.await_args_list[1].kwargs["inputs"] == [{"query": "A"}, {"query": "C"}]
+        # Tasks are built once per crew, never per query
+        assert all(len(call.args) == 2 for call in patch_crew._create_task.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_batch_classify_respects_concurrency(self, patch_crew):
+        """No more than `concurrency` inputs should be sent per kickoff_for_each_async."""
+        async def fake_kickoff(inputs):
+            return [MagicMock(raw="comparison") for _ in inputs]
+
+        kickoff = AsyncMock(side_effect=fake_kickoff)
+        patch_crew.Crew.return_value.kickoff_for_each_async = kickoff
+
+        categories = await abatch_classify_requests([f"q{i}" for i in range(5)], concurrency=2)
+
+        assert categories == ["comparison"] * 5
+        assert [len(c.kwargs["inputs"]) for c in kickoff.await_args_list] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_batch_only_classifies_ambiguous_queries(self, patch_crew):
+        with patch(
+            "legal_document_analyzer.crew.abatch_classify_requests",
+            AsyncMock(return_value=["comparison"]),
+        ) as mock_classify:
+            patch_crew.Crew.return_value.kickoff_for_each_async = AsyncMock(
+                return_value=[MagicMock(raw="diff A"), MagicMock(raw="diff B")],
+            )
+            results = await abatch_analyze_documents(["Review these", "Compare X and Y"])
+
+        assert mock_classify.await_args.args[0] == ["Review these"]
+        assert [r.category for r in results] == ["comparison", "comparison"]
+
+    @pytest.mark.asyncio
+    async def test_batch_runs_duplicate_queries_once(self, patch_crew):
+        kickoff = AsyncMock(return_value=[MagicMock(raw="summary")])
+        patch_crew.Crew.return_value.kickoff_for_each_async = kickoff
+
+        results = await abatch_analyze_documents(["Summarize the NDA", "summarize the NDA"])
+
+        assert kickoff.await_args.kwargs["inputs"] == [{"query": "Summarize the NDA"}]
+        assert [r.query for r in results] == ["Summarize the NDA", "summarize the NDA"]
+        assert [r.response for r in results] == ["summary", "summary"]
+
+    @pytest.mark.asyncio
+    async def test_batch_empty_returns_empty(self):
+        assert await abatch_analyze_documents([]) == []
+
+    def test_interactive_reuses_one_event_loop(self, monkeypatch, capsys):
+        """Speculative queries in one interactive session should share an event loop."""
+        loops = []
+
+        async def fake_analyze(query, speculative=False, category=None):
+            loops.append(asyncio.get_running_loop())
+            return MagicMock(category="summarization", response="ok")
+
+        inputs = iter(["Review the NDA", "Review the license", "quit"])
+        monkeypatch.setattr("builtins.input", lambda _prompt: next(inputs))
+        monkeypatch.setattr("sys.argv", ["legal_document_analyzer", "--speculative"])
+        monkeypatch.setattr(main, "_warm_up", lambda: None)
+        monkeypatch.setattr(main, "load_dotenv", lambda _path: None)
+
+        with patch("legal_document_analyzer.crew.aanalyze_document", side_effect=fake_analyze):
+            main.main()
+
+        assert len(loops) == 2
+        assert loops[0] is loops[1]
+        assert "Goodbye!" in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_process_batch_prints_in_input_order(self, capsys):
+        with patch(
+            "legal_document_analyzer.crew.abatch_classify_requests",
+            AsyncMock(return_value=["summarization", "comparison"]),
+        ):
+            await _process_batch(["first", "second"], classify_only=True)
+
+        output = capsys.readouterr().out
+        assert output.index("first") < output.index("second")
+        assert "Query 2/2" in output
+        assert "Category: comparison" in output
@@ -10,22 +10,77 @@ It includes a classifier agent that routes requests to specialized agents:
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+import re
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import TYPE_CHECKING, Any, Literal
 
-import yaml
-from crewai import Agent, Crew, Process, Task
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    from crewai import Agent, Crew, Process, Task
+
+logger = logging.getLogger(__name__)
+
+# ─── Lazy Imports ────────────────────────────────────────────────────────────
+
+# CrewAI pulls in LiteLLM, tokenizers and the provider SDKs, which takes
+# seconds. It is imported on first use so that importing this module (the
+# CLI's --help, the tests' tool checks) stays fast.
+_CREWAI_NAMES = ("Agent", "Crew", "Process", "Task")
+
+
+def _import_crewai() -> None:
+    """Bind CrewAI's classes as module globals on first use.
+
+    Names that are already bound (e.g. patched by a test) are left alone.
+    """
+    module_globals = globals()
+    if all(name in module_globals for name in _CREWAI_NAMES):
+        return
+    import crewai
+
+    for name in _CREWAI_NAMES:
+        module_globals.setdefault(name, getattr(crewai, name))
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``crew.Crew`` and friends for callers outside this module."""
+    if name in _CREWAI_NAMES:
+        _import_crewai()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # ─── Configuration ───────────────────────────────────────────────────────────
 
+# filename -> (mtime, size, parsed config)
+_YAML_CACHE: dict[str, tuple[float, int, dict]] = {}
+
 
 def _load_yaml(filename: str) -> dict:
-    """Load a YAML configuration file."""
+    """Load a YAML configuration file.
+
+    Parsed configs are cached per process and re-parsed only when the file's
+    mtime or size changes. The cached dict is shared between callers, so it
+    must be treated as read-only.
+    """
     filepath = Path(__file__).parent / "config" / filename
+    stat = filepath.stat()
+    cached = _YAML_CACHE.get(filename)
+    if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+
+    import yaml
+
     with open(filepath, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        config = yaml.safe_load(f)
+    _YAML_CACHE[filename] = (stat.st_mtime, stat.st_size, config)
+    return config
 
 
 # ─── State ───────────────────────────────────────────────────────────────────
@@ -40,22 +95,69 @@ class SalesResult(BaseModel):
 
 # ─── Agent Factory ───────────────────────────────────────────────────────────
 
+# CLASSIFIER_PROVIDER -> default classifier model (LiteLLM provider/model syntax).
+# Routing needs only a four-way label, so a small model on a fast endpoint does.
+_CLASSIFIER_PROVIDERS: dict[str, str] = {
+    "openai": "gpt-4o-mini",
+    "groq": "groq/llama-3.1-8b-instant",
+    "cerebras": "cerebras/llama3.1-8b",
+    "ollama": "ollama/llama3.1",
+}
+
+
+def _classifier_model() -> str:
+    """The classifier's LLM: CLASSIFIER_MODEL, else CLASSIFIER_PROVIDER's default."""
+    model = os.getenv("CLASSIFIER_MODEL")
+    if model:
+        return model
+    provider = os.getenv("CLASSIFIER_PROVIDER", "openai").strip().lower()
+    try:
+        return _CLASSIFIER_PROVIDERS[provider]
+    except KeyError:
+        raise ValueError(
+            f"Unknown CLASSIFIER_PROVIDER: {provider!r} "
+            f"(expected one of {', '.join(_CLASSIFIER_PROVIDERS)})"
+        ) from None
+
+
+def _verbose() -> bool:
+    """Whether specialist agents echo their reasoning: VERBOSE, else DEBUG.
+
+    CrewAI writes verbose output to stdout synchronously on the request
+    thread, so it is off unless asked for.
+    """
+    debug = os.getenv("DEBUG", "").lower() in ("1", "true")
+    return os.getenv("VERBOSE", "true" if debug else "false").lower() == "true"
+
+
 def _create_agents() -> dict[str, Agent]:
-    """Create agents from YAML configuration."""
+    """Create agents from YAML configuration.
+
+    Agents are built once per distinct (MODEL, classifier model, verbosity)
+    combination and reused for the rest of the process.
+    """
+    return _build_agents(
+        os.getenv("MODEL", "gpt-4o"),
+        _classifier_model(),
+        _verbose(),
+    )
+
+
+@lru_cache(maxsize=1)
+def _build_agents(model: str, classifier_model: str, verbose: bool) -> dict[str, Agent]:
+    """Build all agents for the given model settings."""
     from sales_lead_qualifier.tools.custom_tool import lookup_company, search_lead_database
 
     agents_config = _load_yaml("agents.yaml")
-    model = os.getenv("MODEL", "gpt-4o")
-    classifier_model = os.getenv("CLASSIFIER_MODEL", "gpt-4o-mini")
-    verbose = os.getenv("VERBOSE", "true").lower() == "true"
 
+    _import_crewai()
     return {
         "classifier": Agent(
             role=agents_config["classifier"]["role"],
             goal=agents_config["classifier"]["goal"],
             backstory=agents_config["classifier"]["backstory"],
             llm=classifier_model,
-            verbose=verbose,
+            verbose=False,  # a one-word label; nothing worth echoing
         ),
         "lead_scorer": Agent(
             role=agents_config["lead_scorer"]["role"],
@@ -92,88 +194,531 @@ def _create_agents() -> dict[str, Agent]:
     }
 
 
+def _reset_agents() -> None:
+    """Drop the memoized agents, the crews built on them and cached results."""
+    _build_agents.cache_clear()
+    _CREWS.clear()
+    _RESULT_CACHE.clear()
+
+
 # ─── Task Factory ────────────────────────────────────────────────────────────
 
+# (tasks.yaml config they were compiled from, task key -> template)
+_TASK_TEMPLATES: tuple[dict, dict[str, tuple[tuple[str, ...], str]]] | None = None
+
+
+def _task_templates() -> dict[str, tuple[tuple[str, ...], str]]:
+    """Task key -> (description split around ``{query}``, expected output).
+
+    Compiled once per parsed tasks.yaml, so they follow _load_yaml's
+    cache and are rebuilt only when the file changes. Rejoining the split
+    description with the query is equivalent to ``.replace("{query}", query)``
+    without rescanning the description for the placeholder.
+    """
+    global _TASK_TEMPLATES
+
+    config = _load_yaml("tasks.yaml")
+    if _TASK_TEMPLATES is None or _TASK_TEMPLATES[0] is not config:
+        _TASK_TEMPLATES = (config, {
+            key: (tuple(cfg["description"].split("{query}")), cfg["expected_output"])
+            for key, cfg in config.items()
+        })
+    return _TASK_TEMPLATES[1]
+
+
 def _create_task(
     task_key: str,
     agent: Agent,
     query: str,
 ) -> Task:
     """Create a task from YAML configuration with query interpolation."""
-    tasks_config = _load_yaml("tasks.yaml")
-    task_cfg = tasks_config[task_key]
+    description_parts, expected_output = _task_templates()[task_key]
 
+    _import_crewai()
     return Task(
-        description=task_cfg["description"].replace("{query}", query),
-        expected_output=task_cfg["expected_output"],
+        description=query.join(description_parts),
+        expected_output=expected_output,
         agent=agent,
     )
 
 
+# ─── Routing ─────────────────────────────────────────────────────────────────
+
+# category -> (task key, agent key)
+_ROUTES: dict[str, tuple[str, str]] = {
+    "lead_scoring": ("score_lead", "lead_scorer"),
+    "company_research": ("research_company", "company_researcher"),
+    "email_outreach": ("compose_email", "email_composer"),
+    "objection_handling": ("handle_objection", "objection_handler"),
+}
+
+
+# Classifier-output rules in priority order: the first pattern found anywhere
+# in the raw output wins. Exact labels and two-word matches ("lead" ... "scor",
+# in either order) come before single loose keywords.
+_CLASSIFY_RULES: tuple[tuple[re.Pattern[str], str], ...] = tuple(
+    (re.compile(pattern, re.IGNORECASE | re.DOTALL), category)
+    for pattern, category in (
+        (r"lead_scoring|^(?=.*lead).*scor", "lead_scoring"),
+        (r"company_research|^(?=.*company).*research", "company_research"),
+        (r"email_outreach|^(?=.*email).*(?:outreach|compose)", "email_outreach"),
+        (r"objection", "objection_handling"),
+        (r"qualify|bant|score", "lead_scoring"),
+        (r"research|intel", "company_research"),
+        (r"email|write|draft", "email_outreach"),
+    )
+)
+
+
+def _normalize_category(raw: str) -> str:
+    """Map raw classifier output to a known category."""
+    for pattern, category in _CLASSIFY_RULES:
+        if pattern.search(raw):
+            return category
+    return "lead_scoring"  # default fallback
+
+
+# ─── Fast-path Classification ────────────────────────────────────────────────
+
+# Keywords that unambiguously signal a category in the rep's own request
+_QUERY_KEYWORDS: dict[str, re.Pattern[str]] = {
+    "lead_scoring": re.compile(r"\bbant\b|\bqualif|\bscor(?:e|es|ed|ing)\b|\bprioriti[sz]"),
+    "company_research": re.compile(
+        r"\bresearch|\bintel(?:ligence)?\b|\bdecision[- ]makers?\b|\bbackground on\b"
+    ),
+    "email_outreach": re.compile(
+        r"\be-?mails?\b|\boutreach\b|\bfollow[- ]?ups?\b|\bdraft\b|\bcompose\b"
+    ),
+    "objection_handling": re.compile(
+        r"\bobjections?\b|\bpushback\b|\btoo (?:high|expensive|pricey)\b"
+        r"|\bnot interested\b|\bcompetitors?\b"
+    ),
+}
+
+
+def _fast_classify(query: str) -> str | None:
+    """Classify a request locally when exactly one category's keywords match.
+
+    Returns None for ambiguous or keyword-free requests, which still go to
+    the LLM classifier.
+    """
+    query = query.casefold()
+    matches = [cat for cat, pattern in _QUERY_KEYWORDS.items() if pattern.search(query)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def _likely_category(query: str) -> str:
+    """Best guess at a request's category: the one with the most keyword hits.
+
+    Ties go to the earlier category; keyword-free requests fall back to
+    lead_scoring, the classifier's own default.
+    """
+    query = query.casefold()
+    hits = {cat: len(pattern.findall(query)) for cat, pattern in _QUERY_KEYWORDS.items()}
+    best = max(hits, key=hits.__getitem__)
+    return best if hits[best] else "lead_scoring"
+
+
+# ─── Embedding Router ────────────────────────────────────────────────────────
+
+# Example requests per category. With EMBEDDING_ROUTER_MODEL set (and the
+# optional ``router`` extra installed), a request the keywords can't settle
+# goes to the category of its most similar example before any LLM call.
+_PROTOTYPES: dict[str, tuple[str, ...]] = {
+    "lead_scoring": (
+        "Score this lead using BANT",
+        "How qualified is this prospect?",
+        "Is this account a hot, warm or cold lead?",
+        "Should we prioritize this company?",
+    ),
+    "company_research": (
+        "Research this company before our call",
+        "Tell me about this company's background",
+        "Who are the decision makers at this account?",
+        "What tech stack and pain points does this company have?",
+    ),
+    "email_outreach": (
+        "Write a cold email to this prospect",
+        "Draft a follow-up message after our demo",
+        "Compose a personalized outreach email",
+        "Reach out to this contact about our product",
+    ),
+    "objection_handling": (
+        "The prospect says our price is too high",
+        "They are already using a competitor",
+        "How do I respond to this objection?",
+        "They went quiet after the demo",
+    ),
+}
+
+# Below this gap between the best and second-best category, the LLM decides
+_ROUTER_MIN_MARGIN = 0.05
+
+
+def _unit(vector: Any) -> tuple[float, ...]:
+    """``vector`` scaled to unit length, so dot products are cosine similarities."""
+    values = [float(x) for x in vector]
+    norm = sum(x * x for x in values) ** 0.5 or 1.0
+    return tuple(x / norm for x in values)
+
+
+@lru_cache(maxsize=1)
+def _load_router(model_name: str) -> tuple[Any, list[tuple[str, tuple[float, ...]]]] | None:
+    """The embedding model and its embedded prototypes, or None without fastembed."""
+    try:
+        from fastembed import TextEmbedding
+    except ImportError:  # fastembed is optional; the LLM classifier covers every request
+        return None
+
+    embedder = TextEmbedding(model_name)
+    labelled = [(cat, text) for cat, texts in _PROTOTYPES.items() for text in texts]
+    vectors = embedder.embed([text for _, text in labelled])
+    return embedder, [(cat, _unit(v)) for (cat, _), v in zip(labelled, vectors)]
+
+
+@lru_cache(maxsize=1024)
+def _embed_query(model_name: str, query: str) -> tuple[float, ...]:
+    embedder, _ = _load_router(model_name)
+    return _unit(next(iter(embedder.embed([query]))))
+
+
+def _embedding_classify(query: str) -> str | None:
+    """Route a request by cosine similarity to the category prototypes.
+
+    Returns None when the router is disabled or unavailable, or when the top
+    two categories are within :data:`_ROUTER_MIN_MARGIN` of each other.
+    """
+    model_name = os.getenv("EMBEDDING_ROUTER_MODEL")
+    if not model_name or _load_router(model_name) is None:
+        return None
+
+    _, prototypes = _load_router(model_name)
+    query_vector = _embed_query(model_name, " ".join(query.split()))
+    scores: dict[str, float] = {}
+    for category, vector in prototypes:
+        similarity = sum(a * b for a, b in zip(query_vector, vector))
+        scores[category] = max(similarity, scores.get(category, -1.0))
+
+    best, runner_up = sorted(scores, key=scores.__getitem__, reverse=True)[:2]
+    if scores[best] - scores[runner_up] < _ROUTER_MIN_MARGIN:
+        return None
+    return best
+
+
+def _local_classify(query: str) -> str | None:
+    """Classify without an LLM call: keywords first, then the embedding router."""
+    return _fast_classify(query) or _embedding_classify(query)
+
+
+# ─── Result Cache ────────────────────────────────────────────────────────────
+
+_RESULT_CACHE_SIZE = 1024
+
+# (normalized query, models, lead database version) -> result
+_RESULT_CACHE: OrderedDict[tuple, SalesResult] = OrderedDict()
+
+
+def _normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as a cache key."""
+    return " ".join(query.casefold().split())
+
+
+def _result_key(query: str) -> tuple:
+    from sales_lead_qualifier.tools.custom_tool import knowledge_base_version
+
+    return (
+        _normalize_query(query),
+        os.getenv("MODEL", "gpt-4o"),
+        _classifier_model(),
+        knowledge_base_version(),
+    )
+
+
+def _cached_result(query: str, key: tuple) -> SalesResult | None:
+    """Cached result for ``key``, re-labelled with this exact query text."""
+    hit = _RESULT_CACHE.get(key)
+    if hit is None:
+        return None
+    _RESULT_CACHE.move_to_end(key)
+    return hit.model_copy(update={"query": query})
+
+
+def _cache_result(key: tuple, result: SalesResult) -> SalesResult:
+    """Store ``result``, evicting the least recently used entries beyond the limit."""
+    _RESULT_CACHE[key] = result
+    _RESULT_CACHE.move_to_end(key)
+    while len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+        _RESULT_CACHE.popitem(last=False)
+    return result
+
+
+# ─── Crew Factory ────────────────────────────────────────────────────────────
+
+def _build_crew(agent: Agent, task: Task, **crew_kwargs) -> Crew:
+    """Create a sequential crew running ``task`` with its single ``agent``."""
+    _import_crewai()
+    return Crew(agents=[agent], tasks=[task], process=Process.sequential, **crew_kwargs)
+
+
+# task key -> (agent the crew was built for, crew)
+_CREWS: dict[str, tuple[Agent, Crew]] = {}
+
+
+def _get_crew(task_key: str, agent: Agent, **crew_kwargs) -> Crew:
+    """Return the reusable single-task crew for ``task_key``.
+
+    The task keeps its ``{query}`` placeholder and each kickoff passes
+    ``inputs={"query": ...}``; CrewAI re-interpolates from the original
+    description every time. The crew is rebuilt if the memoized agents
+    change. Kickoff mutates the task, so only the synchronous paths kick
+    these crews off directly; batches hand them to ``kickoff_for_each_async``,
+    which runs a copy per input, and the other async paths build their own.
+    """
+    cached = _CREWS.get(task_key)
+    if cached is None or cached[0] is not agent:
+        # "{query}" is left in place for kickoff to fill per input
+        task = _create_task(task_key, agent, "{query}")
+        cached = (agent, _build_crew(agent, task, **crew_kwargs))
+        _CREWS[task_key] = cached
+    return cached[1]
+
+
 # ─── Main Processing Functions ───────────────────────────────────────────────
 
-def classify_request(query: str) -> str:
+def classify_request(query: str, agents: dict[str, Agent] | None = None) -> str:
     """Classify a sales request.
 
     Returns one of: lead_scoring, company_research, email_outreach, objection_handling.
+    Requests settled by keywords or the embedding router (see
+    :func:`_local_classify`) skip the LLM call.
     """
-    agents = _create_agents()
-    task = _create_task("classify_request", agents["classifier"], query)
+    category = _local_classify(query)
+    if category is not None:
+        logger.debug("Classified locally as %s: %r", category, query)
+        return category
 
-    crew = Crew(
-        agents=[agents["classifier"]],
-        tasks=[task],
-        process=Process.sequential,
-        verbose=False,
-    )
-    result = crew.kickoff()
-    raw = result.raw.strip().lower()
-
-    # Normalize the output
-    if "lead_scoring" in raw or ("lead" in raw and "scor" in raw):
-        return "lead_scoring"
-    elif "company_research" in raw or ("company" in raw and "research" in raw):
-        return "company_research"
-    elif "email_outreach" in raw or "email" in raw and ("outreach" in raw or "compose" in raw):
-        return "email_outreach"
-    elif "objection_handling" in raw or "objection" in raw:
-        return "objection_handling"
-    elif "qualify" in raw or "bant" in raw or "score" in raw:
-        return "lead_scoring"
-    elif "research" in raw or "intel" in raw:
-        return "company_research"
-    elif "email" in raw or "write" in raw or "draft" in raw:
-        return "email_outreach"
-    return "lead_scoring"  # default fallback
+    agents = agents or _create_agents()
+    crew = _get_crew("classify_request", agents["classifier"], verbose=False)
+    result = crew.kickoff(inputs={"query": query})
+    category = _normalize_category(result.raw)
+    logger.debug("Classified by LLM as %s (raw %r): %r", category, result.raw, query)
+    return category
 
 
 def handle_request(query: str) -> SalesResult:
-    """Process a sales request through the full pipeline."""
-    # Step 1: Classify
-    category = classify_request(query)
+    """Process a sales request through the full pipeline.
 
-    # Step 2: Route to specialist
-    agents = _create_agents()
+    Results are cached per normalized query until the models or the lead
+    database change, so a repeated question skips both LLM calls.
+    """
+    key = _result_key(query)
+    cached = _cached_result(query, key)
+    if cached is not None:
+        logger.debug("Result cache hit: %r", query)
+        return cached
 
-    task_map = {
-        "lead_scoring": ("score_lead", agents["lead_scorer"]),
-        "company_research": ("research_company", agents["company_researcher"]),
-        "email_outreach": ("compose_email", agents["email_composer"]),
-        "objection_handling": ("handle_objection", agents["objection_handler"]),
-    }
+    agents = _create_agents()
 
-    task_key, agent = task_map[category]
-    task = _create_task(task_key, agent, query)
+    # Step 1: Classify
+    category = classify_request(query, agents)
 
-    crew = Crew(
-        agents=[agent],
-        tasks=[task],
-        process=Process.sequential,
-    )
-    result = crew.kickoff()
+    # Step 2: Route to specialist
+    task_key, agent_key = _ROUTES[category]
+    result = _get_crew(task_key, agents[agent_key]).kickoff(inputs={"query": query})
 
-    return SalesResult(
+    return _cache_result(key, SalesResult(
         query=query,
         category=category,
         response=result.raw,
+    ))
+
+
+# ─── Async Processing ────────────────────────────────────────────────────────
+
+async def _kickoff_async(task_key: str, agent: Agent, query: str, **crew_kwargs) -> str:
+    """Run a single-task crew without blocking the event loop.
+
+    Builds a crew around a task filled with ``query`` and kicks it off
+    directly. The task is never shared, so concurrent runs don't step on
+    each other the way they would on the :func:`_get_crew` crews; the
+    memoized agents are shared. ``crew_kwargs`` (e.g. a per-run
+    ``step_callback``) are passed to the new crew.
+    """
+    crew = _build_crew(agent, _create_task(task_key, agent, query), **crew_kwargs)
+    result = await crew.kickoff_async()
+    return result.raw
+
+
+async def aclassify_request(query: str, agents: dict[str, Agent] | None = None) -> str:
+    """Async variant of :func:`classify_request`."""
+    category = _local_classify(query)
+    if category is not None:
+        return category
+
+    agents = agents or _create_agents()
+    raw = await _kickoff_async("classify_request", agents["classifier"], query, verbose=False)
+    return _normalize_category(raw)
+
+
+async def handle_request_async(query: str) -> SalesResult:
+    """Async variant of :func:`handle_request` with speculative execution.
+
+    When local classification is inconclusive, the most likely specialist
+    (see :func:`_likely_category`) starts alongside the LLM classifier. If
+    the classifier agrees, the request costs one round-trip instead of two;
+    otherwise the guess is cancelled and the right specialist runs. A
+    cancelled guess stops being awaited, but its in-flight LLM call still
+    completes in CrewAI's worker thread. Results share
+    :func:`handle_request`'s cache.
+    """
+    key = _result_key(query)
+    cached = _cached_result(query, key)
+    if cached is not None:
+        return cached
+
+    agents = _create_agents()
+    category = _local_classify(query)
+    response: str | None = None
+
+    if category is None:
+        guess = _likely_category(query)
+        task_key, agent_key = _ROUTES[guess]
+        speculative = asyncio.create_task(_kickoff_async(task_key, agents[agent_key], query))
+        try:
+            category = await aclassify_request(query, agents)
+        except BaseException:
+            speculative.cancel()
+            raise
+        if category == guess:
+            response = await speculative
+        else:
+            speculative.cancel()
+
+    if response is None:
+        task_key, agent_key = _ROUTES[category]
+        response = await _kickoff_async(task_key, agents[agent_key], query)
+    return _cache_result(key, SalesResult(query=query, category=category, response=response))
+
+
+def _step_text(step: Any) -> str:
+    """Readable text of a CrewAI agent step (an AgentAction or AgentFinish)."""
+    return getattr(step, "text", None) or str(step)
+
+
+async def stream_handle_request(query: str) -> AsyncIterator[SalesResult | str]:
+    """Process a sales request, yielding progress as it happens.
+
+    Yields a :class:`SalesResult` with an empty response as soon as the
+    request is classified, then the text of each specialist step as CrewAI
+    reports it, and finally the complete :class:`SalesResult`. A cached
+    result is yielded on its own.
+    """
+    key = _result_key(query)
+    cached = _cached_result(query, key)
+    if cached is not None:
+        yield cached
+        return
+
+    agents = _create_agents()
+    category = await aclassify_request(query, agents)
+    yield SalesResult(query=query, category=category, response="")
+
+    # Steps are reported from CrewAI's worker thread; hop them onto the loop
+    loop = asyncio.get_running_loop()
+    steps: asyncio.Queue[str | None] = asyncio.Queue()
+
+    def on_step(step: Any) -> None:
+        loop.call_soon_threadsafe(steps.put_nowait, _step_text(step))
+
+    task_key, agent_key = _ROUTES[category]
+    run = asyncio.create_task(
+        _kickoff_async(task_key, agents[agent_key], query, step_callback=on_step)
     )
+    # Queued after every step the worker thread has already reported
+    run.add_done_callback(lambda _: steps.put_nowait(None))
+    try:
+        while (text := await steps.get()) is not None:
+            yield text
+        response = await run
+    finally:
+        run.cancel()
+
+    yield _cache_result(key, SalesResult(query=query, category=category, response=response))
+
+
+# ─── Batch Processing ────────────────────────────────────────────────────────
+
+# Specialist runs in flight at once during a batch (rate-limit headroom)
+_BATCH_CONCURRENCY = 4
+
+
+async def _kickoff_for_each(crew: Crew, queries: list[str], concurrency: int) -> list[str]:
+    """Run ``crew`` once per query, at most ``concurrency`` runs at a time.
+
+    ``kickoff_for_each_async`` copies the crew for each input it is given,
+    so feeding it one chunk at a time bounds both the parallel LLM calls
+    and the copies alive at once; ``crew`` itself is never kicked off.
+    """
+    step = max(1, concurrency)
+    raws: list[str] = []
+    for start in range(0, len(queries), step):
+        outputs = await crew.kickoff_for_each_async(
+            inputs=[{"query": query} for query in queries[start:start + step]],
+        )
+        raws.extend(output.raw for output in outputs)
+    return raws
+
+
+def classify_requests(
+    queries: list[str],
+    agents: dict[str, Agent] | None = None,
+    concurrency: int = _BATCH_CONCURRENCY,
+) -> list[str]:
+    """Classify many sales requests, in input order.
+
+    Locally classified requests skip the LLM; the rest run through the
+    cached classifier crew, ``concurrency`` at a time.
+    """
+    categories = [_local_classify(query) for query in queries]
+    pending = [i for i, category in enumerate(categories) if category is None]
+    if pending:
+        agents = agents or _create_agents()
+        crew = _get_crew("classify_request", agents["classifier"], verbose=False)
+        raws = asyncio.run(_kickoff_for_each(crew, [queries[i] for i in pending], concurrency))
+        for i, raw in zip(pending, raws):
+            categories[i] = _normalize_category(raw)
+    return categories
+
+
+def handle_requests(
+    queries: list[str],
+    concurrency: int = _BATCH_CONCURRENCY,
+) -> list[SalesResult]:
+    """Process many sales requests, returning results in input order.
+
+    Cached results are served first. The remaining requests are classified
+    together and grouped by category. Each group runs through its cached
+    specialist crew, ``concurrency`` queries at a time, so agents and tasks
+    are built once per category; CrewAI runs a copy of the crew per query.
+    """
+    keys = [_result_key(query) for query in queries]
+    results = [_cached_result(query, key) for query, key in zip(queries, keys)]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    agents = _create_agents()
+    categories = classify_requests([queries[i] for i in pending], agents)
+
+    by_category: dict[str, list[int]] = {}
+    for i, category in zip(pending, categories):
+        by_category.setdefault(category, []).append(i)
+
+    for category, indices in by_category.items():
+        task_key, agent_key = _ROUTES[category]
+        crew = _get_crew(task_key, agents[agent_key])
+        raws = asyncio.run(_kickoff_for_each(crew, [queries[i] for i in indices], concurrency))
+        for i, raw in zip(indices, raws):
+            result = SalesResult(query=queries[i], category=category, response=raw)
+            results[i] = _cache_result(keys[i], result)
+    return results
@@ -7,13 +7,25 @@ Usage:
     # Single query mode
     python -m sales_lead_qualifier --query "Score TechFlow Solutions as a lead"
 
-    # Batch mode from file
+    # Speculative mode (likely specialist starts alongside the classifier)
+    python -m sales_lead_qualifier --query "How hot is TechFlow?" --speculative
+
+    # Streaming mode (category first, then each specialist step as it happens)
+    python -m sales_lead_qualifier --query "Research MediCore Health" --stream
+
+    # Batch mode from file (queries are classified and dispatched together)
     python -m sales_lead_qualifier --file queries.txt
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
 import sys
 from pathlib import Path
 
@@ -25,6 +37,7 @@ def main() -> None:
     # Load environment variables
     env_path = Path(__file__).parent.parent.parent / ".env"
     load_dotenv(env_path)
+    _configure_logging()
 
     parser = argparse.ArgumentParser(
         description="AI Sales Lead Qualifier Agent powered by CrewAI"
@@ -44,11 +57,21 @@ def main() -> None:
         action="store_true",
         help="Only classify the request without generating a response",
     )
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Start the most likely specialist alongside the classifier to cut latency",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the category and each specialist step as soon as they are ready",
+    )
     args = parser.parse_args()
 
     if args.query:
         # Single query mode
-        _process_query(args.query, args.classify_only)
+        _process_query(args.query, args.classify_only, args.speculative, args.stream)
 
     elif args.file:
         # Batch mode
@@ -57,14 +80,12 @@ def main() -> None:
             print(f"Error: File not found: {filepath}")
             sys.exit(1)
 
-        queries = filepath.read_text(encoding="utf-8").strip().splitlines()
-        for i, query in enumerate(queries, 1):
-            query = query.strip()
-            if query and not query.startswith("#"):
-                print(f"\n{'='*60}")
-                print(f"Query {i}/{len(queries)}")
-                print(f"{'='*60}")
-                _process_query(query, args.classify_only)
+        queries = [
+            line.strip()
+            for line in filepath.read_text(encoding="utf-8").splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+        _process_batch(queries, args.classify_only)
 
     else:
         # Interactive mode
@@ -81,24 +102,100 @@ def main() -> None:
                 break
             if not query:
                 continue
-            _process_query(query, args.classify_only)
-
-
-def _process_query(query: str, classify_only: bool = False) -> None:
+            _process_query(query, args.classify_only, args.speculative, args.stream)
+
+
+def _configure_logging() -> None:
+    """Send this package's log records to stderr from a background thread.
+
+    Records are queued on the calling thread and written by a
+    ``QueueListener``, so console I/O never blocks request handling. The
+    level is LOG_LEVEL, or DEBUG when DEBUG=1.
+    """
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    if os.getenv("DEBUG", "").lower() in ("1", "true"):
+        level = "DEBUG"
+    logger = logging.getLogger("sales_lead_qualifier")
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.setLevel(level)
+
+
+def _process_query(
+    query: str,
+    classify_only: bool = False,
+    speculative: bool = False,
+    stream: bool = False,
+) -> None:
     """Process a single sales query."""
-    from sales_lead_qualifier.crew import classify_request, handle_request
+    from sales_lead_qualifier.crew import (
+        classify_request,
+        handle_request,
+        handle_request_async,
+    )
 
     print(f"\nProcessing: {query}")
     print("-" * 40)
 
-    if classify_only:
+    if stream and not classify_only:
+        asyncio.run(_stream_query(query))
+    elif classify_only:
         category = classify_request(query)
         print(f"Category: {category}")
     else:
-        result = handle_request(query)
+        if speculative:
+            result = asyncio.run(handle_request_async(query))
+        else:
+            result = handle_request(query)
         print(f"Category: {result.category}")
         print(f"\nResponse:\n{result.response}")
 
 
+async def _stream_query(query: str) -> None:
+    """Print a streamed sales query: category, specialist steps, final response."""
+    from sales_lead_qualifier.crew import stream_handle_request
+
+    category = None
+    async for event in stream_handle_request(query):
+        if isinstance(event, str):
+            print(f"  … {event.strip()}")
+            continue
+        if event.category != category:
+            category = event.category
+            print(f"Category: {category}")
+        if event.response:
+            print(f"\nResponse:\n{event.response}")
+
+
+def _process_batch(queries: list[str], classify_only: bool = False) -> None:
+    """Process batch queries together, printing results in input order.
+
+    Queries are classified in one pass and each category's queries run
+    through a single specialist crew.
+    """
+    from sales_lead_qualifier.crew import classify_requests, handle_requests
+
+    if classify_only:
+        results = classify_requests(queries)
+    else:
+        results = handle_requests(queries)
+
+    for i, (query, result) in enumerate(zip(queries, results), 1):
+        print(f"\n{'='*60}")
+        print(f"Query {i}/{len(queries)}")
+        print(f"{'='*60}")
+        print(f"\nProcessing: {query}")
+        print("-" * 40)
+        if classify_only:
+            print(f"Category: {result}")
+        else:
+            print(f"Category: {result.category}")
+            print(f"\nResponse:\n{result.response}")
+
+
 if __name__ == "__main__":
     main()
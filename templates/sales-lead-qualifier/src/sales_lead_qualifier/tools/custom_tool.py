@@ -1,7 +1,326 @@
 """Custom tools for the sales lead qualifier agent."""
 
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
+
 from crewai.tools import tool
 
+# ─── Knowledge Index ─────────────────────────────────────────────────────────
+
+_KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+
+
+class _KnowledgeIndex(NamedTuple):
+    """An immutable snapshot of the lead database.
+
+    Tools read one snapshot per call and rebuilds swap in a whole new one,
+    so CrewAI's parallel tool execution never sees a half-built index.
+    """
+
+    # "### " sections of every knowledge file, stripped, in file order
+    sections: list[str]
+    # the same sections lowercased once, for substring confirmation
+    sections_lower: list[str]
+    # trigram of the lowercased section text -> positions of sections containing it
+    trigrams: dict[str, set[int]]
+    files: list[Path]
+    signature: tuple[int, ...]
+
+
+_INDEX: _KnowledgeIndex | None = None
+_INDEX_LOCK = threading.Lock()
+
+# Kept beside (not inside) the knowledge directory, whose mtime is part of
+# the index signature. Bump the version whenever _KnowledgeIndex changes.
+_INDEX_CACHE = _KNOWLEDGE_DIR.parent / ".knowledge_index.pkl"
+_INDEX_CACHE_VERSION = 2
+
+
+def _index_signature(files: list[Path]) -> tuple[int, ...]:
+    """mtimes of the knowledge directory and each indexed file.
+
+    Adding or removing a file changes the directory mtime; editing one in
+    place changes its own mtime.
+    """
+    return (_KNOWLEDGE_DIR.stat().st_mtime_ns, *(f.stat().st_mtime_ns for f in files))
+
+
+def _trigrams(text: str) -> set[str]:
+    """Every three-character substring of ``text``."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _is_current(index: _KnowledgeIndex | None) -> bool:
+    """Whether ``index`` still matches the files on disk."""
+    try:
+        return index is not None and _index_signature(index.files) == index.signature
+    except OSError:
+        return False
+
+
+def _build_index() -> _KnowledgeIndex:
+    """Split every knowledge file into sections and index their trigrams.
+
+    Files are read concurrently (the GIL is released during I/O); indexing
+    then walks them in sorted order so section positions are stable.
+    """
+    files = sorted(_KNOWLEDGE_DIR.glob("*.md"))
+    workers = min(32, (os.cpu_count() or 1) * 4, len(files) or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        contents = list(executor.map(lambda file: file.read_text(encoding="utf-8"), files))
+
+    sections: list[str] = []
+    sections_lower: list[str] = []
+    trigrams: dict[str, set[int]] = {}
+    for content in contents:
+        for section in content.split("\n### "):
+            position = len(sections)
+            section = section.strip()
+            section_lower = section.lower()
+            sections.append(section)
+            sections_lower.append(section_lower)
+            for gram in _trigrams(section_lower):
+                trigrams.setdefault(gram, set()).add(position)
+    return _KnowledgeIndex(sections, sections_lower, trigrams, files, _index_signature(files))
+
+
+def _read_index_cache() -> _KnowledgeIndex | None:
+    """Load the pickled index, or None if it is missing, stale or unreadable."""
+    try:
+        with open(_INDEX_CACHE, "rb") as f:
+            version, index = pickle.load(f)
+    except Exception:  # missing, truncated or written by an incompatible version
+        return None
+    if version != _INDEX_CACHE_VERSION or not _is_current(index):
+        return None
+    return index
+
+
+def _write_index_cache(index: _KnowledgeIndex) -> None:
+    """Atomically pickle ``index``; a read-only install just skips the cache."""
+    tmp_path = _INDEX_CACHE.with_name(f"{_INDEX_CACHE.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((_INDEX_CACHE_VERSION, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _INDEX_CACHE)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _load_index() -> _KnowledgeIndex:
+    """Return the knowledge index, rebuilding it when the lead database changes.
+
+    A fresh process first tries the pickled index written by an earlier run
+    and only parses the markdown when the pickle is missing or out of date.
+    """
+    global _INDEX
+
+    index = _INDEX
+    if _is_current(index):
+        return index
+
+    with _INDEX_LOCK:
+        # Another tool call may have rebuilt it while we waited for the lock
+        if _is_current(_INDEX):
+            return _INDEX
+
+        index = _read_index_cache()
+        if index is None:
+            index = _build_index()
+            _write_index_cache(index)
+        _INDEX = index
+        return index
+
+
+def knowledge_base_version() -> tuple[int, ...]:
+    """Signature of the current lead database; changes whenever a knowledge file does."""
+    return _load_index().signature
+
+
+def _matching_sections(query: str) -> list[str]:
+    """Sections containing ``query`` (case-insensitively), in file order.
+
+    Only sections holding every trigram of the query are candidates; the
+    substring check then runs on those alone. Queries shorter than three
+    characters have no trigrams and fall back to checking every section.
+    The substring check runs against lowercased copies made when the index
+    was built, so a search lowercases only the query.
+    """
+    index = _load_index()
+    query_lower = query.lower()
+
+    grams = _trigrams(query_lower)
+    if grams:
+        postings = sorted((index.trigrams.get(g, set()) for g in grams), key=len)
+        candidates = sorted(set.intersection(*postings))
+    else:
+        candidates = range(len(index.sections))
+
+    sections_lower = index.sections_lower
+    return [
+        index.sections[position]
+        for position in candidates
+        if query_lower in sections_lower[position]
+    ]
+
+
+# ─── Company Profiles ────────────────────────────────────────────────────────
+
+# In production, replace with CRM API (Salesforce, HubSpot, etc.)
+# This is sample data for the template, built once at import and read-only
+_SAMPLE_COMPANIES: Mapping[str, dict] = MappingProxyType({
+    "techflow solutions": {
+        "name": "TechFlow Solutions",
+        "industry": "SaaS / Developer Tools",
+        "size": "250 employees",
+        "revenue": "$45M ARR",
+        "headquarters": "Austin, TX",
+        "website": "techflow.example.com",
+        "key_contacts": [
+            "Sarah Chen — VP of Engineering (decision-maker)",
+            "Mike Rodriguez — CTO (executive sponsor)",
+            "Lisa Park — Engineering Manager (champion)",
+        ],
+        "tech_stack": "AWS, React, PostgreSQL, Jenkins (legacy CI/CD)",
+        "pain_points": "Slow deployment cycles, CI/CD bottlenecks, scaling issues",
+        "budget_signal": "Recently raised Series B ($30M) — actively investing in tooling",
+        "timeline_signal": "Q2 initiative to modernize DevOps pipeline",
+        "current_solution": "Jenkins + custom scripts",
+        "score": 82,
+        "status": "Hot",
+    },
+    "globalmart retail": {
+        "name": "GlobalMart Retail",
+        "industry": "E-commerce / Retail",
+        "size": "1,200 employees",
+        "revenue": "$180M ARR",
+        "headquarters": "Chicago, IL",
+        "website": "globalmart.example.com",
+        "key_contacts": [
+            "James Wilson — Director of IT (evaluator)",
+            "Priya Sharma — VP of Operations (decision-maker)",
+        ],
+        "tech_stack": "Azure, .NET, SQL Server, Shopify Plus",
+        "pain_points": "Inventory management, omnichannel integration, peak season scaling",
+        "budget_signal": "Annual IT budget $12M — current vendor contract renewing in 6 months",
+        "timeline_signal": "Evaluating options for Q3, no hard deadline",
+        "current_solution": "Custom .NET inventory system",
+        "score": 65,
+        "status": "Warm",
+    },
+    "greenleaf energy": {
+        "name": "GreenLeaf Energy",
+        "industry": "Clean Energy / Sustainability",
+        "size": "80 employees",
+        "revenue": "$8M ARR",
+        "headquarters": "Portland, OR",
+        "website": "greenleaf.example.com",
+        "key_contacts": [
+            "Tom Baker — Founder & CEO (decision-maker, but stretched thin)",
+        ],
+        "tech_stack": "Google Cloud, Python, basic spreadsheets for CRM",
+        "pain_points": "Manual processes, no CRM, small team wearing many hats",
+        "budget_signal": "Bootstrapped — limited budget, looking for free/low-cost tiers",
+        "timeline_signal": "No defined timeline, 'maybe next year'",
+        "current_solution": "Spreadsheets + manual email tracking",
+        "score": 28,
+        "status": "Cold",
+    },
+    "medicore health": {
+        "name": "MediCore Health",
+        "industry": "Healthcare Technology",
+        "size": "500 employees",
+        "revenue": "$72M ARR",
+        "headquarters": "Boston, MA",
+        "website": "medicore.example.com",
+        "key_contacts": [
+            "Dr. Angela Martinez — Chief Medical Officer",
+            "Kevin O'Brien — VP of Product (decision-maker)",
+            "Rachel Kim — Head of Data Science (technical evaluator)",
+        ],
+        "tech_stack": "AWS, Python, HIPAA-compliant infrastructure, Snowflake",
+        "pain_points": "Data silos, compliance overhead, slow analytics pipeline",
+        "budget_signal": "$2M allocated for data platform modernization in FY2026",
+        "timeline_signal": "RFP due by end of Q1, decision by Q2",
+        "current_solution": "Legacy on-prem data warehouse + Tableau",
+        "score": 91,
+        "status": "Hot",
+    },
+    "pinnacle consulting": {
+        "name": "Pinnacle Consulting Group",
+        "industry": "Management Consulting",
+        "size": "150 employees",
+        "revenue": "$25M ARR",
+        "headquarters": "New York, NY",
+        "website": "pinnacle-consulting.example.com",
+        "key_contacts": [
+            "David Park — Managing Partner (decision-maker)",
+            "Sophie Turner — Director of Operations (champion)",
+        ],
+        "tech_stack": "Microsoft 365, Power BI, Salesforce, custom SharePoint apps",
+        "pain_points": (
+            "Knowledge management, consultant utilization tracking, client reporting"
+        ),
+        "budget_signal": "Mid-range budget, prefers annual contracts under $100K",
+        "timeline_signal": "Active evaluation, comparing 3 vendors this month",
+        "current_solution": "Salesforce + SharePoint + Power BI",
+        "score": 74,
+        "status": "Warm",
+    },
+})
+
+# Punctuation and legal suffixes dropped when matching company names, so
+# "TechFlow Solutions, Inc." finds the same record as "techflow solutions"
+_NAME_PUNCTUATION = str.maketrans("", "", ",.")
+_LEGAL_SUFFIXES = frozenset({"inc", "llc", "ltd", "corp", "corporation", "co", "group"})
+
+
+def _normalize_company(name: str) -> str:
+    """Casefold ``name`` and drop punctuation and legal suffixes."""
+    words = name.casefold().translate(_NAME_PUNCTUATION).split()
+    return " ".join(w for w in words if w not in _LEGAL_SUFFIXES)
+
+
+def _format_company(company: dict) -> str:
+    """Render a company record as the markdown profile the tool returns."""
+    lines = [f"**{k.replace('_', ' ').title()}**: {v}" for k, v in company.items()
+             if k != "key_contacts"]
+    lines.append("**Key Contacts**:")
+    for contact in company["key_contacts"]:
+        lines.append(f"  - {contact}")
+    return "\n".join(lines)
+
+
+def _build_company_index() -> Mapping[str, str]:
+    """Map every accepted spelling of each company to its formatted profile.
+
+    Aliases are the normalized lookup key, the normalized full name and the
+    first word of the name ("TechFlow"); the first record to claim an alias
+    keeps it.
+    """
+    index: dict[str, str] = {}
+    for key, company in _SAMPLE_COMPANIES.items():
+        profile = _format_company(company)
+        full_name = _normalize_company(company["name"])
+        for alias in (_normalize_company(key), full_name, full_name.split()[0]):
+            index.setdefault(alias, profile)
+    return MappingProxyType(index)
+
+
+_COMPANY_INDEX = _build_company_index()
+_COMPANY_NAMES_JOINED = ", ".join(c["name"] for c in _SAMPLE_COMPANIES.values())
+
+
+# ─── Tools ───────────────────────────────────────────────────────────────────
+
 
 @tool("search_lead_database")
 def search_lead_database(query: str) -> str:
@@ -16,20 +335,9 @@ def search_lead_database(query: str) -> str:
     Returns:
         Matching lead and company information from the database.
     """
-    from pathlib import Path
-
-    knowledge_dir = Path(__file__).parent.parent / "knowledge"
-    results: list[str] = []
-
-    for file in knowledge_dir.glob("*.md"):
-        content = file.read_text(encoding="utf-8")
-        sections = content.split("\n### ")
-        for section in sections:
-            if query.lower() in section.lower():
-                results.append(section.strip()[:800])
-
+    results = _matching_sections(query)
     if results:
-        return "\n\n---\n\n".join(results[:10])
+        return "\n\n---\n\n".join(section[:800] for section in results[:10])
     return f"No leads found matching: {query}"
 
 
@@ -46,119 +354,7 @@ def lookup_company(company_name: str) -> str:
     Returns:
         Detailed company profile and lead information.
     """
-    # In production, replace with CRM API (Salesforce, HubSpot, etc.)
-    # This returns sample data for the template
-    sample_companies = {
-        "techflow solutions": {
-            "name": "TechFlow Solutions",
-            "industry": "SaaS / Developer Tools",
-            "size": "250 employees",
-            "revenue": "$45M ARR",
-            "headquarters": "Austin, TX",
-            "website": "techflow.example.com",
-            "key_contacts": [
-                "Sarah Chen — VP of Engineering (decision-maker)",
-                "Mike Rodriguez — CTO (executive sponsor)",
-                "Lisa Park — Engineering Manager (champion)",
-            ],
-            "tech_stack": "AWS, React, PostgreSQL, Jenkins (legacy CI/CD)",
-            "pain_points": "Slow deployment cycles, CI/CD bottlenecks, scaling issues",
-            "budget_signal": "Recently raised Series B ($30M) — actively investing in tooling",
-            "timeline_signal": "Q2 initiative to modernize DevOps pipeline",
-            "current_solution": "Jenkins + custom scripts",
-            "score": 82,
-            "status": "Hot",
-        },
-        "globalmart retail": {
-            "name": "GlobalMart Retail",
-            "industry": "E-commerce / Retail",
-            "size": "1,200 employees",
-            "revenue": "$180M ARR",
-            "headquarters": "Chicago, IL",
-            "website": "globalmart.example.com",
-            "key_contacts": [
-                "James Wilson — Director of IT (evaluator)",
-                "Priya Sharma — VP of Operations (decision-maker)",
-            ],
-            "tech_stack": "Azure, .NET, SQL Server, Shopify Plus",
-            "pain_points": "Inventory management, omnichannel integration, peak season scaling",
-            "budget_signal": "Annual IT budget $12M — current vendor contract renewing in 6 months",
-            "timeline_signal": "Evaluating options for Q3, no hard deadline",
-            "current_solution": "Custom .NET inventory system",
-            "score": 65,
-            "status": "Warm",
-        },
-        "greenleaf energy": {
-            "name": "GreenLeaf Energy",
-            "industry": "Clean Energy / Sustainability",
-            "size": "80 employees",
-            "revenue": "$8M ARR",
-            "headquarters": "Portland, OR",
-            "website": "greenleaf.example.com",
-            "key_contacts": [
-                "Tom Baker — Founder & CEO (decision-maker, but stretched thin)",
-            ],
-            "tech_stack": "Google Cloud, Python, basic spreadsheets for CRM",
-            "pain_points": "Manual processes, no CRM, small team wearing many hats",
-            "budget_signal": "Bootstrapped — limited budget, looking for free/low-cost tiers",
-            "timeline_signal": "No defined timeline, 'maybe next year'",
-            "current_solution": "Spreadsheets + manual email tracking",
-            "score": 28,
-            "status": "Cold",
-        },
-        "medicore health": {
-            "name": "MediCore Health",
-            "industry": "Healthcare Technology",
-            "size": "500 employees",
-            "revenue": "$72M ARR",
-            "headquarters": "Boston, MA",
-            "website": "medicore.example.com",
-            "key_contacts": [
-                "Dr. Angela Martinez — Chief Medical Officer",
-                "Kevin O'Brien — VP of Product (decision-maker)",
-                "Rachel Kim — Head of Data Science (technical evaluator)",
-            ],
-            "tech_stack": "AWS, Python, HIPAA-compliant infrastructure, Snowflake",
-            "pain_points": "Data silos, compliance overhead, slow analytics pipeline",
-            "budget_signal": "$2M allocated for data platform modernization in FY2026",
-            "timeline_signal": "RFP due by end of Q1, decision by Q2",
-            "current_solution": "Legacy on-prem data warehouse + Tableau",
-            "score": 91,
-            "status": "Hot",
-        },
-        "pinnacle consulting": {
-            "name": "Pinnacle Consulting Group",
-            "industry": "Management Consulting",
-            "size": "150 employees",
-            "revenue": "$25M ARR",
-            "headquarters": "New York, NY",
-            "website": "pinnacle-consulting.example.com",
-            "key_contacts": [
-                "David Park — Managing Partner (decision-maker)",
-                "Sophie Turner — Director of Operations (champion)",
-            ],
-            "tech_stack": "Microsoft 365, Power BI, Salesforce, custom SharePoint apps",
-            "pain_points": (
-                "Knowledge management, consultant utilization tracking, client reporting"
-            ),
-            "budget_signal": "Mid-range budget, prefers annual contracts under $100K",
-            "timeline_signal": "Active evaluation, comparing 3 vendors this month",
-            "current_solution": "Salesforce + SharePoint + Power BI",
-            "score": 74,
-            "status": "Warm",
-        },
-    }
-
-    company = sample_companies.get(company_name.lower().strip())
-    if company:
-        lines = [f"**{k.replace('_', ' ').title()}**: {v}" for k, v in company.items()
-                 if k != "key_contacts"]
-        contacts = company["key_contacts"]
-        lines.append("**Key Contacts**:")
-        for contact in contacts:
-            lines.append(f"  - {contact}")
-        return "\n".join(lines)
-    return (
-        f"Company not found: {company_name}. "
-        f"Available companies: {', '.join(c['name'] for c in sample_companies.values())}"
-    )
+    profile = _COMPANY_INDEX.get(_normalize_company(company_name))
+    if profile:
+        return profile
+    return f"Company not found: {company_name}. Available companies: {_COMPANY_NAMES_JOINED}"
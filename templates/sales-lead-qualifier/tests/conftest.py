@@ -0,0 +1,12 @@
+"""Shared pytest setup for the sales lead qualifier tests.
+
+crew.py defers CrewAI until one of its classes is first used, so the first
+test that patches ``Crew``/``Agent``/``Task`` would otherwise pay for CrewAI,
+Pydantic and the provider SDKs. Resolving the names here pays that cost once
+per session (and once per pytest-xdist worker), before any test runs.
+"""
+
+import sales_lead_qualifier.crew
+import sales_lead_qualifier.tools.custom_tool  # noqa: F401
+
+sales_lead_qualifier.crew.Crew  # binds Agent, Crew, Process and Task
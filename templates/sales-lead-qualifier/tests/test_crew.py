@@ -1,7 +1,7 @@
 """Tests for the sales lead qualifier agent.
 
 Covers:
-- Lead database search tool (keyword matching, edge cases)
+- Lead database search tool (keyword matching, edge cases, trigram index)
 - Company lookup tool (valid/invalid company names)
 - Classification normalization logic
 - SalesResult Pydantic model validation
@@ -9,163 +9,299 @@ Covers:
 - Agent factory (mocked LLM)
 - Task factory (query interpolation)
 - classify_request (mocked CrewAI)
+- Embedding router (fake fastembed)
 - handle_request integration (mocked CrewAI)
+- handle_request_async speculative execution and streaming (mocked kickoff)
 - CLI argument parsing
 - Environment variable handling
 """
 
 from __future__ import annotations
 
+import argparse
+import asyncio
 import os
+from functools import lru_cache
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from sales_lead_qualifier import crew
+from sales_lead_qualifier.crew import (
+    SalesResult,
+    _classifier_model,
+    _create_agents,
+    _create_task,
+    _embedding_classify,
+    _fast_classify,
+    _likely_category,
+    _load_yaml,
+    _normalize_category,
+    classify_request,
+    handle_request,
+    handle_requests,
+)
+from sales_lead_qualifier.tools import custom_tool
+from sales_lead_qualifier.tools.custom_tool import lookup_company, search_lead_database
+
+_TEMPLATE_DIR = Path(__file__).parent.parent
+_ENV_EXAMPLE = _TEMPLATE_DIR / ".env.example"
+_GITIGNORE = _TEMPLATE_DIR / ".gitignore"
+
 # Helper: all agent keys for mock setup
-_AGENT_KEYS = [
+_AGENT_KEYS = (
     "classifier", "lead_scorer",
     "company_researcher", "email_composer", "objection_handler",
-]
+)
+_AGENT_KEYS_SET = frozenset(_AGENT_KEYS)
+
+# The Crew methods crew.py calls; mocked crews reject anything else
+_CREW_METHODS = ("kickoff", "kickoff_for_each_async", "kickoff_async")
 
 
 def _mock_agents_dict():
-    """Create a dict of MagicMock agents for all 5 roles."""
-    return {k: MagicMock() for k in _AGENT_KEYS}
+    """Create a dict of stand-in agents for all 5 roles (only passed by identity)."""
+    return {k: object() for k in _AGENT_KEYS}
 
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# 1. Lead Database Search Tool
-# ═══════════════════════════════════════════════════════════════════════════════
+@pytest.fixture(autouse=True)
+def _reset_agents():
+    """Drop memoized agents so each test sees its own Agent mocks."""
+    from sales_lead_qualifier.crew import _reset_agents
 
+    _reset_agents()
+    yield
+    _reset_agents()
 
-class TestLeadDatabaseSearch:
-    """Test the lead database search tool."""
 
-    def test_search_finds_techflow(self):
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
+@pytest.fixture(scope="module")
+def mock_agents():
+    """One set of mock agents shared by the mocked classify/handle tests."""
+    return _mock_agents_dict()
 
-        result = search_lead_database.run("TechFlow")
-        assert "techflow" in result.lower() or "series b" in result.lower()
 
-    def test_search_finds_medicore(self):
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
+@pytest.fixture
+def crew_result():
+    """A stand-in CrewOutput; tests set ``.raw`` to the text the crew returns."""
+    return SimpleNamespace(raw="")
 
-        result = search_lead_database.run("MediCore")
-        assert "medicore" in result.lower() or "healthcare" in result.lower()
 
-    def test_search_no_results(self):
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
+@pytest.fixture
+def patch_crew(monkeypatch, mock_agents, crew_result):
+    """Patch ``Crew``, ``_create_agents`` and ``_create_task`` on the crew module.
 
-        result = search_lead_database.run("xyznonexistent12345")
-        assert "No leads found" in result
+    The mocked crew's ``kickoff`` already returns ``crew_result``, so most tests
+    only set ``crew_result.raw``. Returns the module so tests can reach the mocks,
+    e.g. ``patch_crew.Crew.return_value.kickoff_for_each_async``.
+    """
+    crew_instance = MagicMock(spec=_CREW_METHODS)
+    crew_instance.kickoff.return_value = crew_result
+    crew_instance.kickoff_for_each_async = AsyncMock()
+    monkeypatch.setattr(crew, "Crew", MagicMock(return_value=crew_instance))
+    monkeypatch.setattr(crew, "_create_agents", MagicMock(return_value=mock_agents))
+    monkeypatch.setattr(crew, "_create_task", MagicMock(return_value=object()))
+    return crew
 
-    def test_search_case_insensitive(self):
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
 
-        lower = search_lead_database.run("techflow")
-        upper = search_lead_database.run("TECHFLOW")
-        assert "No leads found" not in lower
-        assert "No leads found" not in upper
+@pytest.fixture(scope="session")
+def search_cache():
+    """search_lead_database.run memoized per exact query for the whole run."""
+    return lru_cache(maxsize=None)(search_lead_database.run)
 
-    def test_search_by_industry(self):
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
 
-        result = search_lead_database.run("Healthcare")
-        assert "No leads found" not in result
+@pytest.fixture(scope="session")
+def lookup_cache():
+    """lookup_company.run memoized per exact name for the whole run."""
+    return lru_cache(maxsize=None)(lookup_company.run)
 
-    def test_search_by_contact_name(self):
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
 
-        result = search_lead_database.run("Sarah Chen")
-        assert "No leads found" not in result
+@pytest.fixture(scope="session")
+def agents_yaml():
+    """agents.yaml, parsed once for the whole run."""
+    return _load_yaml("agents.yaml")
 
-    def test_search_returns_truncated_results(self):
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
 
-        result = search_lead_database.run("lead")
-        for section in result.split("---"):
-            assert len(section.strip()) <= 800 or section.strip() == ""
+@pytest.fixture(scope="session")
+def tasks_yaml():
+    """tasks.yaml, parsed once for the whole run."""
+    return _load_yaml("tasks.yaml")
 
-    def test_search_empty_query(self):
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
 
-        result = search_lead_database.run("")
-        assert isinstance(result, str)
-        assert len(result) > 0
+@pytest.fixture(scope="session")
+def env_example_bytes():
+    """.env.example as raw bytes, read once for the whole run (the checks are ASCII)."""
+    return _ENV_EXAMPLE.read_bytes()
 
-    def test_search_finds_bant_data(self):
-        """BANT assessment data should be searchable."""
-        from sales_lead_qualifier.tools.custom_tool import search_lead_database
 
-        result = search_lead_database.run("Budget")
-        assert "No leads found" not in result
+@pytest.fixture(scope="session")
+def gitignore_bytes():
+    """.gitignore as raw bytes, read once for the whole run."""
+    return _GITIGNORE.read_bytes()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# 2. Company Lookup Tool
+# 1. Lead Database Search Tool
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
-class TestCompanyLookup:
-    """Test the company lookup tool."""
+class TestLeadDatabaseSearch:
+    """Test the lead database search tool."""
 
-    def test_lookup_techflow(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
+    @pytest.mark.parametrize(
+        "query, predicate",
+        [
+            ("TechFlow", lambda r: "techflow" in r.lower() or "series b" in r.lower()),
+            ("MediCore", lambda r: "medicore" in r.lower() or "healthcare" in r.lower()),
+            ("xyznonexistent12345", lambda r: "No leads found" in r),
+            ("techflow", lambda r: "No leads found" not in r),
+            ("TECHFLOW", lambda r: "No leads found" not in r),
+            ("Healthcare", lambda r: "No leads found" not in r),
+            ("Sarah Chen", lambda r: "No leads found" not in r),
+            ("lead", lambda r: max(len(s.strip()) for s in r.split("---")) <= 800),
+            ("", lambda r: isinstance(r, str) and len(r) > 0),
+            ("Budget", lambda r: "No leads found" not in r),  # BANT assessment data
+        ],
+        ids=[
+            "finds_techflow", "finds_medicore", "no_results", "case_insensitive_lower",
+            "case_insensitive_upper", "by_industry", "by_contact_name",
+            "returns_truncated_results", "empty_query", "finds_bant_data",
+        ],
+    )
+    def test_search(self, query, predicate, search_cache):
+        assert predicate(search_cache(query))
 
-        result = lookup_company.run("TechFlow Solutions")
-        assert "SaaS" in result or "Developer Tools" in result
-        assert "Austin" in result
+    @pytest.mark.parametrize("query", ["TechFlow", "sarah chen", "Budget", "ai", "", "zzz"])
+    def test_trigram_search_matches_full_scan(self, query):
+        """Trigram candidates should not drop any section a full scan would find."""
 
-    def test_lookup_globalmart(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
+        sections = custom_tool._load_index().sections
+        expected = [s for s in sections if query.lower() in s.lower()]
+        assert custom_tool._matching_sections(query) == expected
 
-        result = lookup_company.run("GlobalMart Retail")
-        assert "E-commerce" in result or "Retail" in result
+    def test_search_does_not_lowercase_sections(self):
+        """Sections are lowercased once at index build, not on every search."""
 
-    def test_lookup_medicore(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
+        index = custom_tool._load_index()
+        assert index.sections_lower == [s.lower() for s in index.sections]
 
-        result = lookup_company.run("MediCore Health")
-        assert "Healthcare" in result
-        assert "Boston" in result
+        with patch.object(custom_tool, "_load_index", return_value=index._replace(
+            sections_lower=[s.upper() for s in index.sections],
+        )):
+            # Lowercase queries can't match the uppercased copies if they are used
+            assert custom_tool._matching_sections("ab") == []
 
-    def test_lookup_greenleaf(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
+    def test_index_reused_across_searches(self):
+        """Repeated searches should not re-read the knowledge files."""
 
-        result = lookup_company.run("GreenLeaf Energy")
-        assert "Clean Energy" in result or "Sustainability" in result
+        search_lead_database.run("TechFlow")
+        with patch("pathlib.Path.read_text") as mock_read:
+            result = search_lead_database.run("MediCore")
 
-    def test_lookup_pinnacle(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
+        mock_read.assert_not_called()
+        assert "medicore" in result.lower()
 
-        result = lookup_company.run("Pinnacle Consulting Group")
-        assert "Consulting" in result
+    @pytest.mark.slow
+    def test_index_reads_files_in_sorted_order(self, tmp_path, monkeypatch):
+        """Concurrent reads must still index sections in file-name order."""
+
+        for name in ("c", "a", "b"):
+            (tmp_path / f"{name}.md").write_text(f"# {name}\n### {name} lead\nbody", "utf-8")
+        monkeypatch.setattr(custom_tool, "_KNOWLEDGE_DIR", tmp_path)
+
+        index = custom_tool._build_index()
+        assert [s for s in index.sections if s.endswith("lead\nbody")] == [
+            "a lead\nbody", "b lead\nbody", "c lead\nbody",
+        ]
+        assert index.files == sorted(tmp_path.glob("*.md"))
+
+    @pytest.mark.slow
+    def test_index_cache_round_trip(self, tmp_path, monkeypatch):
+        """A fresh process should load the pickled index instead of re-parsing."""
+
+        monkeypatch.setattr(custom_tool, "_INDEX_CACHE", tmp_path / "index.pkl")
+        monkeypatch.setattr(custom_tool, "_INDEX", None)
+        custom_tool._load_index()
+        monkeypatch.setattr(custom_tool, "_INDEX", None)
+
+        with patch.object(custom_tool, "_build_index") as mock_build:
+            index = custom_tool._load_index()
 
-    def test_lookup_invalid_company(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
+        mock_build.assert_not_called()
+        assert index.sections == custom_tool._build_index().sections
 
-        result = lookup_company.run("Nonexistent Corp")
-        assert "Company not found" in result
+    @pytest.mark.slow
+    def test_stale_index_cache_ignored(self, tmp_path, monkeypatch):
+        """A pickle whose signature no longer matches the files should be rebuilt."""
+        import pickle
 
-    def test_lookup_case_insensitive(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
+        cache = tmp_path / "index.pkl"
+        stale = custom_tool._build_index()._replace(signature=(0,))
+        cache.write_bytes(pickle.dumps((custom_tool._INDEX_CACHE_VERSION, stale)))
+        monkeypatch.setattr(custom_tool, "_INDEX_CACHE", cache)
 
-        result = lookup_company.run("techflow solutions")
-        assert "SaaS" in result or "Developer Tools" in result
+        assert custom_tool._read_index_cache() is None
 
-    def test_lookup_includes_contacts(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
 
-        result = lookup_company.run("TechFlow Solutions")
-        assert "Key Contacts" in result
-        assert "Sarah Chen" in result
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. Company Lookup Tool
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+class TestCompanyLookup:
+    """Test the company lookup tool."""
+
+    @pytest.mark.parametrize(
+        "name, predicate",
+        [
+            ("TechFlow Solutions", lambda r: "Austin" in r and (
+                "SaaS" in r or "Developer Tools" in r
+            )),
+            ("GlobalMart Retail", lambda r: "E-commerce" in r or "Retail" in r),
+            ("MediCore Health", lambda r: "Healthcare" in r and "Boston" in r),
+            ("GreenLeaf Energy", lambda r: "Clean Energy" in r or "Sustainability" in r),
+            ("Pinnacle Consulting Group", lambda r: "Consulting" in r),
+            ("Nonexistent Corp", lambda r: "Company not found" in r),
+            ("techflow solutions", lambda r: "SaaS" in r or "Developer Tools" in r),
+            ("TechFlow Solutions", lambda r: "Key Contacts" in r and "Sarah Chen" in r),
+            ("", lambda r: "Company not found" in r),
+        ],
+        ids=[
+            "techflow", "globalmart", "medicore", "greenleaf", "pinnacle", "invalid_company",
+            "case_insensitive", "includes_contacts", "empty_name",
+        ],
+    )
+    def test_lookup(self, name, predicate, lookup_cache):
+        assert predicate(lookup_cache(name))
 
-    def test_lookup_empty_name(self):
-        from sales_lead_qualifier.tools.custom_tool import lookup_company
+    @pytest.mark.parametrize("name", [
+        "TechFlow", "TechFlow Solutions, Inc.", "  TECHFLOW SOLUTIONS LLC ", "techflow corp",
+    ])
+    def test_lookup_aliases(self, name, lookup_cache):
+        """Short names, legal suffixes and punctuation should resolve to the record."""
+        assert lookup_company.run(name) == lookup_cache("TechFlow Solutions")
 
-        result = lookup_company.run("")
-        assert "Company not found" in result
+    def test_lookup_full_name_with_suffix_word(self):
+        result = lookup_company.run("Pinnacle Consulting Group")
+        assert "Company not found" not in result
+        assert "David Park" in result
+
+    def test_lookup_serves_preformatted_profiles(self):
+        """Profiles are formatted once at import; lookups only read them."""
+
+        with patch.object(custom_tool, "_format_company") as mock_format:
+            result = custom_tool.lookup_company.run("MediCore Health")
+
+        mock_format.assert_not_called()
+        assert result == custom_tool._COMPANY_INDEX["medicore health"]
+        with pytest.raises(TypeError):
+            custom_tool._SAMPLE_COMPANIES["acme"] = {}  # type: ignore[index]
+
+    def test_lookup_miss_lists_companies(self):
+        result = lookup_company.run("Acme")
+        assert result.startswith("Company not found: Acme.")
+        assert "TechFlow Solutions, GlobalMart Retail" in result
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -173,6 +309,34 @@ class TestCompanyLookup:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
+# (raw classifier output, expected category)
+_NORMALIZE_CASES = (
+    ("lead_scoring", "lead_scoring"),
+    ("LEAD_SCORING", "lead_scoring"),
+    ("company_research", "company_research"),
+    ("COMPANY_RESEARCH", "company_research"),
+    ("email_outreach", "email_outreach"),
+    ("EMAIL_OUTREACH", "email_outreach"),
+    ("objection_handling", "objection_handling"),
+    ("OBJECTION_HANDLING", "objection_handling"),
+    ("score this lead", "lead_scoring"),
+    ("lead scoring needed", "lead_scoring"),
+    ("research the company", "company_research"),
+    ("company research please", "company_research"),
+    ("compose an email", "email_outreach"),
+    ("email outreach draft", "email_outreach"),
+    ("handle this objection", "objection_handling"),
+    ("objection from prospect", "objection_handling"),
+    ("qualify this prospect", "lead_scoring"),
+    ("bant analysis", "lead_scoring"),
+    ("write a follow-up", "email_outreach"),
+    ("draft a message", "email_outreach"),
+    ("unknown query type", "lead_scoring"),  # default fallback
+    ("", "lead_scoring"),  # empty → default
+    ("   ", "lead_scoring"),  # whitespace → default
+)
+
+
 class TestClassificationNormalization:
     """Test request classification normalization logic.
 
@@ -180,58 +344,31 @@ class TestClassificationNormalization:
     classify_request() without calling any LLM.
     """
 
+    def test_normalize_all(self):
+        """Every case in one test node, reporting all mismatches at once."""
+        failures = [
+            (raw_output, expected, result)
+            for raw_output, expected in _NORMALIZE_CASES
+            if (result := _normalize_category(raw_output.strip().lower())) != expected
+        ]
+        assert not failures, f"(input, expected, got): {failures}"
+
     @pytest.mark.parametrize(
         "raw_output, expected",
         [
-            ("lead_scoring", "lead_scoring"),
-            ("LEAD_SCORING", "lead_scoring"),
-            ("company_research", "company_research"),
-            ("COMPANY_RESEARCH", "company_research"),
-            ("email_outreach", "email_outreach"),
-            ("EMAIL_OUTREACH", "email_outreach"),
-            ("objection_handling", "objection_handling"),
-            ("OBJECTION_HANDLING", "objection_handling"),
-            ("score this lead", "lead_scoring"),
-            ("lead scoring needed", "lead_scoring"),
-            ("research the company", "company_research"),
-            ("company research please", "company_research"),
-            ("compose an email", "email_outreach"),
-            ("email outreach draft", "email_outreach"),
-            ("handle this objection", "objection_handling"),
-            ("objection from prospect", "objection_handling"),
-            ("qualify this prospect", "lead_scoring"),
-            ("bant analysis", "lead_scoring"),
-            ("write a follow-up", "email_outreach"),
-            ("draft a message", "email_outreach"),
-            ("unknown query type", "lead_scoring"),  # default fallback
-            ("", "lead_scoring"),  # empty → default
-            ("   ", "lead_scoring"),  # whitespace → default
+            ("Category: LEAD_SCORING\n", "lead_scoring"),
+            ("score the lead", "lead_scoring"),  # two-word rules match in either order
+            ("research this company", "company_research"),
+            ("compose the\nemail", "email_outreach"),  # across lines
+            ("email: objection_handling", "objection_handling"),
+            ("research the lead's score", "lead_scoring"),  # priority beats position
+            ("Intel on the account", "company_research"),
+            ("Write to them", "email_outreach"),
+            ("no idea", "lead_scoring"),
         ],
     )
-    def test_normalize(self, raw_output: str, expected: str):
-        """Category normalization should match expected output."""
-        raw_lower = raw_output.strip().lower()
-        if "lead_scoring" in raw_lower or ("lead" in raw_lower and "scor" in raw_lower):
-            result = "lead_scoring"
-        elif "company_research" in raw_lower or (
-            "company" in raw_lower and "research" in raw_lower
-        ):
-            result = "company_research"
-        elif "email_outreach" in raw_lower or (
-            "email" in raw_lower and ("outreach" in raw_lower or "compose" in raw_lower)
-        ):
-            result = "email_outreach"
-        elif "objection_handling" in raw_lower or "objection" in raw_lower:
-            result = "objection_handling"
-        elif "qualify" in raw_lower or "bant" in raw_lower or "score" in raw_lower:
-            result = "lead_scoring"
-        elif "research" in raw_lower or "intel" in raw_lower:
-            result = "company_research"
-        elif "email" in raw_lower or "write" in raw_lower or "draft" in raw_lower:
-            result = "email_outreach"
-        else:
-            result = "lead_scoring"
-        assert result == expected, f"Failed for input: {raw_output!r}"
+    def test_normalize_category_rules(self, raw_output: str, expected: str):
+        assert _normalize_category(raw_output) == expected
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -242,51 +379,57 @@ class TestClassificationNormalization:
 class TestSalesResult:
     """Test the SalesResult model."""
 
-    def test_valid_lead_scoring_result(self):
-        from sales_lead_qualifier.crew import SalesResult
-
-        result = SalesResult(
-            query="Score TechFlow Solutions as a lead",
-            category="lead_scoring",
-            response="Lead Score: 82 — Hot Lead",
-        )
-        assert result.query == "Score TechFlow Solutions as a lead"
-        assert result.category == "lead_scoring"
-        assert "Hot" in result.response
-
-    def test_valid_company_research_result(self):
-        from sales_lead_qualifier.crew import SalesResult
-
-        result = SalesResult(
-            query="Research MediCore Health",
-            category="company_research",
-            response="MediCore Health is a healthcare technology company",
-        )
-        assert result.category == "company_research"
-
-    def test_valid_email_outreach_result(self):
-        from sales_lead_qualifier.crew import SalesResult
-
-        result = SalesResult(
-            query="Write a cold email to Sarah Chen at TechFlow",
-            category="email_outreach",
-            response="Subject: Accelerate your CI/CD pipeline",
-        )
-        assert result.category == "email_outreach"
-
-    def test_valid_objection_handling_result(self):
-        from sales_lead_qualifier.crew import SalesResult
-
-        result = SalesResult(
-            query="They said our pricing is too high",
-            category="objection_handling",
-            response="Response Option 1: Let's look at the ROI",
-        )
-        assert result.category == "objection_handling"
+    @pytest.mark.parametrize(
+        "query, category, response, check",
+        [
+            pytest.param(
+                "Score TechFlow Solutions as a lead",
+                "lead_scoring",
+                "Lead Score: 82 — Hot Lead",
+                lambda r: r.query == "Score TechFlow Solutions as a lead" and "Hot" in r.response,
+                id="lead_scoring",
+            ),
+            pytest.param(
+                "Research MediCore Health",
+                "company_research",
+                "MediCore Health is a healthcare technology company",
+                lambda r: r.response == "MediCore Health is a healthcare technology company",
+                id="company_research",
+            ),
+            pytest.param(
+                "Write a cold email to Sarah Chen at TechFlow",
+                "email_outreach",
+                "Subject: Accelerate your CI/CD pipeline",
+                lambda r: r.response.startswith("Subject: ")
+                and r.query == "Write a cold email to Sarah Chen at TechFlow",
+                id="email_outreach",
+            ),
+            pytest.param(
+                "They said our pricing is too high",
+                "objection_handling",
+                "Response Option 1: Let's look at the ROI",
+                lambda r: r.response == "Response Option 1: Let's look at the ROI"
+                and r.query == "They said our pricing is too high",
+                id="objection_handling",
+            ),
+            pytest.param(
+                "", "lead_scoring", "No query provided.",
+                lambda r: r.query == "",
+                id="empty_query_allowed",
+            ),
+            pytest.param(
+                "test", "lead_scoring", "A" * 10_000,
+                lambda r: len(r.response) == 10_000,
+                id="long_response_allowed",
+            ),
+        ],
+    )
+    def test_valid_results(self, query, category, response, check):
+        result = SalesResult(query=query, category=category, response=response)
+        assert result.category == category
+        assert check(result)
 
     def test_invalid_category_rejected(self):
-        from sales_lead_qualifier.crew import SalesResult
-
         with pytest.raises(Exception):
             SalesResult(
                 query="test",
@@ -294,23 +437,6 @@ class TestSalesResult:
                 response="test",
             )
 
-    def test_empty_query_allowed(self):
-        from sales_lead_qualifier.crew import SalesResult
-
-        result = SalesResult(
-            query="", category="lead_scoring", response="No query provided."
-        )
-        assert result.query == ""
-
-    def test_long_response_allowed(self):
-        from sales_lead_qualifier.crew import SalesResult
-
-        long_text = "A" * 10_000
-        result = SalesResult(
-            query="test", category="lead_scoring", response=long_text
-        )
-        assert len(result.response) == 10_000
-
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 5. YAML Configuration Loading
@@ -320,10 +446,8 @@ class TestSalesResult:
 class TestYamlConfig:
     """Test YAML configuration files are valid and complete."""
 
-    def test_load_agents_yaml(self):
-        from sales_lead_qualifier.crew import _load_yaml
-
-        config = _load_yaml("agents.yaml")
+    def test_load_agents_yaml(self, agents_yaml):
+        config = agents_yaml
         assert isinstance(config, dict)
         expected_agents = [
             "classifier", "lead_scorer", "company_researcher",
@@ -335,10 +459,8 @@ class TestYamlConfig:
             assert "goal" in config[agent_key], f"Missing 'goal' for {agent_key}"
             assert "backstory" in config[agent_key], f"Missing 'backstory' for {agent_key}"
 
-    def test_load_tasks_yaml(self):
-        from sales_lead_qualifier.crew import _load_yaml
-
-        config = _load_yaml("tasks.yaml")
+    def test_load_tasks_yaml(self, tasks_yaml):
+        config = tasks_yaml
         assert isinstance(config, dict)
         expected_tasks = [
             "classify_request", "score_lead", "research_company",
@@ -353,23 +475,57 @@ class TestYamlConfig:
                 f"Missing 'expected_output' for {task_key}"
             )
 
-    def test_tasks_contain_query_placeholder(self):
+    def test_tasks_contain_query_placeholder(self, tasks_yaml):
         """All task descriptions should contain {query} placeholder."""
-        from sales_lead_qualifier.crew import _load_yaml
 
-        config = _load_yaml("tasks.yaml")
-        for task_key, task_cfg in config.items():
+        for task_key, task_cfg in tasks_yaml.items():
             assert "{query}" in task_cfg["description"], (
                 f"Task '{task_key}' description missing {{query}} placeholder"
             )
 
     def test_load_nonexistent_yaml_raises(self):
         """Loading a non-existent YAML file should raise FileNotFoundError."""
-        from sales_lead_qualifier.crew import _load_yaml
 
         with pytest.raises(FileNotFoundError):
             _load_yaml("nonexistent.yaml")
 
+    def test_load_yaml_is_cached(self):
+        """Repeated loads should reuse the parsed config without re-parsing."""
+
+        first = _load_yaml("agents.yaml")
+        with patch("yaml.safe_load") as mock_load:
+            second = _load_yaml("agents.yaml")
+
+        assert second is first
+        mock_load.assert_not_called()
+
+    def test_load_yaml_reparses_on_size_change(self):
+        """A changed (mtime, size) signature should invalidate the cache entry."""
+
+        crew._load_yaml("tasks.yaml")
+        mtime, size, config = crew._YAML_CACHE["tasks.yaml"]
+        crew._YAML_CACHE["tasks.yaml"] = (mtime, size + 1, {"stale": True})
+
+        assert crew._load_yaml("tasks.yaml") == config
+
+    @pytest.mark.slow
+    def test_import_defers_crewai_and_yaml(self):
+        """Importing the crew module should not pull in CrewAI or PyYAML."""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, sales_lead_qualifier.crew as c;"
+            "print('crewai' in sys.modules, 'yaml' in sys.modules);"
+            "c.Crew;"
+            "print('crewai' in sys.modules)"
+        )
+        env = {**os.environ, "PYTHONPATH": str(_TEMPLATE_DIR / "src")}
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True,
+        ).stdout.split()
+        assert out == ["False", "False", "True"]
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 6. Agent Factory (mocked — no LLM calls)
@@ -379,38 +535,106 @@ class TestYamlConfig:
 class TestAgentFactory:
     """Test agent creation from YAML config (mocked to avoid LLM calls)."""
 
-    @patch("sales_lead_qualifier.crew.Agent")
+    @pytest.fixture
+    def mock_agent_cls(self, monkeypatch):
+        """Stand-in for crewai.Agent, patched onto the crew module for one test."""
+        agent_cls = MagicMock()
+        monkeypatch.setattr(crew, "Agent", agent_cls)
+        return agent_cls
+
     def test_creates_five_agents(self, mock_agent_cls):
         """_create_agents should create exactly 5 agents."""
-        from sales_lead_qualifier.crew import _create_agents
 
         agents = _create_agents()
         assert len(agents) == 5
-        assert set(agents.keys()) == set(_AGENT_KEYS)
+        assert agents.keys() == _AGENT_KEYS_SET
 
-    @patch("sales_lead_qualifier.crew.Agent")
-    def test_classifier_uses_mini_model(self, mock_agent_cls):
+    def test_classifier_uses_mini_model(self, mock_agent_cls, monkeypatch):
         """Classifier should use the cheaper CLASSIFIER_MODEL."""
-        from sales_lead_qualifier.crew import _create_agents
 
-        with patch.dict(os.environ, {"CLASSIFIER_MODEL": "gpt-4o-mini", "MODEL": "gpt-4o"}):
-            _create_agents()
+        monkeypatch.setenv("CLASSIFIER_MODEL", "gpt-4o-mini")
+        monkeypatch.setenv("MODEL", "gpt-4o")
+        _create_agents()
 
         calls = mock_agent_cls.call_args_list
         classifier_call = calls[0]
         assert classifier_call.kwargs.get("llm") == "gpt-4o-mini"
 
-    @patch("sales_lead_qualifier.crew.Agent")
-    def test_verbose_env_controls_agent_verbosity(self, mock_agent_cls):
+    @pytest.mark.parametrize(("provider", "expected"), [
+        ("groq", "groq/llama-3.1-8b-instant"),
+        ("Cerebras", "cerebras/llama3.1-8b"),
+        ("ollama", "ollama/llama3.1"),
+    ])
+    def test_classifier_provider_routes_classifier_only(
+        self, mock_agent_cls, provider, expected, monkeypatch,
+    ):
+
+        monkeypatch.delenv("CLASSIFIER_MODEL", raising=False)
+        monkeypatch.setenv("CLASSIFIER_PROVIDER", provider)
+        monkeypatch.setenv("MODEL", "gpt-4o")
+        _create_agents()
+
+        llms = [call.kwargs["llm"] for call in mock_agent_cls.call_args_list]
+        assert llms == [expected] + ["gpt-4o"] * 4
+
+    def test_classifier_model_overrides_provider(self, monkeypatch):
+        monkeypatch.setenv("CLASSIFIER_PROVIDER", "groq")
+        monkeypatch.setenv("CLASSIFIER_MODEL", "groq/gemma2-9b-it")
+        assert _classifier_model() == "groq/gemma2-9b-it"
+
+    def test_unknown_classifier_provider_rejected(self, monkeypatch):
+        monkeypatch.delenv("CLASSIFIER_MODEL", raising=False)
+        monkeypatch.setenv("CLASSIFIER_PROVIDER", "nope")
+        with pytest.raises(ValueError, match="CLASSIFIER_PROVIDER"):
+            _classifier_model()
+
+    def test_verbose_env_controls_agent_verbosity(self, mock_agent_cls, monkeypatch):
         """VERBOSE=false should set verbose=False on all agents."""
-        from sales_lead_qualifier.crew import _create_agents
 
-        with patch.dict(os.environ, {"VERBOSE": "false"}):
-            _create_agents()
+        monkeypatch.setenv("VERBOSE", "false")
+        _create_agents()
 
         for call in mock_agent_cls.call_args_list:
             assert call.kwargs.get("verbose") is False
 
+    @pytest.mark.parametrize(("env", "expected"), [
+        ({}, False),
+        ({"DEBUG": "1"}, True),
+        ({"DEBUG": "1", "VERBOSE": "false"}, False),
+        ({"VERBOSE": "true"}, True),
+    ])
+    def test_verbose_defaults_off_unless_debug(self, mock_agent_cls, env, expected, monkeypatch):
+        """Specialists follow VERBOSE/DEBUG; the classifier is never verbose."""
+
+        monkeypatch.delenv("VERBOSE", raising=False)
+        monkeypatch.delenv("DEBUG", raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        _create_agents()
+
+        verbosity = [call.kwargs["verbose"] for call in mock_agent_cls.call_args_list]
+        assert verbosity == [False] + [expected] * 4
+
+    def test_agents_are_reused(self, mock_agent_cls):
+        """Repeated calls with the same settings should not rebuild agents."""
+
+        first = _create_agents()
+        second = _create_agents()
+
+        assert second is first
+        assert mock_agent_cls.call_count == 5
+
+    def test_agents_rebuilt_when_model_changes(self, mock_agent_cls, monkeypatch):
+        """Changing MODEL should build a fresh set of agents."""
+
+        monkeypatch.setenv("MODEL", "gpt-4o")
+        first = _create_agents()
+        monkeypatch.setenv("MODEL", "gpt-4.1")
+        second = _create_agents()
+
+        assert second is not first
+        assert mock_agent_cls.call_count == 10
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 7. Task Factory
@@ -420,30 +644,49 @@ class TestAgentFactory:
 class TestTaskFactory:
     """Test task creation from YAML config."""
 
-    @patch("sales_lead_qualifier.crew.Task")
+    @pytest.fixture
+    def mock_task_cls(self, monkeypatch):
+        """Stand-in for crewai.Task, patched onto the crew module for one test."""
+        task_cls = MagicMock()
+        monkeypatch.setattr(crew, "Task", task_cls)
+        return task_cls
+
     def test_query_interpolation(self, mock_task_cls):
         """_create_task should replace {query} in the task description."""
-        from sales_lead_qualifier.crew import _create_task
 
-        mock_agent = MagicMock()
+        mock_agent = object()
         _create_task("classify_request", mock_agent, "Score TechFlow Solutions")
 
         call_kwargs = mock_task_cls.call_args.kwargs
         assert "Score TechFlow Solutions" in call_kwargs["description"]
         assert "{query}" not in call_kwargs["description"]
 
-    @patch("sales_lead_qualifier.crew.Task")
-    def test_all_task_keys_valid(self, mock_task_cls):
-        """All expected task keys should produce a valid Task."""
-        from sales_lead_qualifier.crew import _create_task
+    def test_templates_match_yaml_replace(self, mock_task_cls, tasks_yaml):
+        """Compiled templates should render exactly what str.replace would."""
 
-        mock_agent = MagicMock()
-        for key in [
-            "classify_request", "score_lead", "research_company",
-            "compose_email", "handle_objection",
-        ]:
-            _create_task(key, mock_agent, "test query")
-            assert mock_task_cls.called
+        for key, cfg in tasks_yaml.items():
+            for query in ("Score TechFlow", "{query}", ""):
+                _create_task(key, object(), query)
+                assert mock_task_cls.call_args.kwargs["description"] == (
+                    cfg["description"].replace("{query}", query)
+                )
+
+    def test_templates_compiled_once_per_yaml_parse(self):
+        first = crew._task_templates()
+        assert crew._task_templates() is first
+
+        crew._YAML_CACHE.pop("tasks.yaml")
+        assert crew._task_templates() is not first
+
+    @pytest.mark.parametrize("key", [
+        "classify_request", "score_lead", "research_company",
+        "compose_email", "handle_objection",
+    ])
+    def test_task_key_valid(self, mock_task_cls, key):
+        """Each expected task key should produce exactly one Task."""
+
+        _create_task(key, object(), "test query")
+        mock_task_cls.assert_called_once()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -454,73 +697,110 @@ class TestTaskFactory:
 class TestClassifyRequest:
     """Test classify_request with mocked CrewAI Crew.kickoff()."""
 
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    def test_classify_lead_scoring(self, mock_crew_cls, mock_agents, mock_task):
-        from sales_lead_qualifier.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "lead_scoring"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
-
-        assert classify_request("Score TechFlow Solutions as a lead") == "lead_scoring"
-
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    def test_classify_company_research(self, mock_crew_cls, mock_agents, mock_task):
-        from sales_lead_qualifier.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "company_research"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
-
-        assert classify_request("Research MediCore Health") == "company_research"
-
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    def test_classify_email_outreach(self, mock_crew_cls, mock_agents, mock_task):
-        from sales_lead_qualifier.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "email_outreach"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
-
-        assert classify_request("Write a cold email to Sarah Chen") == "email_outreach"
-
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    def test_classify_objection_handling(self, mock_crew_cls, mock_agents, mock_task):
-        from sales_lead_qualifier.crew import classify_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "objection_handling"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
-
-        assert classify_request("They said pricing is too high") == "objection_handling"
-
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    def test_classify_unknown_defaults_to_lead_scoring(
-        self, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from sales_lead_qualifier.crew import classify_request
+    def test_classify_lead_scoring(self, patch_crew, crew_result):
+        crew_result.raw = "lead_scoring"
+
+        assert classify_request("How hot is TechFlow Solutions?") == "lead_scoring"
+
+    def test_classify_company_research(self, patch_crew, crew_result):
+        crew_result.raw = "company_research"
+
+        assert classify_request("Tell me about MediCore Health") == "company_research"
+
+    def test_classify_email_outreach(self, patch_crew, crew_result):
+        crew_result.raw = "email_outreach"
+
+        assert classify_request("Reach out to Sarah Chen") == "email_outreach"
+
+    def test_classify_objection_handling(self, patch_crew, crew_result):
+        crew_result.raw = "objection_handling"
+
+        assert classify_request("They went quiet after the demo") == "objection_handling"
 
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "I'm not sure what category this is"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_classify_unknown_defaults_to_lead_scoring(self, patch_crew, crew_result):
+        crew_result.raw = "I'm not sure what category this is"
 
         assert classify_request("Something unclear") == "lead_scoring"
 
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("Score TechFlow Solutions as a lead", "lead_scoring"),
+            ("Research MediCore Health", "company_research"),
+            ("Write a cold email to Sarah Chen", "email_outreach"),
+            ("They said our pricing is too high", "objection_handling"),
+            ("Draft a follow-up after the pricing objection", None),  # ambiguous
+            ("Something unclear", None),  # no keywords
+        ],
+    )
+    def test_fast_classify(self, query, expected):
+        assert _fast_classify(query) == expected
+
+    def test_unambiguous_query_skips_llm(self, patch_crew):
+        assert classify_request("Run a BANT analysis on GlobalMart") == "lead_scoring"
+        patch_crew.Crew.assert_not_called()
+        patch_crew._create_agents.assert_not_called()
+
+
+class _FakeTextEmbedding:
+    """fastembed.TextEmbedding stand-in: one dimension per category's cue words."""
+
+    _CUES = (
+        {"score", "qualified", "hot", "lead", "prioritize"},
+        {"research", "background", "decision", "tech"},
+        {"email", "draft", "compose", "reach"},
+        {"price", "competitor", "objection", "quiet"},
+    )
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def embed(self, texts):
+        for text in texts:
+            words = set(text.lower().replace("?", "").replace(",", "").split())
+            yield [float(len(words & cues)) for cues in self._CUES]
+
+
+class TestEmbeddingRouter:
+    """Test the optional embedding router with a fake fastembed."""
+
+    @pytest.fixture(autouse=True)
+    def fake_fastembed(self, monkeypatch):
+        import sys
+
+        monkeypatch.setitem(sys.modules, "fastembed", SimpleNamespace(
+            TextEmbedding=_FakeTextEmbedding,
+        ))
+        monkeypatch.setenv("EMBEDDING_ROUTER_MODEL", "fake/bge-small")
+        crew._load_router.cache_clear()
+        crew._embed_query.cache_clear()
+        yield
+        crew._load_router.cache_clear()
+        crew._embed_query.cache_clear()
+
+    @pytest.mark.parametrize(("query", "expected"), [
+        ("How hot is TechFlow Solutions?", "lead_scoring"),
+        ("Get me background on MediCore", "company_research"),
+        ("They went quiet on us", "objection_handling"),
+        ("Tell me something", None),  # no signal -> no margin -> LLM
+    ])
+    def test_embedding_classify(self, query, expected):
+        assert _embedding_classify(query) == expected
+
+    def test_confident_route_skips_llm(self, patch_crew):
+        assert classify_request("How hot is TechFlow Solutions?") == "lead_scoring"
+        patch_crew.Crew.assert_not_called()
+
+    def test_disabled_without_env(self, monkeypatch):
+        monkeypatch.delenv("EMBEDDING_ROUTER_MODEL")
+        assert _embedding_classify("How hot is TechFlow Solutions?") is None
+
+    def test_disabled_without_fastembed(self, monkeypatch):
+        import sys
+
+        monkeypatch.setitem(sys.modules, "fastembed", None)  # import raises ImportError
+        assert _embedding_classify("How hot is TechFlow Solutions?") is None
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 9. handle_request (mocked CrewAI)
@@ -530,21 +810,13 @@ class TestClassifyRequest:
 class TestHandleRequest:
     """Test handle_request end-to-end with mocked CrewAI."""
 
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    @patch("sales_lead_qualifier.crew.classify_request", return_value="lead_scoring")
-    def test_handle_lead_scoring_returns_result(
-        self, mock_classify, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from sales_lead_qualifier.crew import SalesResult, handle_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = (
+    def test_handle_lead_scoring_returns_result(self, patch_crew, crew_result, monkeypatch):
+        monkeypatch.setattr(
+            patch_crew, "classify_request", MagicMock(return_value="lead_scoring"),
+        )
+        crew_result.raw = (
             "Lead Score: 82 — Hot Lead. BANT: Budget 22, Authority 24, Need 22, Timeline 14."
         )
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
 
         result = handle_request("Score TechFlow Solutions as a lead")
         assert isinstance(result, SalesResult)
@@ -552,106 +824,289 @@ class TestHandleRequest:
         assert result.query == "Score TechFlow Solutions as a lead"
         assert "82" in result.response
 
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    @patch("sales_lead_qualifier.crew.classify_request", return_value="company_research")
-    def test_handle_company_research_routes_correctly(
-        self, mock_classify, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from sales_lead_qualifier.crew import handle_request
+    def test_agents_created_once_per_query(self, patch_crew, crew_result, monkeypatch):
+        """handle_request should build agents once and share them with the classifier."""
+
+        monkeypatch.setattr(
+            patch_crew, "classify_request", MagicMock(return_value="lead_scoring"),
+        )
+        agents = patch_crew._create_agents.return_value
+        crew_result.raw = "Lead Score: 82"
+
+        handle_request("Score TechFlow Solutions as a lead")
+        patch_crew._create_agents.assert_called_once()
+        patch_crew.classify_request.assert_called_once_with(
+            "Score TechFlow Solutions as a lead", agents,
+        )
 
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = (
+    def test_handle_company_research_routes_correctly(self, patch_crew, crew_result, monkeypatch):
+        monkeypatch.setattr(
+            patch_crew, "classify_request", MagicMock(return_value="company_research"),
+        )
+        crew_result.raw = (
             "**Company Overview**: MediCore Health — Healthcare Technology — 500 employees"
         )
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
 
         result = handle_request("Research MediCore Health")
         assert result.category == "company_research"
         assert "MediCore" in result.response
 
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    @patch("sales_lead_qualifier.crew.classify_request", return_value="email_outreach")
-    def test_handle_email_outreach_routes_correctly(
-        self, mock_classify, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from sales_lead_qualifier.crew import handle_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = "**Subject Line**: Accelerate your CI/CD pipeline by 10x"
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
+    def test_handle_email_outreach_routes_correctly(self, patch_crew, crew_result, monkeypatch):
+        monkeypatch.setattr(
+            patch_crew, "classify_request", MagicMock(return_value="email_outreach"),
+        )
+        crew_result.raw = "**Subject Line**: Accelerate your CI/CD pipeline by 10x"
 
         result = handle_request("Write a cold email to Sarah Chen at TechFlow")
         assert result.category == "email_outreach"
         assert "Subject" in result.response
 
-    @patch("sales_lead_qualifier.crew._create_task", return_value=MagicMock())
-    @patch("sales_lead_qualifier.crew._create_agents")
-    @patch("sales_lead_qualifier.crew.Crew")
-    @patch("sales_lead_qualifier.crew.classify_request", return_value="objection_handling")
-    def test_handle_objection_routes_correctly(
-        self, mock_classify, mock_crew_cls, mock_agents, mock_task,
-    ):
-        from sales_lead_qualifier.crew import handle_request
-
-        mock_agents.return_value = _mock_agents_dict()
-        mock_result = MagicMock()
-        mock_result.raw = (
+    def test_handle_objection_routes_correctly(self, patch_crew, crew_result, monkeypatch):
+        monkeypatch.setattr(
+            patch_crew, "classify_request", MagicMock(return_value="objection_handling"),
+        )
+        crew_result.raw = (
             "**Objection Category**: Price\n**Response Option 1**: Let's look at the ROI"
         )
-        mock_crew_cls.return_value.kickoff.return_value = mock_result
 
         result = handle_request("They said our pricing is too high")
         assert result.category == "objection_handling"
         assert "Price" in result.response
 
+    def test_batch_groups_queries_by_category(self, patch_crew):
+        """handle_requests should run one specialist crew per category, in input order."""
+
+        patch_crew.Crew.return_value.kickoff_for_each_async.side_effect = [
+            [SimpleNamespace(raw="objection_handling")],  # classifier, ambiguous query only
+            [SimpleNamespace(raw="score A"), SimpleNamespace(raw="score C")],
+            [SimpleNamespace(raw="objection B")],
+        ]
+
+        results = handle_requests([
+            "Score TechFlow Solutions", "They went quiet after the demo", "Qualify GlobalMart",
+        ])
+
+        assert [r.category for r in results] == [
+            "lead_scoring", "objection_handling", "lead_scoring",
+        ]
+        assert [r.response for r in results] == ["score A", "objection B", "score C"]
+        kickoff = patch_crew.Crew.return_value.kickoff_for_each_async
+        assert kickoff.call_args_list[0].kwargs["inputs"] == [
+            {"query": "They went quiet after the demo"},
+        ]
+        assert kickoff.call_args_list[1].kwargs["inputs"] == [
+            {"query": "Score TechFlow Solutions"}, {"query": "Qualify GlobalMart"},
+        ]
+        # One task per crew, with {query} left for kickoff_for_each_async to fill
+        assert patch_crew._create_task.call_count == 3
+        assert all(call.args[2] == "{query}" for call in patch_crew._create_task.call_args_list)
+
+    def test_crews_reused_across_requests(self, patch_crew, crew_result):
+        """Each task's crew is built once and fed the query through kickoff inputs."""
+
+        crew_result.raw = "score"
+
+        handle_request("Score TechFlow Solutions")
+        handle_request("Qualify GlobalMart")
+
+        patch_crew.Crew.assert_called_once()
+        assert [c.kwargs for c in patch_crew.Crew.return_value.kickoff.call_args_list] == [
+            {"inputs": {"query": "Score TechFlow Solutions"}},
+            {"inputs": {"query": "Qualify GlobalMart"}},
+        ]
+        assert patch_crew._create_task.call_args.args[2] == "{query}"
+
+    def test_repeated_query_served_from_cache(self, patch_crew, crew_result):
+        """A repeat (modulo case and whitespace) should skip the LLM entirely."""
+
+        crew_result.raw = "Lead Score: 82"
+
+        first = handle_request("Score TechFlow Solutions")
+        second = handle_request("  score   techflow solutions ")
+
+        patch_crew.Crew.return_value.kickoff.assert_called_once()
+        assert second.response == first.response
+        assert second.query == "  score   techflow solutions "
+
+    def test_cache_keyed_by_model(self, patch_crew, crew_result, monkeypatch):
+        crew_result.raw = "Lead Score: 82"
+
+        handle_request("Score TechFlow Solutions")
+        monkeypatch.setenv("MODEL", "gpt-4o-mini")
+        handle_request("Score TechFlow Solutions")
+
+        assert patch_crew.Crew.return_value.kickoff.call_count == 2
+
+    def test_batch_serves_cached_results(self, patch_crew, crew_result):
+        crew_result.raw = "score A"
+        crew_mock = patch_crew.Crew.return_value
+        crew_mock.kickoff_for_each_async.return_value = [SimpleNamespace(raw="score B")]
+
+        handle_request("Score TechFlow Solutions")
+        results = handle_requests(["Score TechFlow Solutions", "Qualify GlobalMart"])
+
+        assert [r.response for r in results] == ["score A", "score B"]
+        crew_mock.kickoff_for_each_async.assert_awaited_once_with(
+            inputs=[{"query": "Qualify GlobalMart"}],
+        )
+
+    def test_batch_reuses_cached_crew_in_chunks(self, patch_crew):
+        """A batch runs the cached crew in concurrency-sized chunks without copying it per input."""
+
+        crew_mock = patch_crew.Crew.return_value
+        crew_mock.kickoff_for_each_async.side_effect = lambda inputs: [
+            SimpleNamespace(raw=f"score {item['query']}") for item in inputs
+        ]
+        queries = [f"Score lead {i}" for i in range(5)]
+
+        results = handle_requests(queries, concurrency=2)
+
+        assert [r.response for r in results] == [f"score {q}" for q in queries]
+        patch_crew.Crew.assert_called_once()
+        chunks = crew_mock.kickoff_for_each_async.await_args_list
+        assert [len(c.kwargs["inputs"]) for c in chunks] == [2, 2, 1]
+
+    def test_batch_empty_returns_empty(self, patch_crew):
+        assert handle_requests([]) == []
+        patch_crew.Crew.assert_not_called()
+
+    @staticmethod
+    def _fake_kickoff(category: str, calls: list[str]):
+        """Build a _kickoff_async stand-in whose classifier answers ``category``."""
+
+        async def fake(task_key, agent, query, **crew_kwargs):
+            calls.append(task_key)
+            if task_key == "classify_request":
+                await asyncio.sleep(0)
+                return category
+            return f"{task_key} response"
+
+        return fake
+
+    @pytest.mark.asyncio
+    async def test_kickoff_async_runs_one_new_crew(self, patch_crew):
+        """Each async run builds exactly one crew and kicks it off directly."""
+        crew_mock = patch_crew.Crew.return_value
+        crew_mock.kickoff_async = AsyncMock(return_value=SimpleNamespace(raw="Hot lead"))
+        agent = object()
+
+        raw = await crew._kickoff_async("score_lead", agent, "Score TechFlow", verbose=False)
+
+        assert raw == "Hot lead"
+        patch_crew.Crew.assert_called_once()
+        assert patch_crew.Crew.call_args.kwargs["verbose"] is False
+        crew_mock.kickoff_async.assert_awaited_once_with()
+
+    @pytest.mark.asyncio
+    async def test_async_speculation_hit(self, patch_crew):
+        """A correct guess is reused instead of running the specialist twice."""
+
+        calls: list[str] = []
+        with patch.object(crew, "_kickoff_async", self._fake_kickoff("lead_scoring", calls)):
+            result = await crew.handle_request_async("How hot is TechFlow Solutions?")
+
+        assert result.category == "lead_scoring"
+        assert result.response == "score_lead response"
+        assert sorted(calls) == ["classify_request", "score_lead"]
+
+    @pytest.mark.asyncio
+    async def test_async_speculation_miss_runs_correct_specialist(self, patch_crew):
+        """A wrong guess is cancelled and the classifier's pick runs instead."""
+
+        calls: list[str] = []
+        started = asyncio.Event()
+        fake = self._fake_kickoff("objection_handling", calls)
+
+        async def slow_guess(task_key, agent, query, **crew_kwargs):
+            if task_key == "score_lead":
+                started.set()
+                await asyncio.sleep(10)
+            return await fake(task_key, agent, query, **crew_kwargs)
+
+        with patch.object(crew, "_kickoff_async", slow_guess):
+            result = await asyncio.wait_for(
+                crew.handle_request_async("They went quiet after the demo"), timeout=1
+            )
+
+        assert started.is_set()
+        assert result.category == "objection_handling"
+        assert result.response == "handle_objection response"
+        assert "score_lead" not in calls  # cancelled before it finished
+
+    @pytest.mark.asyncio
+    async def test_async_unambiguous_query_skips_speculation(self, patch_crew):
+        calls: list[str] = []
+        with patch.object(crew, "_kickoff_async", self._fake_kickoff("lead_scoring", calls)):
+            result = await crew.handle_request_async("Write an email to Sarah Chen")
+
+        assert result.category == "email_outreach"
+        assert calls == ["compose_email"]
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_category_steps_then_result(self, patch_crew):
+        """Streaming should report the category first and steps from the worker thread."""
+        async def fake(task_key, agent, query, step_callback=None, **crew_kwargs):
+            def run():
+                step_callback(SimpleNamespace(text="Looking up MediCore"))
+                step_callback("Drafting summary")
+                return "MediCore profile"
+
+            return await asyncio.to_thread(run)
+
+        with patch.object(crew, "_kickoff_async", fake):
+            events = [e async for e in crew.stream_handle_request("Research MediCore Health")]
+
+        assert isinstance(events[0], crew.SalesResult)
+        assert (events[0].category, events[0].response) == ("company_research", "")
+        assert events[1:3] == ["Looking up MediCore", "Drafting summary"]
+        assert events[3].response == "MediCore profile"
+        assert len(events) == 4
+
+        # The finished result is cached and replayed on its own
+        with patch.object(crew, "_kickoff_async") as mock_kickoff:
+            replay = [e async for e in crew.stream_handle_request("research medicore health")]
+        mock_kickoff.assert_not_called()
+        assert [e.response for e in replay] == ["MediCore profile"]
+
+    @pytest.mark.parametrize(("query", "expected"), [
+        ("They went quiet after the demo", "lead_scoring"),
+        ("Research the company and score it", "lead_scoring"),
+        ("Email them, the email should mention our research", "email_outreach"),
+    ])
+    def test_likely_category(self, query, expected):
+        assert _likely_category(query) == expected
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 10. CLI Argument Parsing
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
-class TestCLI:
-    """Test CLI argument parsing (no LLM calls)."""
+@pytest.fixture(scope="module")
+def cli_parser():
+    """One parser for all CLI tests; parse_args leaves it unchanged."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--query", "-q", type=str)
+    parser.add_argument("--file", "-f", type=str)
+    parser.add_argument("--classify-only", "-c", action="store_true")
+    return parser
 
-    def test_parse_single_query(self):
-        import argparse
 
-        parser = argparse.ArgumentParser()
-        parser.add_argument("--query", "-q", type=str)
-        parser.add_argument("--file", "-f", type=str)
-        parser.add_argument("--classify-only", "-c", action="store_true")
+class TestCLI:
+    """Test CLI argument parsing (no LLM calls)."""
 
-        args = parser.parse_args(["--query", "Score TechFlow as a lead"])
+    def test_parse_single_query(self, cli_parser):
+        args = cli_parser.parse_args(["--query", "Score TechFlow as a lead"])
         assert args.query == "Score TechFlow as a lead"
         assert args.file is None
         assert args.classify_only is False
 
-    def test_parse_classify_only(self):
-        import argparse
-
-        parser = argparse.ArgumentParser()
-        parser.add_argument("--query", "-q", type=str)
-        parser.add_argument("--file", "-f", type=str)
-        parser.add_argument("--classify-only", "-c", action="store_true")
-
-        args = parser.parse_args(["-q", "test", "-c"])
+    def test_parse_classify_only(self, cli_parser):
+        args = cli_parser.parse_args(["-q", "test", "-c"])
         assert args.classify_only is True
 
-    def test_parse_file_mode(self):
-        import argparse
-
-        parser = argparse.ArgumentParser()
-        parser.add_argument("--query", "-q", type=str)
-        parser.add_argument("--file", "-f", type=str)
-        parser.add_argument("--classify-only", "-c", action="store_true")
-
-        args = parser.parse_args(["--file", "queries.txt"])
+    def test_parse_file_mode(self, cli_parser):
+        args = cli_parser.parse_args(["--file", "queries.txt"])
         assert args.file == "queries.txt"
         assert args.query is None
 
@@ -669,17 +1124,12 @@ class TestEnvConfig:
     """Test environment variable configuration."""
 
     def test_env_example_exists(self):
-        env_example = Path(__file__).parent.parent / ".env.example"
-        assert env_example.exists(), ".env.example is required for template users"
+        assert _ENV_EXAMPLE.exists(), ".env.example is required for template users"
 
-    def test_env_example_contains_required_vars(self):
-        env_example = Path(__file__).parent.parent / ".env.example"
-        content = env_example.read_text(encoding="utf-8")
-        required_vars = ["MODEL", "OPENAI_API_KEY", "CLASSIFIER_MODEL"]
+    def test_env_example_contains_required_vars(self, env_example_bytes):
+        required_vars = [b"MODEL", b"OPENAI_API_KEY", b"CLASSIFIER_MODEL"]
         for var in required_vars:
-            assert var in content, f".env.example missing {var}"
+            assert var in env_example_bytes, f".env.example missing {var.decode()}"
 
-    def test_gitignore_excludes_env(self):
-        gitignore = Path(__file__).parent.parent / ".gitignore"
-        content = gitignore.read_text(encoding="utf-8")
-        assert ".env" in content
+    def test_gitignore_excludes_env(self, gitignore_bytes):
+        assert b".env" in gitignore_bytes
@@ -0,0 +1,105 @@
+"""On-disk result cache - reuse LLM output for repeated requests.
+
+Each entry is a small JSON file named by the SHA-256 of the operation and its
+normalized inputs, so re-running the CLI with the same company profile, the
+same guidelines or an unchanged draft skips the LLM entirely.
+
+Configuration (environment):
+  - SUBSIDY_CACHE_DIR: cache directory (default ``~/.subsidy_consultant/cache``)
+  - SUBSIDY_CACHE_TTL: entry lifetime in seconds (default 7 days, ``0`` disables)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+def _cache_dir() -> Path:
+    default = Path.home() / ".subsidy_consultant" / "cache"
+    return Path(os.getenv("SUBSIDY_CACHE_DIR", default)).expanduser()
+
+
+def _ttl() -> int:
+    value = os.getenv("SUBSIDY_CACHE_TTL")
+    if value is None:
+        return _DEFAULT_TTL
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("SUBSIDY_CACHE_TTL=%r is not an integer; using %d", value, _DEFAULT_TTL)
+        return _DEFAULT_TTL
+
+
+def normalize(value: object) -> str:
+    """Case- and whitespace-insensitive form of an input, used in cache keys."""
+    return " ".join(str(value).casefold().split())
+
+
+def cache_key(name: str, context: object = None, **inputs: object) -> str:
+    """SHA-256 key for operation ``name`` with ``inputs``.
+
+    ``context`` covers everything else the output depends on (models, prompt
+    config) and is hashed as-is; ``inputs`` are normalized first.
+    """
+    payload = json.dumps(
+        [name, context, {key: normalize(value) for key, value in sorted(inputs.items())}],
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Cached output for ``key``, or None when missing, expired or disabled."""
+    ttl = _ttl()
+    if ttl <= 0:
+        return None
+    path = _cache_dir() / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        entry = json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not isinstance(entry.get("raw"), str):
+        # Written by something else, or hand-edited: treat as a miss
+        return None
+
+    logger.info("cache hit tokens_saved=~%d", entry.get("tokens", 0))
+    return entry["raw"]
+
+
+def put(key: str, raw: str, tokens: int = 0) -> None:
+    """Store ``raw`` under ``key``; ``tokens`` is what the run cost, for the hit log."""
+    if _ttl() <= 0:
+        return
+    directory = _cache_dir()
+    path = directory / f"{key}.json"
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    payload = json.dumps({"raw": raw, "tokens": tokens}, ensure_ascii=False)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        # An unwritable cache only costs the next run its shortcut.
+        tmp_path.unlink(missing_ok=True)
+
+
+def clear() -> int:
+    """Delete every cached entry and return how many were removed."""
+    removed = 0
+    for path in _cache_dir().glob("*.json"):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
@@ -6,20 +6,81 @@ Agents: Matcher, Writer, Scorer, Summarizer.
 
 from __future__ import annotations
 
+import asyncio
 import os
+import re
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import yaml
-from crewai import Agent, Crew, Process, Task
-from pydantic import BaseModel
+
+from subsidy_consultant import cache
+
+if TYPE_CHECKING:
+    from crewai import LLM, Agent, Crew, Process, Task
+
+# Receives each CrewAI agent step (an AgentAction or AgentFinish) as it happens
+StepCallback = Callable[[Any], None]
+
+# ─── Lazy Imports ────────────────────────────────────────────────────────────
+
+# CrewAI pulls in LiteLLM, tokenizers and the provider SDKs, which takes
+# seconds. It is imported on first use so that importing this module (the
+# CLI's --help, the tests' config checks) stays fast.
+_CREWAI_NAMES = ("Agent", "Crew", "LLM", "Process", "Task")
+
+
+def _import_crewai() -> None:
+    """Bind CrewAI's classes as module globals on first use.
+
+    Names that are already bound (e.g. patched by a test) are left alone.
+    """
+    module_globals = globals()
+    if all(name in module_globals for name in _CREWAI_NAMES):
+        return
+    import crewai
+
+    for name in _CREWAI_NAMES:
+        module_globals.setdefault(name, getattr(crewai, name))
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``crew.Crew`` and friends for callers outside this module."""
+    if name in _CREWAI_NAMES:
+        _import_crewai()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ─── Configuration ───────────────────────────────────────────────────────────
 
+# libyaml's C parser when PyYAML was built with it (all binary wheels are)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# filename -> (mtime, size, parsed config)
+_YAML_CACHE: dict[str, tuple[float, int, dict]] = {}
+
+
 def _load_yaml(filename: str) -> dict:
-    """Load a YAML configuration file."""
+    """Load a YAML configuration file.
+
+    Parsed configs are cached per process and re-parsed only when the file's
+    mtime or size changes. The cached dict is shared between callers, so it
+    must be treated as read-only.
+    """
     filepath = Path(__file__).parent / "config" / filename
+    stat = filepath.stat()
+    cached = _YAML_CACHE.get(filename)
+    if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+
     with open(filepath, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YAML_LOADER)
+    _YAML_CACHE[filename] = (stat.st_mtime, stat.st_size, config)
+    return config
 
 
 def _get_azure_llm(mini: bool = False) -> str:
@@ -31,6 +92,17 @@ def _get_azure_llm(mini: bool = False) -> str:
       - AZURE_OPENAI_API_KEY
       - AZURE_OPENAI_DEPLOYMENT (or AZURE_OPENAI_MINI_DEPLOYMENT)
       - AZURE_OPENAI_API_VERSION
+
+    Azure OpenAI caches prompt prefixes of 1,024+ tokens automatically (no
+    ``cache_control`` markers, which only Anthropic models honour). CrewAI
+    puts each agent's role/goal/backstory and tool list in the system message
+    ahead of the task, so keeping agents.yaml free of ``{placeholders}`` keeps
+    that prefix identical across calls. Hits show up as
+    ``usage.prompt_tokens_details.cached_tokens``.
+
+    Deliberately not memoized: the environment lookups are dict reads, and
+    ``_build_agents`` and the result cache key on the returned names, so a
+    changed deployment takes effect without clearing anything.
     """
     if mini:
         deployment = os.getenv("AZURE_OPENAI_MINI_DEPLOYMENT", "gpt-4o-mini")
@@ -42,50 +114,81 @@ def _get_azure_llm(mini: bool = False) -> str:
 
 
 # ─── Result Models ───────────────────────────────────────────────────────────
+# Plain dataclasses: every field is a str built here, so there is nothing for
+# Pydantic to validate and the CLI never has to import it. Results are never
+# mutated after construction, so they are frozen and use __slots__.
 
-class MatchResult(BaseModel):
+@dataclass(frozen=True, slots=True)
+class MatchResult:
     """Result of subsidy matching."""
     company_info: str
     recommendations: str
 
 
-class DraftResult(BaseModel):
+@dataclass(frozen=True, slots=True)
+class DraftResult:
     """Result of application draft generation."""
     subsidy_name: str
     draft: str
 
 
-class ScoreResult(BaseModel):
+@dataclass(frozen=True, slots=True)
+class ScoreResult:
     """Result of application scoring."""
     subsidy_name: str
     score_report: str
 
 
-class SummaryResult(BaseModel):
+@dataclass(frozen=True, slots=True)
+class SummaryResult:
     """Result of guidelines summarization."""
     summary: str
 
 
+@dataclass(frozen=True, slots=True)
+class PipelineResult:
+    """Output of each stage run by :func:`run_pipeline`, keyed by stage name."""
+    outputs: dict[str, str]
+
+
 # ─── Agent Factory ───────────────────────────────────────────────────────────
 
 def _create_agents() -> dict[str, Agent]:
-    """Create agents from YAML config with Azure OpenAI backend."""
+    """Create agents from YAML config with Azure OpenAI backend.
+
+    Agents are built once per distinct (deployment, mini deployment, VERBOSE)
+    combination and reused for the rest of the process.
+    """
+    return _build_agents(
+        _get_azure_llm(mini=False),
+        _get_azure_llm(mini=True),
+        os.getenv("VERBOSE", "true").lower() == "true",
+    )
+
+
+@lru_cache(maxsize=1)
+def _build_agents(model: str, mini_model: str, verbose: bool) -> dict[str, Agent]:
+    """Build all agents for the given model settings."""
     from subsidy_consultant.tools.subsidy_search import (
+        batch_search_subsidies,
         list_all_subsidies,
         search_subsidies,
     )
 
     agents_config = _load_yaml("agents.yaml")
-    llm = _get_azure_llm(mini=False)
-    llm_mini = _get_azure_llm(mini=True)
-    verbose = os.getenv("VERBOSE", "true").lower() == "true"
+
+    _import_crewai()
+    # One LLM per deployment, shared by the agents that use it, so they also
+    # share its HTTP client and keep-alive connections to Azure.
+    llms = {name: LLM(model=name) for name in {model, mini_model}}
+    llm, llm_mini = llms[model], llms[mini_model]
 
     return {
         "matcher": Agent(
             role=agents_config["matcher"]["role"],
             goal=agents_config["matcher"]["goal"],
             backstory=agents_config["matcher"]["backstory"],
-            tools=[search_subsidies, list_all_subsidies],
+            tools=[batch_search_subsidies, search_subsidies, list_all_subsidies],
             llm=llm_mini,  # マッチングは軽量モデルでOK
             verbose=verbose,
         ),
@@ -115,17 +218,31 @@ def _create_agents() -> dict[str, Agent]:
     }
 
 
+def _reset_agents() -> None:
+    """Drop the memoized agents so the next call rebuilds them."""
+    _build_agents.cache_clear()
+
+
 # ─── Task Factory ────────────────────────────────────────────────────────────
 
+# A {name} placeholder in a task description
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
 def _create_task(task_key: str, agent: Agent, **kwargs: str) -> Task:
-    """Create a task from YAML config with variable interpolation."""
-    tasks_config = _load_yaml("tasks.yaml")
-    task_cfg = tasks_config[task_key]
+    """Create a task from YAML config with variable interpolation.
 
-    description = task_cfg["description"]
-    for key, value in kwargs.items():
-        description = description.replace(f"{{{key}}}", value)
+    Placeholders are filled in one regex pass over the description, so
+    values are never rescanned. Unknown placeholders and any other braces
+    (e.g. a JSON example) are left as written.
+    """
+    task_cfg = _load_yaml("tasks.yaml")[task_key]
+    description = _PLACEHOLDER.sub(
+        lambda m: kwargs.get(m.group(1), m.group(0)),
+        task_cfg["description"],
+    )
 
+    _import_crewai()
     return Task(
         description=description,
         expected_output=task_cfg["expected_output"],
@@ -133,7 +250,103 @@ def _create_task(task_key: str, agent: Agent, **kwargs: str) -> Task:
     )
 
 
+# ─── Crew Runner ─────────────────────────────────────────────────────────────
+
+def _single_task_crew(
+    agent_key: str,
+    task_key: str,
+    *,
+    step_callback: StepCallback | None = None,
+    **kwargs: str,
+) -> Crew:
+    """Build a one-agent, one-task crew for ``task_key``."""
+    agents = _create_agents()
+    task = _create_task(task_key, agents[agent_key], **kwargs)
+    _import_crewai()
+    return Crew(
+        agents=[agents[agent_key]],
+        tasks=[task],
+        process=Process.sequential,
+        step_callback=step_callback,
+    )
+
+
+def _result_key(agent_key: str, task_key: str, **kwargs: str) -> str:
+    """Result cache key: the inputs plus the models and prompts that shape the output."""
+    context = (
+        _get_azure_llm(mini=False),
+        _get_azure_llm(mini=True),
+        _load_yaml("agents.yaml")[agent_key],
+        _load_yaml("tasks.yaml")[task_key],
+    )
+    return cache.cache_key(task_key, context, **kwargs)
+
+
+def _total_tokens(result) -> int:
+    """Tokens a kickoff consumed, or 0 when CrewAI didn't report usage."""
+    usage = getattr(result, "token_usage", None)
+    return int(getattr(usage, "total_tokens", 0) or 0)
+
+
+def _run(
+    agent_key: str,
+    task_key: str,
+    *,
+    cached: bool = True,
+    step_callback: StepCallback | None = None,
+    **kwargs: str,
+) -> str:
+    """Run ``task_key`` and return its raw output.
+
+    With ``cached`` a stored output for the same normalized inputs is reused,
+    and a fresh one is stored for next time. ``step_callback`` receives each
+    CrewAI agent step (tool call or final answer) as it happens; a cache hit
+    has no steps.
+    """
+    key = _result_key(agent_key, task_key, **kwargs) if cached else None
+    raw = cache.get(key) if key else None
+    if raw is None:
+        crew = _single_task_crew(agent_key, task_key, step_callback=step_callback, **kwargs)
+        result = crew.kickoff()
+        raw = result.raw
+        if key:
+            cache.put(key, raw, _total_tokens(result))
+    return raw
+
+
+async def _run_async(
+    agent_key: str,
+    task_key: str,
+    *,
+    cached: bool = True,
+    **kwargs: str,
+) -> str:
+    """Async variant of :func:`_run`.
+
+    Like :func:`_run`, each run builds its own crew around a freshly filled
+    task and kicks it off directly; only the memoized agents are shared
+    between concurrent runs.
+    """
+    key = _result_key(agent_key, task_key, **kwargs) if cached else None
+    raw = cache.get(key) if key else None
+    if raw is None:
+        crew = _single_task_crew(agent_key, task_key, **kwargs)
+        result = await crew.kickoff_async()
+        raw = result.raw
+        if key:
+            cache.put(key, raw, _total_tokens(result))
+    return raw
+
+
+def _company_info(industry: str, employees: int, capital: str, location: str) -> str:
+    """Format the one-line company profile shown with match results."""
+    return f"{industry} / {employees}人 / {capital} / {location}"
+
+
 # ─── Public API ──────────────────────────────────────────────────────────────
+# Matching, scoring and summarizing are cached on disk per normalized input
+# (see cache.py), so repeating a request skips the LLM. Drafting always runs
+# fresh, since a new draft is usually why it is re-run.
 
 def match_subsidies(
     industry: str,
@@ -141,6 +354,7 @@ def match_subsidies(
     capital: str,
     location: str,
     challenge: str,
+    step_callback: StepCallback | None = None,
 ) -> MatchResult:
     """Find matching subsidies for a company.
 
@@ -150,14 +364,15 @@ def match_subsidies(
         capital: 資本金（例: 1,000万円）
         location: 所在地（例: 東京都）
         challenge: 課題・投資計画
+        step_callback: 各ステップ（ツール呼び出し・最終回答）を受け取るコールバック
 
     Returns:
         MatchResult with recommended subsidies.
     """
-    agents = _create_agents()
-    task = _create_task(
+    raw = _run(
+        "matcher",
         "match_subsidies",
-        agents["matcher"],
+        step_callback=step_callback,
         industry=industry,
         employees=str(employees),
         capital=capital,
@@ -165,16 +380,9 @@ def match_subsidies(
         challenge=challenge,
     )
 
-    crew = Crew(
-        agents=[agents["matcher"]],
-        tasks=[task],
-        process=Process.sequential,
-    )
-    result = crew.kickoff()
-
     return MatchResult(
-        company_info=f"{industry} / {employees}人 / {capital} / {location}",
-        recommendations=result.raw,
+        company_info=_company_info(industry, employees, capital, location),
+        recommendations=raw,
     )
 
 
@@ -182,6 +390,7 @@ def draft_application(
     subsidy_name: str,
     company_info: str,
     plan_summary: str,
+    step_callback: StepCallback | None = None,
 ) -> DraftResult:
     """Generate a draft application (business plan) for a subsidy.
 
@@ -189,87 +398,288 @@ def draft_application(
         subsidy_name: 補助金名（例: ものづくり補助金）
         company_info: 企業の基本情報
         plan_summary: 事業計画の概要
+        step_callback: 各ステップ（ツール呼び出し・最終回答）を受け取るコールバック
 
     Returns:
         DraftResult with the drafted application.
     """
-    agents = _create_agents()
-    task = _create_task(
+    raw = _run(
+        "writer",
         "draft_application",
-        agents["writer"],
+        cached=False,
+        step_callback=step_callback,
         subsidy_name=subsidy_name,
         company_info=company_info,
         plan_summary=plan_summary,
     )
 
-    crew = Crew(
-        agents=[agents["writer"]],
-        tasks=[task],
-        process=Process.sequential,
-    )
-    result = crew.kickoff()
-
     return DraftResult(
         subsidy_name=subsidy_name,
-        draft=result.raw,
+        draft=raw,
     )
 
 
 def score_application(
     subsidy_name: str,
     application_text: str,
+    step_callback: StepCallback | None = None,
 ) -> ScoreResult:
     """Score a draft application against review criteria.
 
     Args:
         subsidy_name: 補助金名
         application_text: 申請書の本文
+        step_callback: 各ステップ（ツール呼び出し・最終回答）を受け取るコールバック
 
     Returns:
         ScoreResult with scoring and improvement suggestions.
     """
-    agents = _create_agents()
-    task = _create_task(
+    raw = _run(
+        "scorer",
         "score_application",
-        agents["scorer"],
+        step_callback=step_callback,
         subsidy_name=subsidy_name,
         application_text=application_text,
     )
 
-    crew = Crew(
-        agents=[agents["scorer"]],
-        tasks=[task],
-        process=Process.sequential,
-    )
-    result = crew.kickoff()
-
     return ScoreResult(
         subsidy_name=subsidy_name,
-        score_report=result.raw,
+        score_report=raw,
     )
 
 
-def summarize_guidelines(guidelines_text: str) -> SummaryResult:
+def summarize_guidelines(
+    guidelines_text: str,
+    step_callback: StepCallback | None = None,
+) -> SummaryResult:
     """Summarize a subsidy's application guidelines.
 
     Args:
         guidelines_text: 公募要領のテキスト
+        step_callback: 各ステップ（ツール呼び出し・最終回答）を受け取るコールバック
+
+    Guidelines longer than ``_SECTION_CHARS`` are summarized section by
+    section in parallel and the partial summaries merged (see
+    :func:`summarize_guidelines_async`); step callbacks are not reported
+    for those.
 
     Returns:
         SummaryResult with structured summary.
     """
-    agents = _create_agents()
-    task = _create_task(
+    if len(guidelines_text) > _SECTION_CHARS:
+        return asyncio.run(summarize_guidelines_async(guidelines_text))
+
+    raw = _run(
+        "summarizer",
         "summarize_guidelines",
-        agents["summarizer"],
+        step_callback=step_callback,
         guidelines_text=guidelines_text,
     )
 
-    crew = Crew(
-        agents=[agents["summarizer"]],
-        tasks=[task],
+    return SummaryResult(summary=raw)
+
+
+# ─── Pipeline ────────────────────────────────────────────────────────────────
+
+# stage name -> (agent key, task key)
+_STAGES: dict[str, tuple[str, str]] = {
+    "match": ("matcher", "match_subsidies"),
+    "draft": ("writer", "draft_application"),
+    "score": ("scorer", "score_application"),
+    "summarize": ("summarizer", "summarize_guidelines"),
+}
+
+# Fills placeholders whose value comes from the previous stage's output
+_FROM_CONTEXT = "（前のタスクの結果を参照）"
+# Same, for the first stage when an earlier stage's output was passed in
+_FROM_EARLIER = "（以下の前段の結果を参照）\n{}"
+
+
+def run_pipeline(
+    stages: Sequence[str] = ("match", "draft", "score"),
+    step_callback: StepCallback | None = None,
+    context: str | None = None,
+    **inputs: object,
+) -> PipelineResult:
+    """Run several stages as one sequential crew.
+
+    Each task receives the previous task's output as context, so inputs a
+    later stage would normally need can be left out: without
+    ``subsidy_name`` the writer drafts for the matcher's top pick, and the
+    scorer scores the draft it is handed. ``company_info`` defaults to the
+    matched company's profile. Pipeline runs are not cached.
+
+    ``context`` lets the first stage pick up where an earlier run left off,
+    e.g. drafting from a (cached) :func:`match_subsidies` result.
+
+    Args:
+        stages: 実行するステージ（match / draft / score / summarize）
+        step_callback: 各ステップ（ツール呼び出し・最終回答）を受け取るコールバック
+        context: 先に実行済みのステージの出力（最初のタスクに渡す）
+        **inputs: 各タスクのプレースホルダー値（industry, plan_summary など）
+
+    Returns:
+        PipelineResult with each stage's output.
+    """
+    values = {key: str(value) for key, value in inputs.items()}
+    profile = ("industry", "employees", "capital", "location")
+    if "company_info" not in values and all(key in values for key in profile):
+        values["company_info"] = _company_info(*(values[key] for key in profile))
+
+    agents = _create_agents()
+    tasks_config = _load_yaml("tasks.yaml")
+    tasks: list[Task] = []
+    for stage in stages:
+        agent_key, task_key = _STAGES[stage]
+        placeholders = _PLACEHOLDER.findall(tasks_config[task_key]["description"])
+        if tasks or context is None:
+            pending = _FROM_CONTEXT
+        else:
+            pending = _FROM_EARLIER.format(context)
+        fill = dict.fromkeys(placeholders, pending) | values
+        task = _create_task(task_key, agents[agent_key], **fill)
+        if tasks:
+            task.context = [tasks[-1]]
+        tasks.append(task)
+
+    _import_crewai()
+    stage_agents = {_STAGES[stage][0]: agents[_STAGES[stage][0]] for stage in stages}
+    result = Crew(
+        agents=list(stage_agents.values()),
+        tasks=tasks,
         process=Process.sequential,
+        step_callback=step_callback,
+    ).kickoff()
+
+    return PipelineResult(
+        outputs={stage: output.raw for stage, output in zip(stages, result.tasks_output)},
+    )
+
+
+# ─── Async API ───────────────────────────────────────────────────────────────
+# Same results as the functions above, but awaitable so independent runs
+# (several companies, several drafts to score) can share one event loop.
+
+async def match_subsidies_async(
+    industry: str,
+    employees: int,
+    capital: str,
+    location: str,
+    challenge: str,
+) -> MatchResult:
+    """Async variant of :func:`match_subsidies`."""
+    raw = await _run_async(
+        "matcher",
+        "match_subsidies",
+        industry=industry,
+        employees=str(employees),
+        capital=capital,
+        location=location,
+        challenge=challenge,
+    )
+
+    return MatchResult(
+        company_info=_company_info(industry, employees, capital, location),
+        recommendations=raw,
+    )
+
+
+async def draft_application_async(
+    subsidy_name: str,
+    company_info: str,
+    plan_summary: str,
+) -> DraftResult:
+    """Async variant of :func:`draft_application`."""
+    raw = await _run_async(
+        "writer",
+        "draft_application",
+        cached=False,
+        subsidy_name=subsidy_name,
+        company_info=company_info,
+        plan_summary=plan_summary,
+    )
+
+    return DraftResult(
+        subsidy_name=subsidy_name,
+        draft=raw,
+    )
+
+
+async def score_application_async(
+    subsidy_name: str,
+    application_text: str,
+) -> ScoreResult:
+    """Async variant of :func:`score_application`."""
+    raw = await _run_async(
+        "scorer",
+        "score_application",
+        subsidy_name=subsidy_name,
+        application_text=application_text,
+    )
+
+    return ScoreResult(
+        subsidy_name=subsidy_name,
+        score_report=raw,
     )
-    result = crew.kickoff()
 
-    return SummaryResult(summary=result.raw)
+
+async def summarize_guidelines_async(guidelines_text: str) -> SummaryResult:
+    """Async variant of :func:`summarize_guidelines`.
+
+    Long guidelines are split into sections of at most ``_SECTION_CHARS``
+    characters, summarized concurrently, and the joined section summaries
+    summarized once more into the final result.
+    """
+    sections = _split_sections(guidelines_text, _SECTION_CHARS)
+    if len(sections) > 1:
+        partials = await asyncio.gather(*(
+            _run_async("summarizer", "summarize_guidelines", guidelines_text=section)
+            for section in sections
+        ))
+        guidelines_text = "\n\n".join(
+            f"【セクション {i}/{len(partials)} の要約】\n{partial}"
+            for i, partial in enumerate(partials, 1)
+        )
+
+    raw = await _run_async(
+        "summarizer",
+        "summarize_guidelines",
+        guidelines_text=guidelines_text,
+    )
+
+    return SummaryResult(summary=raw)
+
+
+# ─── Long Text ───────────────────────────────────────────────────────────────
+
+# Guidelines longer than this (characters) are summarized section by section.
+# Japanese runs close to one token per character, so each section stays well
+# inside the model's context window alongside the prompt.
+_SECTION_CHARS = 30_000
+
+
+def _split_sections(text: str, limit: int) -> list[str]:
+    """Split ``text`` into chunks of at most ``limit`` characters.
+
+    Chunks break at blank lines where possible; a single paragraph longer
+    than ``limit`` is cut at the limit.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    sections: list[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        while len(paragraph) > limit:
+            if current:
+                sections.append(current)
+                current = ""
+            sections.append(paragraph[:limit])
+            paragraph = paragraph[limit:]
+        if current and len(current) + 2 + len(paragraph) > limit:
+            sections.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        sections.append(current)
+    return sections
@@ -20,24 +20,53 @@ Usage:
     # 公募要領の要約
     python -m subsidy_consultant summarize --file guidelines.txt
 
-    # 対話モード
+    # 複数ファイルを並行処理 (各ファイルの隣に <file>.summary.md を出力)
+    python -m subsidy_consultant summarize --file "guidelines/*.txt"
+
+    # 複数企業の一括マッチング (CSV / JSONL、最大4件を並行実行)
+    python -m subsidy_consultant batch --file companies.csv --concurrency 4
+
+    # subsidies.yaml 編集後にナレッジベースのキャッシュを再生成
+    python -m subsidy_consultant rebuild-kb
+
+    # 対話モード (マッチング → ドラフト → スコアリング)
     python -m subsidy_consultant
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import csv
+import glob
+import json
+import logging
+import os
 import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-from dotenv import load_dotenv
-
 
 def main() -> None:
     """Run the subsidy consultant agent."""
+    args = _build_parser().parse_args()
+
+    # Loaded only once a command runs, so --help stays instant
+    from dotenv import load_dotenv
+
     env_path = Path(__file__).parent.parent.parent / ".env"
     load_dotenv(env_path)
+    _configure_logging()
+
+    if args.command is None:
+        _interactive_mode()
+    else:
+        args.func(args)
+
 
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser; each subcommand's ``func`` default is its handler."""
     parser = argparse.ArgumentParser(
         description="AI 補助金コンサルタント - Azure AI Foundry 搭載"
     )
@@ -50,6 +79,7 @@ def main() -> None:
     match_parser.add_argument("--capital", "-c", required=True, help="資本金")
     match_parser.add_argument("--location", "-l", required=True, help="所在地")
     match_parser.add_argument("--challenge", required=True, help="課題・投資計画")
+    match_parser.set_defaults(func=_cmd_match)
 
     # draft コマンド
     draft_parser = subparsers.add_parser("draft", help="申請書ドラフト生成")
@@ -57,28 +87,65 @@ def main() -> None:
     draft_parser.add_argument("--company", required=True, help="企業情報")
     draft_parser.add_argument("--plan", required=True, help="事業計画概要")
     draft_parser.add_argument("--output", "-o", help="出力ファイルパス")
+    draft_parser.set_defaults(func=_cmd_draft)
 
     # score コマンド
     score_parser = subparsers.add_parser("score", help="申請書スコアリング")
     score_parser.add_argument("--subsidy", "-s", required=True, help="補助金名")
-    score_parser.add_argument("--file", "-f", required=True, help="申請書ファイルパス")
+    score_parser.add_argument(
+        "--file", "-f", required=True, nargs="+",
+        help="申請書ファイルパス (複数指定・glob 可、結果は <file>.score.md)",
+    )
+    score_parser.set_defaults(func=_cmd_score)
 
     # summarize コマンド
     sum_parser = subparsers.add_parser("summarize", help="公募要領の要約")
-    sum_parser.add_argument("--file", "-f", required=True, help="公募要領ファイルパス")
-
-    args = parser.parse_args()
-
-    if args.command == "match":
-        _cmd_match(args)
-    elif args.command == "draft":
-        _cmd_draft(args)
-    elif args.command == "score":
-        _cmd_score(args)
-    elif args.command == "summarize":
-        _cmd_summarize(args)
-    else:
-        _interactive_mode()
+    sum_parser.add_argument(
+        "--file", "-f", required=True, nargs="+",
+        help="公募要領ファイルパス (複数指定・glob 可、結果は <file>.summary.md)",
+    )
+    sum_parser.set_defaults(func=_cmd_summarize)
+
+    # batch コマンド
+    batch_parser = subparsers.add_parser("batch", help="複数企業の一括マッチング")
+    batch_parser.add_argument(
+        "--file", "-f", required=True,
+        help="企業一覧ファイル (.csv または .jsonl)",
+    )
+    batch_parser.add_argument(
+        "--concurrency", "-n", type=int, default=4,
+        help="同時実行数の上限 (レート制限対策)",
+    )
+    batch_parser.set_defaults(func=_cmd_batch)
+
+    # rebuild-kb コマンド
+    kb_parser = subparsers.add_parser("rebuild-kb", help="ナレッジベースのキャッシュを再生成")
+    kb_parser.set_defaults(func=_cmd_rebuild_kb)
+
+    return parser
+
+
+def _configure_logging() -> None:
+    """Print this package's log records (e.g. result cache hits) at LOG_LEVEL."""
+    logger = logging.getLogger("subsidy_consultant")
+    logger.addHandler(logging.StreamHandler())
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    try:
+        logger.setLevel(level)
+    except ValueError:
+        logger.setLevel(logging.INFO)
+        logger.warning("Unknown LOG_LEVEL %r; using INFO", level)
+
+
+def _print_step(step) -> None:
+    """Show each tool call as the agent makes it.
+
+    The final answer step is skipped; the command prints the result once
+    kickoff returns.
+    """
+    tool = getattr(step, "tool", None)
+    if tool:
+        print(f"  … {tool}: {getattr(step, 'tool_input', '')}", flush=True)
 
 
 def _cmd_match(args) -> None:
@@ -91,6 +158,7 @@ def _cmd_match(args) -> None:
         capital=args.capital,
         location=args.location,
         challenge=args.challenge,
+        step_callback=_print_step,
     )
     print(f"\n企業情報: {result.company_info}")
     print(f"\n{result.recommendations}")
@@ -104,6 +172,7 @@ def _cmd_draft(args) -> None:
         subsidy_name=args.subsidy,
         company_info=args.company,
         plan_summary=args.plan,
+        step_callback=_print_step,
     )
     print(f"\n{result.draft}")
 
@@ -113,35 +182,152 @@ def _cmd_draft(args) -> None:
 
 
 def _cmd_score(args) -> None:
-    from subsidy_consultant.crew import score_application
-
-    filepath = Path(args.file)
-    if not filepath.exists():
-        print(f"Error: ファイルが見つかりません: {filepath}")
-        sys.exit(1)
+    from subsidy_consultant.crew import score_application, score_application_async
+
+    paths = _expand_files(args.file)
+    if len(paths) > 1:
+        print(f"申請書スコアリング中... ({args.subsidy}, {len(paths)}件)")
+        _process_files(
+            paths,
+            lambda text: asyncio.run(
+                score_application_async(subsidy_name=args.subsidy, application_text=text)
+            ).score_report,
+            ".score.md",
+        )
+        return
 
-    text = filepath.read_text(encoding="utf-8")
+    text = paths[0].read_text(encoding="utf-8")
     print(f"申請書スコアリング中... ({args.subsidy})")
-    result = score_application(subsidy_name=args.subsidy, application_text=text)
+    result = score_application(
+        subsidy_name=args.subsidy,
+        application_text=text,
+        step_callback=_print_step,
+    )
     print(f"\n{result.score_report}")
 
 
 def _cmd_summarize(args) -> None:
-    from subsidy_consultant.crew import summarize_guidelines
+    from subsidy_consultant.crew import summarize_guidelines, summarize_guidelines_async
+
+    paths = _expand_files(args.file)
+    if len(paths) > 1:
+        print(f"公募要領を解析中... ({len(paths)}件)")
+        _process_files(
+            paths,
+            lambda text: asyncio.run(summarize_guidelines_async(text)).summary,
+            ".summary.md",
+        )
+        return
+
+    text = paths[0].read_text(encoding="utf-8")
+    print("公募要領を解析中...")
+    result = summarize_guidelines(guidelines_text=text, step_callback=_print_step)
+    print(f"\n{result.summary}")
+
+
+def _expand_files(patterns: list[str]) -> list[Path]:
+    """Resolve ``--file`` arguments, expanding glob patterns the shell left alone.
+
+    Exits with an error if a file or pattern matches nothing.
+    """
+    paths: list[Path] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches or not Path(matches[0]).exists():
+            print(f"Error: ファイルが見つかりません: {pattern}")
+            sys.exit(1)
+        paths.extend(Path(match) for match in matches)
+    return paths
+
+
+def _process_files(paths: list[Path], run: Callable[[str], str], suffix: str) -> None:
+    """Run ``run`` on each file's text in a thread pool, writing ``<file><suffix>``.
+
+    The work is waiting on the LLM, so the pool is sized past the CPU count.
+    ``run`` should use the async crew API, which copies each crew so
+    concurrent runs don't share the memoized agents' executor state.
+    """
+    def work(path: Path) -> Path:
+        output_path = path.with_name(path.name + suffix)
+        output_path.write_text(run(path.read_text(encoding="utf-8")), encoding="utf-8")
+        return output_path
+
+    workers = min(len(paths), (os.cpu_count() or 1) * 2)
+    failed = False
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(work, path): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                print(f"保存先: {future.result()}")
+            except Exception as e:
+                failed = True
+                print(f"Error: {futures[future]}: {e}")
+    if failed:
+        sys.exit(1)
+
 
+# 一括マッチングの入力列 (match コマンドの引数と同じ)
+_COMPANY_FIELDS = ("industry", "employees", "capital", "location", "challenge")
+
+
+def _cmd_batch(args) -> None:
     filepath = Path(args.file)
     if not filepath.exists():
         print(f"Error: ファイルが見つかりません: {filepath}")
         sys.exit(1)
 
-    text = filepath.read_text(encoding="utf-8")
-    print("公募要領を解析中...")
-    result = summarize_guidelines(guidelines_text=text)
-    print(f"\n{result.summary}")
+    rows = _read_companies(filepath)
+    print(f"{len(rows)}社の補助金マッチング中... (同時実行数: {args.concurrency})")
+    results = asyncio.run(_match_batch(rows, args.concurrency))
+
+    for i, result in enumerate(results, 1):
+        print(f"\n{'=' * 60}")
+        print(f"[{i}/{len(results)}] 企業情報: {result.company_info}")
+        print(f"{'=' * 60}")
+        print(f"\n{result.recommendations}")
+
+
+def _read_companies(filepath: Path) -> list[dict]:
+    """Read company profiles from a CSV (with header) or JSONL file."""
+    with open(filepath, encoding="utf-8-sig", newline="") as f:
+        if filepath.suffix.lower() == ".jsonl":
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = list(csv.DictReader(f))
+
+    rows = []
+    for record in records:
+        row = {field: str(record[field]).strip() for field in _COMPANY_FIELDS}
+        row["employees"] = int(row["employees"])
+        rows.append(row)
+    return rows
+
+
+async def _match_batch(rows: list[dict], concurrency: int = 4) -> list:
+    """Match every company concurrently, at most ``concurrency`` at a time.
+
+    Results come back in input order.
+    """
+    from subsidy_consultant.crew import match_subsidies_async
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _match(row: dict):
+        async with semaphore:
+            return await match_subsidies_async(**row)
+
+    return await asyncio.gather(*(_match(row) for row in rows))
+
+
+def _cmd_rebuild_kb(args) -> None:
+    from subsidy_consultant.tools.subsidy_search import rebuild_kb
+
+    count = rebuild_kb()
+    print(f"ナレッジベースを再生成しました: {count}件の補助金")
 
 
 def _interactive_mode() -> None:
-    from subsidy_consultant.crew import match_subsidies
+    from subsidy_consultant.crew import match_subsidies, run_pipeline
 
     print("=" * 60)
     print("  AI 補助金コンサルタント")
@@ -149,38 +335,42 @@ def _interactive_mode() -> None:
     print("=" * 60)
     print()
 
-    industry = input("業種を入力してください（例: 製造業）: ").strip()
-    employees = int(input("従業員数: ").strip())
-    capital = input("資本金（例: 3,000万円）: ").strip()
-    location = input("所在地（例: 東京都）: ").strip()
-    challenge = input("課題・投資計画を教えてください: ").strip()
+    inputs = {
+        "industry": input("業種を入力してください（例: 製造業）: ").strip(),
+        "employees": int(input("従業員数: ").strip()),
+        "capital": input("資本金（例: 3,000万円）: ").strip(),
+        "location": input("所在地（例: 東京都）: ").strip(),
+        "challenge": input("課題・投資計画を教えてください: ").strip(),
+    }
 
-    print("\n補助金マッチング中...")
-    result = match_subsidies(
-        industry=industry,
-        employees=employees,
-        capital=capital,
-        location=location,
-        challenge=challenge,
-    )
-    print(f"\n{result.recommendations}")
+    print("\n補助金を検索中...")
+    match = match_subsidies(**inputs, step_callback=_print_step)
+    print(f"\n{'=' * 60}\n  推薦補助金\n{'=' * 60}")
+    print(f"\n{match.recommendations}")
 
-    # 続けてドラフト生成するか確認
     print("\n" + "-" * 40)
-    cont = input("申請書のドラフトを生成しますか？ (y/n): ").strip().lower()
-    if cont == "y":
-        from subsidy_consultant.crew import draft_application
-
-        subsidy_name = input("補助金名: ").strip()
-        plan = input("事業計画の概要: ").strip()
-
-        company_info = f"{industry} / {employees}人 / {capital} / {location}"
-        result = draft_application(
-            subsidy_name=subsidy_name,
-            company_info=company_info,
-            plan_summary=plan,
-        )
-        print(f"\n{result.draft}")
+    cont = input("続けて申請書ドラフトの生成とスコアリングを行いますか？ (y/n): ").strip().lower()
+    if cont != "y":
+        return
+
+    # ドラフト・スコアリングは一つの Crew で実行し、マッチング結果を文脈として渡す
+    subsidy_name = input("補助金名（空欄ならマッチング結果の最有力候補）: ").strip()
+    if subsidy_name:
+        inputs["subsidy_name"] = subsidy_name
+    inputs["plan_summary"] = input("事業計画の概要: ").strip()
+
+    titles = {"draft": "申請書ドラフト", "score": "スコアリング結果"}
+    print("\n申請書ドラフト → スコアリング結果 を作成中...")
+    result = run_pipeline(
+        ("draft", "score"),
+        step_callback=_print_step,
+        context=match.recommendations,
+        **inputs,
+    )
+
+    for stage, output in result.outputs.items():
+        print(f"\n{'=' * 60}\n  {titles[stage]}\n{'=' * 60}")
+        print(f"\n{output}")
 
 
 if __name__ == "__main__":
@@ -2,20 +2,211 @@
 
 from __future__ import annotations
 
+import json
+import os
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
 
 import yaml
 from crewai.tools import tool
 
+# libyaml's C parser when PyYAML was built with it (all binary wheels are)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
+_KB_PATH = Path(__file__).parent.parent / "knowledge" / "subsidies.yaml"
+# Parsed knowledge base as JSON, reused while it is at least as new as the YAML
+_KB_CACHE = _KB_PATH.with_name(_KB_PATH.name + ".json")
+
+
+@lru_cache(maxsize=None)
 def _load_subsidies() -> list[dict]:
-    """Load subsidy data from YAML knowledge base."""
-    kb_path = Path(__file__).parent.parent / "knowledge" / "subsidies.yaml"
-    with open(kb_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-    return data.get("subsidies", [])
+    """Load subsidy data from YAML knowledge base.
+
+    Parsed once per process; agents call the search tools repeatedly during
+    a single kickoff. Call ``reload_kb()`` after editing subsidies.yaml.
+    """
+    return _read_kb().get("subsidies", [])
+
+
+def _read_kb() -> dict:
+    """Read the knowledge base from its JSON sidecar, or parse the YAML and write one.
+
+    A sidecar that isn't a JSON object is treated as stale and rewritten.
+    """
+    try:
+        if _KB_CACHE.stat().st_mtime_ns >= _KB_PATH.stat().st_mtime_ns:
+            data = json.loads(_KB_CACHE.read_bytes())
+            if isinstance(data, dict):
+                return data
+    except (OSError, ValueError):
+        pass
+
+    data = yaml.load(_KB_PATH.read_bytes(), Loader=_YAML_LOADER)
+    _write_kb_cache(data)
+    return data
+
+
+def _write_kb_cache(data: dict) -> None:
+    """Atomically write the JSON sidecar, skipping data JSON can't round-trip."""
+    try:
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    except TypeError:
+        return
+    if json.loads(payload) != data:
+        return
+
+    tmp_path = _KB_CACHE.with_name(f"{_KB_CACHE.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, _KB_CACHE)
+    except OSError:
+        # Read-only installs simply keep parsing the YAML.
+        tmp_path.unlink(missing_ok=True)
+
+
+def reload_kb() -> None:
+    """Drop the cached knowledge base so the next search re-reads subsidies.yaml."""
+    _load_subsidies.cache_clear()
+    _build_index.cache_clear()
+
+
+def rebuild_kb() -> int:
+    """Re-parse subsidies.yaml and rewrite its JSON sidecar.
+
+    Returns:
+        Number of subsidies in the knowledge base.
+    """
+    _KB_CACHE.unlink(missing_ok=True)
+    reload_kb()
+    return len(_load_subsidies())
+
+
+# ─── Search Index ────────────────────────────────────────────────────────────
+
+# Folds the width and kana variants users type interchangeably: full-width
+# ASCII and the ideographic space to half-width, katakana to hiragana.
+# Applied (then casefolded) to the indexed text and to every query.
+_FOLD = str.maketrans(
+    {0x3000: " "}
+    | {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+    | {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+)
+
+
+def _fold(text: str) -> str:
+    """Normalize ``text`` for matching: width, kana and case folded."""
+    return text.translate(_FOLD).casefold()
+
+
+class _SubsidyIndex(NamedTuple):
+    """The knowledge base prepared for searching, built once per load."""
+
+    # Markdown block returned for each subsidy, in knowledge-base order
+    entries: tuple[str, ...]
+    # folded name/purpose/target/requirements/tips, for substring confirmation
+    searchable: tuple[str, ...]
+    # character and character bigram -> positions of subsidies containing it
+    grams: dict[str, frozenset[int]]
+    # Markdown summary table returned by list_all_subsidies
+    table: str
+
+
+def _bigrams(text: str) -> set[str]:
+    """Every two-character slice of ``text`` (Japanese has no spaces to split on)."""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _grams(text: str) -> set[str]:
+    """Every character and every bigram of ``text``: the keys of the index."""
+    return set(text) | _bigrams(text)
+
+
+def _format_entry(sub: dict) -> str:
+    """Render one subsidy as the Markdown block the agents receive."""
+    entry = (
+        f"## {sub['name']}\\n"
+        f"- 補助上限: {sub.get('max_amount', 'N/A')}\\n"
+        f"- 補助率: {sub.get('subsidy_rate', 'N/A')}\\n"
+        f"- 採択率: {sub.get('acceptance_rate', 'N/A')}\\n"
+        f"- 対象: {sub.get('target', 'N/A')}\\n"
+        f"- 目的: {sub.get('purpose', 'N/A')}\\n"
+        f"- 要件: {', '.join(sub.get('requirements', []))}\\n"
+    )
+    if sub.get("scoring_criteria"):
+        entry += f"- 審査基準: {', '.join(sub['scoring_criteria'])}\\n"
+    if sub.get("tips"):
+        entry += f"- Tips: {', '.join(sub['tips'])}\\n"
+    return entry
+
+
+def _format_table(subsidies: list[dict]) -> str:
+    """Render the name / max amount / rate summary table of all subsidies."""
+    header = "| 補助金名 | 補助上限額 | 補助率 | 採択率 |"
+    sep = "|---------|----------|-------|--------|"
+    lines = [header, sep]
+    for sub in subsidies:
+        lines.append(
+            f"| {sub.get('short_name', sub['name'])} "
+            f"| {sub.get('max_amount', 'N/A')} "
+            f"| {sub.get('subsidy_rate', 'N/A')} "
+            f"| {sub.get('acceptance_rate', 'N/A')} |"
+        )
+    return "\\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def _build_index() -> _SubsidyIndex:
+    """Format every subsidy, index it by character and bigram and tabulate the summary."""
+    subsidies = _load_subsidies()
+    searchable = tuple(
+        _fold(" ".join([
+            sub.get("name", ""),
+            sub.get("purpose", ""),
+            sub.get("target", ""),
+            " ".join(sub.get("requirements", [])),
+            " ".join(sub.get("tips", [])),
+        ]))
+        for sub in subsidies
+    )
+
+    postings: dict[str, set[int]] = {}
+    for position, text in enumerate(searchable):
+        for gram in _grams(text):
+            postings.setdefault(gram, set()).add(position)
+
+    return _SubsidyIndex(
+        entries=tuple(_format_entry(sub) for sub in subsidies),
+        searchable=searchable,
+        grams={gram: frozenset(hits) for gram, hits in postings.items()},
+        table=_format_table(subsidies),
+    )
 
 
+def _matching_positions(word: str, index: _SubsidyIndex) -> set[int]:
+    """Positions of subsidies whose searchable text contains ``word``.
+
+    Words of one or two characters are index keys themselves, so their
+    postings are the answer. Longer words take the subsidies holding every
+    one of their bigrams as candidates and confirm the substring on those.
+    """
+    if len(word) <= 2:
+        return set(index.grams.get(word, ()))
+    postings = sorted((index.grams.get(g, frozenset()) for g in _bigrams(word)), key=len)
+    candidates = frozenset.intersection(*postings)
+    return {position for position in candidates if word in index.searchable[position]}
+
+
+def _query_positions(words: list[str], index: _SubsidyIndex) -> set[int]:
+    """Positions of subsidies matching any of the folded query ``words``."""
+    hits: set[int] = set()
+    for word in words:
+        hits |= _matching_positions(word, index)
+    return hits
+
+
+# ─── Tools ───────────────────────────────────────────────────────────────────
+
 @tool("search_subsidies")
 def search_subsidies(query: str) -> str:
     """Search the subsidy knowledge base for grants matching the query.
@@ -27,56 +218,53 @@ def search_subsidies(query: str) -> str:
     Args:
         query: Search query (industry, company size, challenge, etc.)
     """
-    subsidies = _load_subsidies()
-    results: list[str] = []
+    # Simple keyword matching (production: replace with Azure AI Search)
+    index = _build_index()
+    words = _fold(query).split()
+    if not words:
+        # Nothing to match on: hand back the overview rather than a miss
+        return index.table
+    hits = _query_positions(words, index)
 
-    query_lower = query.lower()
-    for sub in subsidies:
-        # Simple keyword matching (production: replace with Azure AI Search)
-        searchable = " ".join([
-            sub.get("name", ""),
-            sub.get("purpose", ""),
-            sub.get("target", ""),
-            " ".join(sub.get("requirements", [])),
-            " ".join(sub.get("tips", [])),
-        ]).lower()
-
-        if any(word in searchable for word in query_lower.split()):
-            entry = (
-                f"## {sub['name']}\\n"
-                f"- 補助上限: {sub.get('max_amount', 'N/A')}\\n"
-                f"- 補助率: {sub.get('subsidy_rate', 'N/A')}\\n"
-                f"- 採択率: {sub.get('acceptance_rate', 'N/A')}\\n"
-                f"- 対象: {sub.get('target', 'N/A')}\\n"
-                f"- 目的: {sub.get('purpose', 'N/A')}\\n"
-                f"- 要件: {', '.join(sub.get('requirements', []))}\\n"
-            )
-            if sub.get("scoring_criteria"):
-                entry += f"- 審査基準: {', '.join(sub['scoring_criteria'])}\\n"
-            if sub.get("tips"):
-                entry += f"- Tips: {', '.join(sub['tips'])}\\n"
-            results.append(entry)
-
-    if results:
-        return "\\n---\\n".join(results[:5])
+    if hits:
+        return "\\n---\\n".join(index.entries[position] for position in sorted(hits)[:5])
     return f"該当する補助金が見つかりませんでした: {query}"
 
 
+@tool("batch_search_subsidies")
+def batch_search_subsidies(queries: list[str]) -> str:
+    """Search the subsidy knowledge base for several queries in one call.
+
+    Prefer this over repeated search_subsidies calls when several facets
+    of the company are known (industry, size, challenge, location). Each
+    matching subsidy is returned once, with the queries that found it.
+
+    Args:
+        queries: List of search queries, e.g. ["製造業", "自動化", "賃上げ"]
+    """
+    index = _build_index()
+    matched_by: dict[int, list[str]] = {}
+    missed = []
+    for query in queries:
+        hits = _query_positions(_fold(query).split(), index)
+        if not hits:
+            missed.append(query)
+        for position in hits:
+            matched_by.setdefault(position, []).append(query)
+
+    blocks = [
+        f"{index.entries[position]}- 一致したクエリ: {', '.join(matched_by[position])}\\n"
+        for position in sorted(matched_by)[:10]
+    ]
+    if missed:
+        blocks.append(f"該当する補助金が見つかりませんでした: {', '.join(missed)}")
+    return "\\n---\\n".join(blocks)
+
+
 @tool("list_all_subsidies")
 def list_all_subsidies() -> str:
     """List all available subsidies in the knowledge base.
 
     Returns a summary table of all subsidies with name, max amount, and rate.
     """
-    subsidies = _load_subsidies()
-    header = "| 補助金名 | 補助上限額 | 補助率 | 採択率 |"
-    sep = "|---------|----------|-------|--------|"
-    lines = [header, sep]
-    for sub in subsidies:
-        lines.append(
-            f"| {sub.get('short_name', sub['name'])} "
-            f"| {sub.get('max_amount', 'N/A')} "
-            f"| {sub.get('subsidy_rate', 'N/A')} "
-            f"| {sub.get('acceptance_rate', 'N/A')} |"
-        )
-    return "\\n".join(lines)
+    return _build_index().table